@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, HTTPException
+from core.security import require_admin
+from db.database import db_config
+from services.model_registry import ModelValidationError, model_registry
+from services.prediction_cache import prediction_cache
+from services.model_reloader import reload_model
+from core.logging_config import setup_logger
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+logger = setup_logger(__name__)
+
+
+def _describir(handle):
+    return {
+        "version": handle.version,
+        "umbral_optimo": handle.umbral_optimo,
+        "variables": list(handle.variables),
+    }
+
+
+@router.get("/model")
+async def model_info():
+    """Versión del modelo que atiende actualmente las predicciones"""
+    return _describir(model_registry.get())
+
+
+@router.post("/model/reload")
+async def model_reload():
+    """Recarga el modelo desde disco, lo valida y lo publica sin reiniciar"""
+    previous = model_registry.get()
+    logger.info("🔄 Solicitada recarga del modelo")
+    try:
+        handle = await reload_model()
+    except ModelValidationError as e:
+        logger.error(f"❌ Modelo candidato rechazado: {str(e)}")
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(f"❌ Error recargando el modelo: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="No se pudo recargar el modelo")
+    return {"previous_version": previous.version, **_describir(handle)}
+
+
+@router.get("/db/pool")
+async def db_pool_status():
+    """Ocupación del pool de conexiones a la base de datos"""
+    return db_config.pool_status()
+
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """Aciertos, fallos y ocupación de la caché de predicciones"""
+    return prediction_cache.stats()
@@ -1,24 +1,53 @@
-from fastapi import APIRouter, HTTPException
-from models.schemas import PredictionInput, PredictionOutput
-from services.model_service import make_prediction
+from contextlib import nullcontext
+from fastapi import APIRouter, HTTPException, Request, Response
+from models.schemas import (
+    PredictionInput, PredictionOutput, BatchPredictionInput, BatchPredictionOutput
+)
+from services.model_service import make_prediction, make_batch_prediction
+from services.prediction_writer import PersistenceBackpressureError
 from core.logging_config import setup_logger
+from core.profiling import request_profiler, profile_requested
 
 router = APIRouter(prefix="/predict", tags=["predictions"])
 logger = setup_logger(__name__)
 
 @router.post("/", response_model=PredictionOutput)
-async def predict(input_data: PredictionInput):
-    logger.info("📥 Recibida nueva solicitud de predicción")
+async def predict(input_data: PredictionInput, request: Request, response: Response):
+    logger.debug("📥 Recibida nueva solicitud de predicción")
     try:
-        result = await make_prediction(input_data)
-        logger.info("✅ Predicción completada exitosamente")
+        async with request_profiler.capture() if profile_requested(request) else nullcontext() as perfil:
+            result = await make_prediction(input_data)
+        if perfil is not None and perfil.path is not None:
+            response.headers["X-Profile-File"] = perfil.path.name
+        logger.debug("✅ Predicción completada exitosamente")
         return result
     except ValueError as e:
         logger.error(f"❌ Error de validación: {str(e)}", exc_info=True)
         raise HTTPException(status_code=422, detail=str(e))
+    except PersistenceBackpressureError as e:
+        logger.warning(f"⏳ Servicio saturado: {str(e)}")
+        raise HTTPException(status_code=503, detail="Servicio saturado, reintente en unos segundos")
     except Exception as e:
         logger.error(f"❌ Error interno en el servidor: {str(e)}", exc_info=True)
         raise HTTPException(
             status_code=500,
             detail="Ocurrió un error procesando la solicitud"
-        )
\ No newline at end of file
+        )
+
+
+@router.post("/batch", response_model=BatchPredictionOutput)
+async def predict_batch(batch: BatchPredictionInput):
+    logger.info(f"📥 Recibida solicitud de predicción por lotes ({len(batch.records)} registros)")
+    try:
+        result = await make_batch_prediction(batch.records)
+        logger.info("✅ Predicción por lotes completada exitosamente")
+        return result
+    except ValueError as e:
+        logger.error(f"❌ Error de validación: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(f"❌ Error interno en el servidor: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail="Ocurrió un error procesando la solicitud"
+        )
@@ -0,0 +1,75 @@
+from datetime import date, datetime
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from core.security import require_admin
+from db.database import get_db
+from models.schemas import AgeCategoryOptions, PredictionPage, PredictionStats
+from services.prediction_history import list_predictions
+from services.prediction_export import FORMATOS_EXPORTACION, export_query, stream_export
+from services.prediction_rollup import daily_stats, last_rollup_id
+from core.logging_config import setup_logger
+
+# El historial contiene datos de salud: solo se expone a la red de administración
+router = APIRouter(prefix="/predictions", tags=["predictions"], dependencies=[Depends(require_admin)])
+logger = setup_logger(__name__)
+
+
+@router.get("", response_model=PredictionPage)
+def prediction_history(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="next_cursor de la página anterior"),
+    result: Optional[int] = Query(None, ge=0, le=1, description="0 = riesgo bajo, 1 = riesgo alto"),
+    age_category: Optional[AgeCategoryOptions] = None,
+    created_from: Optional[datetime] = Query(None, description="desde (incluido)"),
+    created_to: Optional[datetime] = Query(None, description="hasta (excluido)"),
+    db: Session = Depends(get_db),
+):
+    """Historial de predicciones, de la más reciente a la más antigua, paginado por cursor"""
+    try:
+        items, next_cursor = list_predictions(
+            db, limit=limit, cursor=cursor, result=result, age_category=age_category,
+            created_from=created_from, created_to=created_to,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return PredictionPage(items=items, next_cursor=next_cursor)
+
+
+@router.get("/stats", response_model=PredictionStats)
+def prediction_stats(
+    date_from: Optional[date] = Query(None, description="desde (incluido)"),
+    date_to: Optional[date] = Query(None, description="hasta (excluido)"),
+    group_by: List[Literal["age_category", "sex"]] = Query([], description="dimensiones además del día"),
+    db: Session = Depends(get_db),
+):
+    """Predicciones y tasa de riesgo alto por día, servidas desde los agregados (sin leer predictions)"""
+    return PredictionStats(
+        rows=daily_stats(db, date_from=date_from, date_to=date_to, group_by=group_by),
+        last_id=last_rollup_id(db),
+    )
+
+
+@router.get("/export")
+def export_predictions(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    columns: Optional[str] = Query(None, description="columnas separadas por comas (por defecto todas)"),
+    created_from: Optional[datetime] = Query(None, description="desde (incluido)"),
+    created_to: Optional[datetime] = Query(None, description="hasta (excluido)"),
+    result: Optional[int] = Query(None, ge=0, le=1, description="0 = riesgo bajo, 1 = riesgo alto"),
+    age_category: Optional[AgeCategoryOptions] = None,
+):
+    """Exporta predicciones en NDJSON o CSV en streaming, sin cargar el resultado en memoria"""
+    try:
+        consulta = export_query(
+            columns=[c.strip() for c in columns.split(",") if c.strip()] if columns else None,
+            created_from=created_from, created_to=created_to, result=result, age_category=age_category,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return StreamingResponse(
+        stream_export(consulta, format),
+        media_type=FORMATOS_EXPORTACION[format],
+        headers={"Content-Disposition": f'attachment; filename="predictions.{format}"'},
+    )
@@ -13,7 +13,85 @@ class Settings(BaseSettings):
     # Rutas relativas al directorio del proyecto (backend/)
     MODEL_PATH: str = "data/modelo_predictor_enfermedad_cardiaca.pkl"
     MODEL_INFO_PATH: str = "data/info_modelo_cardiaco.pkl"
-    FEATURES_PATH: str = "data/features_description.json"
+    # "pickle" carga el estimador de sklearn; "compact" el .npz exportado con main.py export-model
+    MODEL_FORMAT: str = "pickle"
+    COMPACT_MODEL_PATH: str = "data/modelo_compacto.npz"
+    FEATURES_PATH: str = "features_description.json"
+    FEATURES_CHECK_INTERVAL: float = 5.0  # segundos entre comprobaciones del mtime del JSON
+
+    # Logging (core/logging_config.py)
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVELS: str = ""              # niveles por módulo: "services.model_service=WARNING,sqlalchemy.engine=INFO"
+    LOG_FORMAT: str = "text"          # "text" o "json"
+    LOG_DIR: str = "logs"
+    LOG_FILE_MAX_BYTES: int = 10485760  # 10MB
+    LOG_FILE_BACKUPS: int = 5
+
+    # Perfilado bajo demanda de /predict con la cabecera X-Profile (solo desde redes de administración)
+    PROFILING_ENABLED: bool = True
+    PROFILE_DIR: str = "profiles"
+    PROFILE_MAX_FILES: int = 50           # se borran los perfiles más antiguos por encima de este número
+    PROFILE_SAMPLE_INTERVAL: float = 0.001  # segundos entre muestras en modo sampling
+
+    # Coherencia del IMC recibido con altura y peso
+    BMI_TOLERANCE: float = 0.5
+    BMI_MISMATCH_POLICY: str = "reject"  # "reject" (422 / error de fila) o "flag" (aviso en la respuesta)
+
+    # Máximo de registros aceptados por POST /predict/batch
+    BATCH_MAX_SIZE: int = 50000
+
+    # Ejecutor de inferencia: "inline", "thread" o "process" (services/inference_executor.py)
+    INFERENCE_EXECUTOR: str = "thread"
+    INFERENCE_WORKERS: int = 4
+
+    # Micro-batching de predicciones individuales concurrentes
+    MICROBATCH_ENABLED: bool = False
+    MICROBATCH_WINDOW_MS: float = 2.0
+    MICROBATCH_MAX_SIZE: int = 64
+
+    # Caché de resultados por entrada canonicalizada y versión del modelo
+    PREDICTION_CACHE_ENABLED: bool = True
+    PREDICTION_CACHE_SIZE: int = 10000
+    PREDICTION_CACHE_TTL: float = 3600.0  # segundos
+
+    # Recarga del modelo en caliente: segundos entre comprobaciones de los pickles (0 = desactivado)
+    MODEL_WATCH_INTERVAL: float = 0.0
+
+    # Acceso a endpoints de administración: redes permitidas (CIDR separados por comas) y token opcional
+    ADMIN_NETWORKS: str = "127.0.0.1/32,::1/128"
+    ADMIN_TOKEN: str = ""
+
+    # Puntuación masiva de ficheros (python main.py score)
+    SCORE_CHUNK_SIZE: int = 100000
+    SCORE_WORKERS: int = 0  # 0 = un proceso por núcleo
+
+    # Retención: las predicciones con más de ARCHIVE_AFTER_DAYS días se pasan a Parquet
+    # (una partición date=AAAA-MM-DD por día) y se borran de la tabla (0 = desactivado)
+    ARCHIVE_AFTER_DAYS: int = 0
+    ARCHIVE_DIR: str = "data/archive"
+    ARCHIVE_CHUNK_SIZE: int = 50000     # filas por lectura del cursor y por fichero Parquet
+    ARCHIVE_DELETE_BATCH: int = 5000    # filas por DELETE
+    ARCHIVE_INTERVAL: float = 0.0       # segundos entre ejecuciones dentro de la API (0 = solo CLI)
+
+    # Agregados diarios (prediction_daily_stats): segundos entre actualizaciones (0 = desactivado)
+    ROLLUP_INTERVAL: float = 60.0
+    ROLLUP_BATCH_SIZE: int = 50000      # ids de predictions por transacción
+    # Solo se agregan filas con created_at anterior a este margen (segundos): una inserción con id
+    # menor que aún no ha hecho commit no debe quedar por detrás de la marca de agua
+    ROLLUP_GRACE_SECONDS: float = 60.0
+
+    # Exportación en streaming (GET /predictions/export): filas por lectura del cursor
+    EXPORT_CHUNK_SIZE: int = 5000
+
+    # Escritura diferida de predicciones (services/prediction_writer.py)
+    PERSISTENCE_WRITE_BEHIND: bool = True
+    PERSISTENCE_QUEUE_SIZE: int = 10000
+    PERSISTENCE_BATCH_SIZE: int = 500
+    PERSISTENCE_FLUSH_INTERVAL: float = 0.5   # segundos
+    PERSISTENCE_ENQUEUE_TIMEOUT: float = 2.0  # segundos de espera con la cola llena
+    PERSISTENCE_DRAIN_TIMEOUT: float = 10.0   # segundos para vaciar la cola al apagar
+    PERSISTENCE_MAX_RETRIES: int = 5          # reintentos de un lote fallido antes de descartarlo
+    PERSISTENCE_RETRY_BACKOFF: float = 0.5    # segundos antes del primer reintento; se duplica en cada uno
     
     # Configuración de base de datos
     MYSQL_USER: str = "jdomdev"
@@ -21,6 +99,21 @@ class Settings(BaseSettings):
     MYSQL_HOST: str = "localhost"
     MYSQL_DB: str = "heart_disease_db"
     MYSQL_PORT: str = "3306"
+    # URL SQLAlchemy completa; si se define sustituye a la de MySQL (p. ej. "sqlite:///./local.db")
+    DATABASE_URL: str = ""
+    # Inicialización de la BD: "startup" (en el lifespan), "lazy" (en el primer uso)
+    # o "skip" (no crea BD ni tablas; el esquema se gestiona fuera)
+    DB_INIT_MODE: str = "startup"
+    # Esquema compacto de la tabla predictions (TINYINT, código de edad, SMALLINT escalado).
+    # Una tabla existente se convierte con: python main.py migrate-compact
+    DB_COMPACT_SCHEMA: bool = False
+
+    # Pool de conexiones SQLAlchemy (db/database.py)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0     # segundos esperando una conexión libre
+    DB_POOL_RECYCLE: int = 1800       # segundos; por debajo del wait_timeout de MySQL
+    DB_POOL_PRE_PING: bool = True     # comprueba la conexión al sacarla: sobrevive a reinicios de MySQL
     
     # Método para obtener paths absolutos
     def get_features_path(self):
@@ -30,6 +123,10 @@ class Settings(BaseSettings):
         return Path(__file__).parent.parent / self.MODEL_PATH
     def get_model_info_path(self):
         return Path(__file__).parent.parent / self.MODEL_INFO_PATH
+    def get_compact_model_path(self):
+        return Path(__file__).parent.parent / self.COMPACT_MODEL_PATH
+    def get_archive_dir(self):
+        return Path(__file__).parent.parent / self.ARCHIVE_DIR
 
     class Config:
         case_sensitive = True
@@ -1,34 +1,130 @@
+import atexit
+import copy
+import json
 import logging
+import queue
 import sys
+import threading
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from core.config import settings
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# uvicorn les pone sus propios StreamHandler sin propagar: se reconducen a la cola
+LOGGERS_UVICORN = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+_listener = None
+_queue_handler = None
+_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """Una línea JSON por registro (LOG_FORMAT=json)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "timestamp": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """QueueHandler que deja el formato al hilo del listener.
+
+    QueueHandler.prepare formatea el registro en el hilo que llama (traceback
+    incluido) y borra exc_info, así que JsonFormatter nunca veía la excepción.
+    Aquí solo se fija el mensaje (los args podrían cambiar después) y exc_info
+    viaja con el registro.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def _parse_levels(raw: str) -> dict:
+    """'services.model_service=WARNING,sqlalchemy.engine=INFO' -> {logger: nivel}"""
+    niveles = {}
+    for item in raw.split(","):
+        if "=" in item:
+            nombre, nivel = item.split("=", 1)
+            niveles[nombre.strip()] = nivel.strip().upper()
+    return niveles
+
+
+def _route_uvicorn_loggers():
+    for nombre in LOGGERS_UVICORN:
+        uvicorn_logger = logging.getLogger(nombre)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
+
+
+def configure_logging() -> QueueListener:
+    """Configura el logging de la aplicación (se llama al arrancar, no al importar).
+
+    Los loggers solo encolan el registro (QueueHandler en el root); un hilo
+    QueueListener lo formatea y lo escribe en el fichero rotativo y en stdout,
+    fuera del camino de las peticiones. Los logs de uvicorn (access incluido)
+    van por la misma cola. Llamarla de nuevo no añade handlers.
+    """
+    global _listener, _queue_handler
+    with _lock:
+        # uvicorn puede haber configurado sus loggers después de la primera llamada
+        _route_uvicorn_loggers()
+        if _listener is not None:
+            return _listener
+
+        formatter = JsonFormatter() if settings.LOG_FORMAT == "json" else logging.Formatter(LOG_FORMAT)
+
+        # Handler para archivo
+        log_dir = Path(settings.LOG_DIR)
+        log_dir.mkdir(parents=True, exist_ok=True)
+        file_handler = RotatingFileHandler(
+            log_dir / "backend.log",
+            maxBytes=settings.LOG_FILE_MAX_BYTES,
+            backupCount=settings.LOG_FILE_BACKUPS
+        )
+        file_handler.setFormatter(formatter)
+
+        # Handler para consola
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(formatter)
+
+        cola = queue.SimpleQueue()
+        root = logging.getLogger()
+        _queue_handler = DeferredQueueHandler(cola)
+        root.addHandler(_queue_handler)
+        root.setLevel(settings.LOG_LEVEL.upper())
+
+        for nombre, nivel in _parse_levels(settings.LOG_LEVELS).items():
+            logging.getLogger(nombre).setLevel(nivel)
+
+        _listener = QueueListener(cola, file_handler, console_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        return _listener
+
+
+def shutdown_logging():
+    """Vacía la cola de logs y detiene el hilo escritor"""
+    global _listener, _queue_handler
+    with _lock:
+        if _listener is not None:
+            logging.getLogger().removeHandler(_queue_handler)
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener, _queue_handler = None, None
 
-# Crear directorio de logs si no existe
-log_dir = Path("logs")
-log_dir.mkdir(exist_ok=True)
 
-# Configuración básica
 def setup_logger(name: str) -> logging.Logger:
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
-
-    # Formato del log
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-
-    # Handler para archivo
-    file_handler = RotatingFileHandler(
-        log_dir / "backend.log",
-        maxBytes=10485760,  # 10MB
-        backupCount=5
-    )
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
-
-    # Handler para consola
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-
-    return logger 
\ No newline at end of file
+    """Devuelve el logger del módulo; los handlers viven solo en el root (ver configure_logging)"""
+    return logging.getLogger(name)
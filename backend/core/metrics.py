@@ -0,0 +1,232 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Límites (segundos) pensados para etapas que van de microsegundos a segundos
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _etiquetas(nombres: Sequence[str], valores: Tuple, extra: str = "") -> str:
+    partes = [f'{nombre}="{_escapar(valor)}"' for nombre, valor in zip(nombres, valores)]
+    if extra:
+        partes.append(extra)
+    return "{" + ",".join(partes) + "}" if partes else ""
+
+
+def _numero(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if not float(valor).is_integer() else str(int(valor))
+
+
+class _Metric:
+    tipo = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _clave(self, labels: Dict[str, str]) -> Tuple:
+        if labels.keys() != set(self.labelnames):
+            raise ValueError(f"{self.name} espera las etiquetas {self.labelnames}, recibió {tuple(labels)}")
+        return tuple(str(labels[nombre]) for nombre in self.labelnames)
+
+    def _cabecera(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.tipo}"]
+
+
+class Counter(_Metric):
+    """Contador monótono, opcionalmente con etiquetas"""
+    tipo = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._valores: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        clave = self._clave(labels)
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._valores.get(self._clave(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            valores = sorted(self._valores.items())
+        return self._cabecera() + [
+            f"{self.name}{_etiquetas(self.labelnames, clave)} {_numero(valor)}" for clave, valor in valores
+        ]
+
+
+class Gauge(_Metric):
+    """Valor instantáneo que se lee de una función al exponer las métricas"""
+    tipo = "gauge"
+
+    def __init__(self, name, documentation, function: Callable[[], float]):
+        super().__init__(name, documentation)
+        self.function = function
+
+    def render(self) -> List[str]:
+        try:
+            valor = float(self.function())
+        except Exception:
+            return []
+        return self._cabecera() + [f"{self.name} {_numero(valor)}"]
+
+
+class Histogram(_Metric):
+    """Histograma acumulativo con límites fijos (formato de Prometheus)"""
+    tipo = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Por combinación de etiquetas: [recuentos por límite (+Inf al final), suma]
+        self._series: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, **labels):
+        clave = self._clave(labels)
+        posicion = bisect_left(self.buckets, value)
+        with self._lock:
+            serie = self._series.get(clave)
+            if serie is None:
+                serie = self._series[clave] = [[0] * (len(self.buckets) + 1), 0.0]
+            serie[0][posicion] += 1
+            serie[1] += value
+
+    def count(self, **labels) -> int:
+        serie = self._series.get(self._clave(labels))
+        return sum(serie[0]) if serie else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = sorted((clave, (list(recuentos), suma)) for clave, (recuentos, suma) in self._series.items())
+        lineas = self._cabecera()
+        for clave, (recuentos, suma) in series:
+            acumulado = 0
+            for limite, recuento in zip(self.buckets + (float("inf"),), recuentos):
+                acumulado += recuento
+                etiquetas = _etiquetas(self.labelnames, clave, f'le="{_numero(limite)}"')
+                lineas.append(f"{self.name}_bucket{etiquetas} {acumulado}")
+            etiquetas = _etiquetas(self.labelnames, clave)
+            lineas.append(f"{self.name}_sum{etiquetas} {_numero(suma)}")
+            lineas.append(f"{self.name}_count{etiquetas} {acumulado}")
+        return lineas
+
+
+class MetricsRegistry:
+    """Métricas en memoria del proceso y su exposición en formato de texto de Prometheus"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _registrar(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existente = self._metrics.get(metric.name)
+            if existente is not None:
+                if type(existente) is not type(metric):
+                    raise ValueError(f"La métrica {metric.name} ya existe con otro tipo")
+                return existente
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._registrar(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._registrar(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name: str, documentation: str, function: Callable[[], float]) -> Gauge:
+        return self._registrar(Gauge(name, documentation, function))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        with self._lock:
+            metricas = list(self._metrics.values())
+        lineas = []
+        for metric in metricas:
+            lineas.extend(metric.render())
+        return "\n".join(lineas) + "\n"
+
+
+# Registro global que expone /metrics
+metrics = MetricsRegistry()
+
+STAGE_SECONDS = metrics.histogram(
+    "heartwise_stage_duration_seconds", "Duración de cada etapa de la predicción", ["stage"]
+)
+PREDICTIONS_TOTAL = metrics.counter(
+    "heartwise_predictions_total", "Predicciones realizadas por tipo de petición y resultado", ["kind", "result"]
+)
+PREDICTION_ERRORS_TOTAL = metrics.counter(
+    "heartwise_prediction_errors_total", "Predicciones que terminaron con excepción", ["kind"]
+)
+CACHE_LOOKUPS_TOTAL = metrics.counter(
+    "heartwise_cache_lookups_total", "Consultas a la caché de predicciones", ["result"]
+)
+PERSISTENCE_DROPPED_TOTAL = metrics.counter(
+    "heartwise_persistence_dropped_total", "Predicciones descartadas tras agotar los reintentos de escritura en BD"
+)
+HTTP_REQUESTS_TOTAL = metrics.counter(
+    "heartwise_http_requests_total", "Peticiones HTTP atendidas", ["method", "path", "status"]
+)
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    "heartwise_http_request_duration_seconds", "Duración de las peticiones HTTP", ["method", "path"]
+)
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """Mide la duración del bloque y la registra en heartwise_stage_duration_seconds"""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - inicio, stage=stage)
+
+
+class MetricsMiddleware:
+    """Middleware ASGI que cuenta y cronometra cada petición HTTP.
+
+    Usa la plantilla de la ruta (p. ej. /api/v1/routes/predict/) y no la URL
+    real, para que el número de series no crezca con los parámetros.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        inicio = time.perf_counter()
+        estado = {"status": 500}
+
+        async def send_con_estado(message):
+            if message["type"] == "http.response.start":
+                estado["status"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_con_estado)
+        finally:
+            ruta = scope.get("route")
+            path = getattr(ruta, "path", "unmatched")
+            metodo = scope["method"]
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - inicio, method=metodo, path=path)
+            HTTP_REQUESTS_TOTAL.inc(method=metodo, path=path, status=estado["status"])
@@ -0,0 +1,137 @@
+import asyncio
+import sys
+import threading
+import uuid
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+from fastapi import Request
+
+from core.config import settings
+from core.logging_config import setup_logger
+from core.security import is_admin_request
+
+logger = setup_logger(__name__)
+
+
+class PerfilCapturado:
+    """Se rellena con la ruta del fichero al cerrar la captura"""
+    path: Optional[Path] = None
+
+
+class _Muestreador(threading.Thread):
+    """Toma muestras periódicas de las pilas de todos los hilos (sys._current_frames).
+
+    Se muestrean todos los hilos porque la petición salta entre el event loop,
+    el pool de inferencia y la escritura en BD; cada pila empieza por el nombre
+    del hilo para poder separarlos en el flame graph.
+    """
+
+    def __init__(self, interval: float):
+        super().__init__(name="perfilador", daemon=True)
+        self.interval = interval
+        self.pilas: Counter = Counter()
+        self.muestras = 0
+        self._parar = threading.Event()
+
+    def run(self):
+        propio = threading.get_ident()
+        while not self._parar.wait(self.interval):
+            nombres = {hilo.ident: hilo.name for hilo in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == propio:
+                    continue
+                marcos = []
+                while frame is not None:
+                    codigo = frame.f_code
+                    marcos.append(f"{Path(codigo.co_filename).name}:{codigo.co_name}")
+                    frame = frame.f_back
+                marcos.append(nombres.get(ident, str(ident)))
+                self.pilas[";".join(reversed(marcos))] += 1
+            self.muestras += 1
+
+    def detener(self):
+        self._parar.set()
+        self.join()
+
+
+class RequestProfiler:
+    """Perfila una petición concreta y guarda sus pilas colapsadas en PROFILE_DIR
+    (formato de flamegraph.pl / speedscope).
+
+    Solo hay modo muestreo: un perfilador determinista (cProfile) en el hilo
+    del event loop mezclaría las demás peticiones en curso y no vería el pool
+    de inferencia. Solo se perfila una petición a la vez; si ya hay una
+    captura en curso, la siguiente se atiende sin perfilar. El directorio rota:
+    se conservan los max_files ficheros más recientes.
+    """
+
+    def __init__(self, directory: Optional[Path] = None, max_files: Optional[int] = None,
+                 interval: Optional[float] = None):
+        self._directory = directory
+        self.max_files = max_files if max_files is not None else settings.PROFILE_MAX_FILES
+        self.interval = interval if interval is not None else settings.PROFILE_SAMPLE_INTERVAL
+        self._lock = threading.Lock()
+
+    @property
+    def directory(self) -> Path:
+        return Path(self._directory or settings.PROFILE_DIR)
+
+    def _destino(self, etiqueta: str) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        nombre = f"{datetime.now():%Y%m%d-%H%M%S}-{etiqueta}-{uuid.uuid4().hex[:8]}.collapsed"
+        return self.directory / nombre
+
+    def _rotar(self):
+        ficheros = sorted(
+            (f for f in self.directory.iterdir() if f.is_file()),
+            key=lambda f: f.stat().st_mtime_ns, reverse=True
+        )
+        for antiguo in ficheros[self.max_files:]:
+            antiguo.unlink(missing_ok=True)
+
+    def _guardar(self, muestreador: _Muestreador, etiqueta: str) -> Path:
+        """Detiene el muestreo y escribe el perfil (bloqueante: se llama fuera del event loop)"""
+        muestreador.detener()
+        path = self._destino(etiqueta)
+        lineas = [f"{pila} {veces}" for pila, veces in muestreador.pilas.most_common()]
+        path.write_text("\n".join(lineas) + "\n", encoding="utf-8")
+        self._rotar()
+        return path
+
+    @asynccontextmanager
+    async def capture(self, etiqueta: str = "predict") -> AsyncIterator[Optional[PerfilCapturado]]:
+        """Perfila el bloque; devuelve None si ya hay otra captura en curso"""
+        if not self._lock.acquire(blocking=False):
+            logger.warning("⏭️ Perfilado omitido: ya hay otra captura en curso")
+            yield None
+            return
+        resultado = PerfilCapturado()
+        try:
+            muestreador = _Muestreador(self.interval)
+            muestreador.start()
+            try:
+                yield resultado
+            finally:
+                resultado.path = await asyncio.to_thread(self._guardar, muestreador, etiqueta)
+            logger.info(f"🔬 Perfil guardado en: {resultado.path}")
+        finally:
+            self._lock.release()
+
+
+def profile_requested(request: Request) -> bool:
+    """La petición pide perfilado con la cabecera X-Profile y viene de una red de administración"""
+    valor = request.headers.get("X-Profile", "").strip().lower()
+    if not valor or valor in ("0", "false", "no") or not settings.PROFILING_ENABLED:
+        return False
+    if not is_admin_request(request):
+        logger.warning("🚫 X-Profile ignorada: la petición no viene de una red de administración")
+        return False
+    return True
+
+
+# Instancia global usada por el endpoint de predicción
+request_profiler = RequestProfiler()
@@ -0,0 +1,33 @@
+import hmac
+import ipaddress
+from functools import lru_cache
+
+from fastapi import HTTPException, Request
+
+from core.config import settings
+
+
+@lru_cache(maxsize=1)
+def _admin_networks(raw: str):
+    return tuple(ipaddress.ip_network(red.strip(), strict=False) for red in raw.split(",") if red.strip())
+
+
+def is_admin_request(request: Request) -> bool:
+    """La petición viene de una red de administración y, si hay token configurado, lo incluye"""
+    host = request.client.host if request.client else None
+    try:
+        ip = ipaddress.ip_address(host)
+    except (TypeError, ValueError):
+        return False
+    if not any(ip in red for red in _admin_networks(settings.ADMIN_NETWORKS)):
+        return False
+    if settings.ADMIN_TOKEN:
+        token = request.headers.get("X-Admin-Token", "")
+        return hmac.compare_digest(token, settings.ADMIN_TOKEN)
+    return True
+
+
+def require_admin(request: Request):
+    """Dependencia de FastAPI para los endpoints de administración"""
+    if not is_admin_request(request):
+        raise HTTPException(status_code=403, detail="Acceso restringido a administración")
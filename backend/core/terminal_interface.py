@@ -1,5 +1,7 @@
+import asyncio
 from models.schemas import PredictionInput
 from services.translations_service import get_feature_descriptions, get_feature_translations
+from utils.mapping import MAPEO_ES_EN
 
 class TerminalInterface:
     def __init__(self, model):
@@ -10,13 +12,16 @@ class TerminalInterface:
     def collect_input(self):
         print("\n=== Evaluación de Riesgo Cardiovascular ===")
         user_data = {}
-        
-        for feature in self.model.feature_names_in_:
+
+        # Se piden los campos de entrada (el modelo usa columnas one-hot para la edad)
+        for campo, feature in MAPEO_ES_EN.items():
+            if feature not in self.descriptions or campo == "imc":
+                continue  # resultado/probabilidad no son entradas; el IMC se calcula
             esp_name = self.translations.get(feature, feature)
             desc = self.descriptions[feature]
-            
+
             print(f"\n{esp_name}: {desc['description']}")
-            
+
             if desc["type"] == "categorical":
                 print("Opciones válidas:")
                 for val, label in desc["values"].items():
@@ -30,16 +35,19 @@ class TerminalInterface:
                 while not desc['range'][0] <= float(value) <= desc['range'][1]:
                     print("¡Valor fuera de rango!")
                     value = input(f"Ingrese valor ({desc['range'][0]} a {desc['range'][1]}): ")
-            
-            user_data[feature] = float(value) if desc["type"] == "float" else value
-        
+
+            if desc["type"] != "categorical":
+                user_data[campo] = float(value)
+            else:
+                user_data[campo] = int(value) if value.isdigit() else value
+
         return PredictionInput(**user_data)
 
     def run(self):
         from services.model_service import make_prediction
         user_input = self.collect_input()
-        result = make_prediction(user_input)
-        
+        result = asyncio.run(make_prediction(user_input))
+
         print("\n=== Resultado ===")
-        print(f"Riesgo: {'ALTO' if result['prediction'] else 'BAJO'}")
-        print(f"Probabilidad: {result['probability']:.1%}")
+        print(f"Riesgo: {'ALTO' if result.prediction else 'BAJO'}")
+        print(f"Probabilidad: {result.probability:.1%}")
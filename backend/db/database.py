@@ -1,9 +1,13 @@
 import os
-from sqlalchemy import create_engine, text
+import threading
+from contextlib import contextmanager
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import NullPool
 from urllib.parse import quote_plus
 from pathlib import Path
 from dotenv import load_dotenv
+from core.config import settings
 import logging
 
 logger = logging.getLogger(__name__)
@@ -38,26 +42,108 @@ class DatabaseConfig:
         self.DB_PORT = os.getenv("MYSQL_PORT", "3306")
         self.DB_DRIVER = "pymysql"
         
-        self.DATABASE_URL = (
+        # DATABASE_URL permite apuntar a otra BD (p. ej. SQLite en tests y benchmarks)
+        self.DATABASE_URL = settings.DATABASE_URL or (
             f"mysql+{self.DB_DRIVER}://{self.DB_USER}:{self.DB_PASSWORD}@"
             f"{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
         )
-        logger.info(f"Database URL: {self.DATABASE_URL.replace(self.DB_PASSWORD, '*****')}")
+        if settings.DATABASE_URL:
+            logger.info("Database URL: definida por DATABASE_URL")
+        else:
+            logger.info(f"Database URL: {self.DATABASE_URL.replace(self.DB_PASSWORD, '*****')}")
         
         self.engine = None
-        self.SessionLocal = None
-    
-    def initialize(self):
-        """Establece la conexión a la base de datos"""
-        if not hasattr(self, 'SessionLocal') or self.SessionLocal is None:
+        self._session_factory = None
+        self._schema_ready = False
+        self._init_lock = threading.RLock()
+
+    @property
+    def is_mysql(self) -> bool:
+        return self.DATABASE_URL.startswith("mysql")
+
+    @property
+    def SessionLocal(self):
+        """Fábrica de sesiones; conecta bajo demanda si aún no se inicializó"""
+        self.ensure_ready()
+        return self._session_factory
+
+    def initialize(self, create_database: bool = True):
+        """Establece la conexión a la base de datos (idempotente)"""
+        with self._init_lock:
+            if self._session_factory is not None:
+                return False
             try:
-                self._create_database_if_not_exists()
+                if create_database and self.is_mysql:
+                    self._create_database_if_not_exists()
                 self._setup_main_connection()
                 logger.info(f"✅ Base de datos '{self.DB_NAME}' inicializada en {self.DB_HOST}")
                 return True
             except Exception as e:
                 logger.error(f"❌ Error de conexión: {str(e)}", exc_info=True)
                 raise
+
+    def create_schema(self):
+        """Crea las tablas que falten (idempotente)"""
+        with self._init_lock:
+            if self._schema_ready:
+                return
+            import db.models  # noqa: F401 (registra las tablas en Base.metadata)
+            Base.metadata.create_all(bind=self.engine)
+            faltan = self.missing_indexes()
+            if faltan:
+                # En una tabla grande crearlos bloquearía el arranque: se hace aparte
+                logger.warning(
+                    f"⚠ Faltan índices ({', '.join(indice.name for indice in faltan)}); "
+                    f"créelos con: python main.py create-indexes"
+                )
+            self._schema_ready = True
+
+    def missing_indexes(self) -> list:
+        """Índices declarados en los modelos que no existen en tablas ya creadas.
+
+        create_all solo crea índices junto con tablas nuevas; en una tabla creada
+        por una versión anterior hay que añadirlos aparte.
+        """
+        inspector = inspect(self.engine)
+        faltan = []
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existentes = {indice["name"] for indice in inspector.get_indexes(table.name)}
+            faltan.extend(indice for indice in table.indexes if indice.name not in existentes)
+        return faltan
+
+    def ensure_indexes(self):
+        """Crea los índices que falten (paso explícito: python main.py create-indexes)"""
+        for indice in self.missing_indexes():
+            logger.info(f"🛠 Creando índice {indice.name} en {indice.table.name}...")
+            indice.create(bind=self.engine)
+
+    def ensure_ready(self):
+        """Conecta y, según DB_INIT_MODE, crea el esquema si aún no se hizo (idempotente).
+
+        Es la entrada para todo lo que usa engine directamente (trabajos
+        periódicos, exportación): initialize() solo abre la conexión.
+        """
+        if self._session_factory is None or (not self._schema_ready and settings.DB_INIT_MODE != "skip"):
+            self._lazy_initialize()
+
+    def _lazy_initialize(self):
+        if settings.DB_INIT_MODE == "skip":
+            # El esquema lo gestiona otro proceso: solo se abre la conexión
+            self.initialize(create_database=False)
+        else:
+            self.initialize()
+            self.create_schema()
+
+    def startup(self):
+        """Paso explícito de arranque según DB_INIT_MODE (startup, lazy o skip)"""
+        if settings.DB_INIT_MODE == "startup":
+            self.initialize()
+            self.create_schema()
+            return True
+        logger.info(f"⏭ Inicialización de BD diferida (DB_INIT_MODE={settings.DB_INIT_MODE})")
+        return False
     
     def _create_database_if_not_exists(self):
         """Crea la base de datos si no existe"""
@@ -66,30 +152,79 @@ class DatabaseConfig:
             f"{self.DB_HOST}:{self.DB_PORT}/"
         )
         
-        temp_engine = create_engine(temp_url, pool_pre_ping=True)
-        
-        with temp_engine.connect() as conn:
-            conn.execute(text(f"CREATE DATABASE IF NOT EXISTS {self.DB_NAME}"))
-            conn.execute(text(f"USE {self.DB_NAME}"))
-            conn.commit()
+        # Conexión de un solo uso: no necesita pool
+        temp_engine = create_engine(temp_url, poolclass=NullPool)
+        try:
+            with temp_engine.connect() as conn:
+                conn.execute(text(f"CREATE DATABASE IF NOT EXISTS {self.DB_NAME}"))
+                conn.execute(text(f"USE {self.DB_NAME}"))
+                conn.commit()
+        finally:
+            temp_engine.dispose()
     
     def _setup_main_connection(self):
-        """Configura la conexión principal"""
-        self.engine = create_engine(
-            self.DATABASE_URL,
-            pool_pre_ping=True,
-            pool_recycle=3600
-        )
+        """Configura la conexión principal con el pool definido en Settings"""
+        if self.DATABASE_URL.startswith("sqlite"):
+            # SQLite elige su propio pool; las sesiones se usan desde varios hilos
+            self.engine = create_engine(self.DATABASE_URL, connect_args={"check_same_thread": False})
+        else:
+            self.engine = create_engine(
+                self.DATABASE_URL,
+                pool_size=settings.DB_POOL_SIZE,
+                max_overflow=settings.DB_MAX_OVERFLOW,
+                pool_timeout=settings.DB_POOL_TIMEOUT,
+                pool_recycle=settings.DB_POOL_RECYCLE,
+                pool_pre_ping=settings.DB_POOL_PRE_PING
+            )
         
-        self.SessionLocal = sessionmaker(
+        self._session_factory = sessionmaker(
             autocommit=False,
             autoflush=False,
             bind=self.engine
         )
 
+    @contextmanager
+    def session_scope(self):
+        """Sesión con commit al terminar, rollback si hay error y devolución al pool"""
+        db = self.SessionLocal()
+        try:
+            yield db
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def pool_status(self) -> dict:
+        """Estadísticas del pool de conexiones del engine principal"""
+        if self.engine is None:
+            return {"initialized": False}
+        pool = self.engine.pool
+        status = {"initialized": True, "class": type(pool).__name__, "status": pool.status()}
+        for metrica in ("size", "checkedin", "checkedout", "overflow"):
+            if hasattr(pool, metrica):
+                status[metrica] = getattr(pool, metrica)()
+        status.update({
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "timeout": settings.DB_POOL_TIMEOUT,
+            "recycle": settings.DB_POOL_RECYCLE,
+            "pre_ping": settings.DB_POOL_PRE_PING,
+        })
+        return status
+
 # Instancia global (para mantener compatibilidad con imports existentes)
+# La conexión se abre en el arranque de la API (db_config.startup) o en el primer uso
 db_config = DatabaseConfig()
-db_config.initialize()
+
+
+def get_db():
+    """Dependencia de FastAPI: una sesión por petición, devuelta al pool al terminar"""
+    db = db_config.SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
 
 # Exporta los nombres importantes
-__all__ = ['Base', 'db_config', 'DatabaseConfig']
\ No newline at end of file
+__all__ = ['Base', 'db_config', 'DatabaseConfig', 'get_db']
\ No newline at end of file
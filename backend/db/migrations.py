@@ -0,0 +1,119 @@
+import logging
+from typing import Optional
+
+from sqlalchemy import Integer, MetaData, case, cast, func, inspect, insert, select, text
+
+from core.config import settings
+from db.database import DatabaseConfig
+from db.models import COLUMNAS_ESCALADAS, predictions_table
+from db.types import AgeCategoryCode
+
+logger = logging.getLogger(__name__)
+
+TABLA = "predictions"
+TABLA_COMPACTA = "predictions_compact"
+TABLA_ANTERIOR = "predictions_legacy"
+
+
+def is_compact(engine) -> bool:
+    """La tabla predictions ya usa el esquema compacto (grupo de edad numérico)"""
+    columnas = {c["name"]: c["type"] for c in inspect(engine).get_columns(TABLA)}
+    return columnas["age_category"].python_type is int
+
+
+def _columnas_convertidas(origen):
+    """Expresiones SQL que convierten cada columna al formato compacto en el servidor"""
+    codigos = AgeCategoryCode.CODIGOS
+    columnas = []
+    for columna in origen.columns:
+        if columna.name == "age_category":
+            columnas.append(case(codigos, value=columna))
+        elif columna.name in COLUMNAS_ESCALADAS:
+            columnas.append(cast(func.round(columna * COLUMNAS_ESCALADAS[columna.name]), Integer))
+        else:
+            columnas.append(columna)
+    return columnas
+
+
+def copy_to_compact(engine, chunk_size: int = 50000) -> int:
+    """Copia las filas de predictions a predictions_compact por tramos de id.
+
+    Cada tramo es un INSERT ... SELECT en su propia transacción, con la
+    conversión hecha en la BD, así que los bloqueos duran poco y se puede
+    ejecutar con la API en marcha. Se reanuda desde el último id copiado, y al
+    terminar repite hasta alcanzar las filas insertadas mientras copiaba.
+    """
+    metadata = MetaData()
+    origen = predictions_table(metadata, TABLA, compact=False, indexes=False)
+    # Sin índices secundarios durante la carga: se crean una sola vez al final
+    destino = predictions_table(metadata, TABLA_COMPACTA, compact=True, indexes=False)
+    destino.create(engine, checkfirst=True)
+
+    with engine.connect() as conn:
+        desde = conn.execute(select(func.max(destino.c.id))).scalar() or 0
+    nombres = [c.name for c in destino.columns]
+    convertidas = _columnas_convertidas(origen)
+    copiadas = 0
+    while True:
+        with engine.connect() as conn:
+            ultimo = conn.execute(select(func.max(origen.c.id))).scalar() or 0
+        if desde >= ultimo:
+            break
+        while desde < ultimo:
+            hasta = min(desde + chunk_size, ultimo)
+            tramo = select(*convertidas).where(origen.c.id > desde, origen.c.id <= hasta)
+            with engine.begin() as conn:
+                resultado = conn.execute(insert(destino).from_select(nombres, tramo))
+            copiadas += max(resultado.rowcount or 0, 0)
+            desde = hasta
+            logger.info(f"📦 Copiadas hasta id {desde} de {ultimo} ({copiadas} filas en esta ejecución)")
+    return copiadas
+
+
+def _drop_indexes(engine, tabla: str, columnas: Optional[list] = None):
+    """Elimina los índices secundarios de la tabla, o solo los de esas columnas (los nombres son globales en SQLite)"""
+    for indice in inspect(engine).get_indexes(tabla):
+        if columnas is not None and indice["column_names"] != columnas:
+            continue
+        with engine.begin() as conn:
+            if engine.dialect.name == "mysql":
+                conn.execute(text(f"DROP INDEX `{indice['name']}` ON `{tabla}`"))
+            else:
+                conn.execute(text(f'DROP INDEX "{indice["name"]}"'))
+
+
+def swap_tables(engine):
+    """Pone la tabla compacta en lugar de predictions y conserva la anterior como predictions_legacy"""
+    with engine.begin() as conn:
+        if engine.dialect.name == "mysql":
+            # RENAME TABLE con dos pares es atómico en MySQL
+            conn.execute(text(f"RENAME TABLE {TABLA} TO {TABLA_ANTERIOR}, {TABLA_COMPACTA} TO {TABLA}"))
+        else:
+            conn.execute(text(f"ALTER TABLE {TABLA} RENAME TO {TABLA_ANTERIOR}"))
+            conn.execute(text(f"ALTER TABLE {TABLA_COMPACTA} RENAME TO {TABLA}"))
+    _drop_indexes(engine, TABLA_ANTERIOR)
+    # Tablas compactas creadas con versiones anteriores traen un índice sobre id que duplica la clave primaria
+    _drop_indexes(engine, TABLA, columnas=["id"])
+
+
+def migrate_to_compact(db: DatabaseConfig, chunk_size: int = 50000, swap: bool = True) -> int:
+    """Convierte la tabla predictions al esquema compacto.
+
+    Con swap=False solo copia (se puede repetir; continúa donde se quedó). El
+    cambio de tabla conviene hacerlo con la API parada para que no se pierdan
+    filas escritas entre la última copia y el renombrado; después se arranca
+    la API con DB_COMPACT_SCHEMA=true.
+    """
+    if swap and not settings.DB_COMPACT_SCHEMA:
+        raise ValueError("Ejecute la migración con DB_COMPACT_SCHEMA=true, el mismo valor con el que arrancará la API")
+    db.initialize(create_database=False)
+    if is_compact(db.engine):
+        logger.info("✅ La tabla predictions ya usa el esquema compacto")
+        return 0
+
+    copiadas = copy_to_compact(db.engine, chunk_size)
+    if swap:
+        swap_tables(db.engine)
+        db.ensure_indexes()
+        logger.info(f"✅ Tabla compacta activa; la anterior queda como {TABLA_ANTERIOR} (bórrela tras verificar)")
+    return copiadas
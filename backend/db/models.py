@@ -1,29 +1,85 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime
+from typing import List
+from sqlalchemy import Column, Integer, Float, String, Date, DateTime, Index, MetaData, Table
 from sqlalchemy.sql import func
+from core.config import settings
 from db.database import Base
+from db.types import AgeCategoryCode, ScaledInteger, TinyInteger
+
+# Columnas con pocos valores posibles (indicadores 0/1 y escalas cortas)
+COLUMNAS_PEQUENAS = (
+    "general_health", "checkup", "exercise", "skin_cancer", "other_cancer", "depression",
+    "diabetes", "arthritis", "sex", "smoking_history", "prediction_result",
+)
+# Columnas decimales y su escala en el esquema compacto (valor * escala en SMALLINT)
+COLUMNAS_ESCALADAS = {
+    "height": 10, "weight": 10, "bmi": 100,
+    "alcohol_consumption": 10, "fruit_consumption": 10,
+    "green_vegetables_consumption": 10, "fried_potato_consumption": 10,
+}
+ORDEN_COLUMNAS = (
+    "height", "weight", "bmi", "general_health", "age_category", "alcohol_consumption",
+    "fruit_consumption", "green_vegetables_consumption", "fried_potato_consumption", "checkup",
+    "exercise", "skin_cancer", "other_cancer", "depression", "diabetes", "arthritis", "sex",
+    "smoking_history", "prediction_result",
+)
+
+
+def prediction_columns(compact: bool) -> List[Column]:
+    """Columnas de la tabla de predicciones.
+
+    El esquema compacto (DB_COMPACT_SCHEMA) guarda indicadores en TINYINT, el
+    grupo de edad como código y los decimales como SMALLINT escalado: la fila
+    ocupa la mitad y caben el doble en el buffer pool. Los valores en Python
+    son los mismos en ambos esquemas. La clave primaria ya está indexada: id
+    no lleva índice secundario.
+    """
+    columnas = [Column("id", Integer, primary_key=True)]
+    for nombre in ORDEN_COLUMNAS:
+        if nombre == "age_category":
+            tipo = AgeCategoryCode() if compact else String(10)
+        elif nombre in COLUMNAS_PEQUENAS:
+            tipo = TinyInteger() if compact else Integer
+        else:
+            tipo = ScaledInteger(COLUMNAS_ESCALADAS[nombre]) if compact else Float
+        columnas.append(Column(nombre, tipo, nullable=False))
+    columnas.append(Column("probability", Float, nullable=False))
+    columnas.append(Column("created_at", DateTime(timezone=True), server_default=func.now(), nullable=False))
+    return columnas
+
+
+def prediction_indexes(tabla: str) -> List[Index]:
+    """Índices para el historial paginado por (created_at, id) y sus filtros"""
+    return [
+        Index(f"ix_{tabla}_created_at_id", "created_at", "id"),
+        Index(f"ix_{tabla}_result_created_at_id", "prediction_result", "created_at", "id"),
+        Index(f"ix_{tabla}_age_created_at_id", "age_category", "created_at", "id"),
+    ]
+
+
+def predictions_table(metadata: MetaData, nombre: str, compact: bool, indexes: bool = True) -> Table:
+    return Table(nombre, metadata, *prediction_columns(compact), *(prediction_indexes(nombre) if indexes else ()))
+
 
 class PredictionRecord(Base):
-    __tablename__ = "predictions"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    height = Column(Float, nullable=False)
-    weight = Column(Float, nullable=False)
-    bmi = Column(Float, nullable=False)
-    general_health = Column(Integer, nullable=False)
-    age_category = Column(String(10), nullable=False)
-    alcohol_consumption = Column(Float, nullable=False)
-    fruit_consumption = Column(Float, nullable=False)
-    green_vegetables_consumption = Column(Float, nullable=False)
-    fried_potato_consumption = Column(Float, nullable=False)
-    checkup = Column(Integer, nullable=False)
-    exercise = Column(Integer, nullable=False)
-    skin_cancer = Column(Integer, nullable=False)
-    other_cancer = Column(Integer, nullable=False)
-    depression = Column(Integer, nullable=False)
-    diabetes = Column(Integer, nullable=False)
-    arthritis = Column(Integer, nullable=False)
-    sex = Column(Integer, nullable=False)
-    smoking_history = Column(Integer, nullable=False)
-    prediction_result = Column(Integer, nullable=False)
-    probability = Column(Float, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    __table__ = predictions_table(Base.metadata, "predictions", settings.DB_COMPACT_SCHEMA)
+
+
+class PredictionDailyStat(Base):
+    """Agregado diario de predicciones por grupo de edad, sexo y resultado"""
+    __tablename__ = "prediction_daily_stats"
+
+    day = Column(Date, primary_key=True)
+    age_category = Column(String(10), primary_key=True)
+    sex = Column(Integer, primary_key=True)
+    prediction_result = Column(Integer, primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    probability_sum = Column(Float, nullable=False, default=0.0)
+
+
+class RollupWatermark(Base):
+    """Último id de predictions ya incluido en cada agregado"""
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String(50), primary_key=True)
+    last_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,80 @@
+import math
+
+from sqlalchemy import SmallInteger
+from sqlalchemy.dialects import mysql
+from sqlalchemy.types import TypeDecorator
+
+from utils.mapping import CATEGORIAS_EDAD
+
+
+class TinyInteger(TypeDecorator):
+    """Entero de 1 byte sin signo en MySQL (TINYINT UNSIGNED); SMALLINT en el resto"""
+    impl = SmallInteger
+    cache_ok = True
+
+    @property
+    def python_type(self):
+        return int
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "mysql":
+            return dialect.type_descriptor(mysql.TINYINT(unsigned=True))
+        return dialect.type_descriptor(SmallInteger())
+
+
+class ScaledInteger(TypeDecorator):
+    """Decimal con precisión fija guardado como SMALLINT UNSIGNED (valor * scale).
+
+    170.5 cm con scale=10 se guarda como 1705 en 2 bytes en lugar de un FLOAT de 4;
+    los decimales por debajo de 1/scale se redondean hacia arriba desde la mitad,
+    igual que ROUND() en SQL (la migración convierte en la BD).
+    """
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, scale: int):
+        super().__init__()
+        self.scale = scale
+
+    @property
+    def python_type(self):
+        return float
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "mysql":
+            return dialect.type_descriptor(mysql.SMALLINT(unsigned=True))
+        return dialect.type_descriptor(SmallInteger())
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else math.floor(float(value) * self.scale + 0.5)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else value / self.scale
+
+
+class AgeCategoryCode(TypeDecorator):
+    """Grupo de edad guardado como código de 1 byte (posición en CATEGORIAS_EDAD)"""
+    impl = SmallInteger
+    cache_ok = True
+
+    CODIGOS = {categoria: codigo for codigo, categoria in enumerate(CATEGORIAS_EDAD)}
+
+    @property
+    def python_type(self):
+        return str
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "mysql":
+            return dialect.type_descriptor(mysql.TINYINT(unsigned=True))
+        return dialect.type_descriptor(SmallInteger())
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        try:
+            return self.CODIGOS[value]
+        except KeyError:
+            raise ValueError(f"Grupo de edad desconocido: {value}") from None
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else CATEGORIAS_EDAD[value]
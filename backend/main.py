@@ -1,44 +1,66 @@
 from contextlib import asynccontextmanager
-from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from core.config import settings
+from core.logging_config import configure_logging, setup_logger
+from core.metrics import MetricsMiddleware, metrics
 from core.terminal_interface import TerminalInterface
-import joblib
-from pathlib import Path
 import sys
-import logging
 from db.database import db_config
-from db.models import Base
+from services.model_registry import model_registry
+from services.prediction_writer import prediction_writer
+from services.inference_executor import inference_executor
+from services.model_service import micro_batcher
+from services.model_reloader import model_file_watcher
+from services.prediction_archive import archive_scheduler
+from services.prediction_rollup import rollup_scheduler
+from services.input_validation import current_rules
 
 
-# Configuración básica de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
+logger = setup_logger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Logging asíncrono (cola + hilo escritor), también para los loggers de uvicorn
+    configure_logging()
     try:
-        # Inicializar base de datos
-        db_config.initialize()
-        Base.metadata.create_all(bind=db_config.engine)
-        logger.info("✅ Base de datos inicializada correctamente")
-        
-        # Cargar modelo
-        global model
-        MODEL_PATH = Path(__file__).parent / settings.MODEL_PATH
-        model = joblib.load(MODEL_PATH)
-        logger.info(f"✅ Modelo cargado desde: {MODEL_PATH}")
+        # Inicializar base de datos (según DB_INIT_MODE)
+        if db_config.startup():
+            logger.info("✅ Base de datos inicializada correctamente")
         
-        yield  # Application runs here
+        # Compilar las reglas de validación desde features_description.json
+        current_rules()
+
+        # Cargar modelo una sola vez en el registro compartido
+        model_registry.load()
+        inference_executor.start()
+        if settings.MICROBATCH_ENABLED:
+            await micro_batcher.start()
+        await model_file_watcher.start()
+
+        # Arrancar la escritura diferida de predicciones
+        if settings.PERSISTENCE_WRITE_BEHIND:
+            await prediction_writer.start()
 
+        # Trabajos periódicos: agregados diarios (ROLLUP_INTERVAL) y retención (ARCHIVE_INTERVAL)
+        await rollup_scheduler.start()
+        await archive_scheduler.start()
+        
     except Exception as e:
         logger.error(f"❌ Error durante el startup: {str(e)}")
         raise
 
+    yield  # Application runs here
+
+    # Apagado: vaciar las predicciones pendientes antes de salir
+    await archive_scheduler.stop()
+    await rollup_scheduler.stop()
+    await model_file_watcher.stop()
+    await micro_batcher.stop()
+    await prediction_writer.stop()
+    inference_executor.shutdown()
+
 # Crea UNA sola instancia de FastAPI con lifespan
 app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
@@ -50,32 +72,135 @@ app.add_middleware(
     allow_methods=["POST"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint():
+    """Métricas en memoria (etapas, contadores, histogramas) en formato de texto de Prometheus"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 # Configuración de rutas API
 from api.v1.routes.predict import router as predict_router
+from api.v1.routes.admin import router as admin_router
+from api.v1.routes.predictions import router as predictions_router
 app.include_router(predict_router, prefix=settings.API_V1_STR)
+app.include_router(admin_router, prefix=settings.API_V1_STR)
+app.include_router(predictions_router, prefix=settings.API_V1_STR)
 
 
 def run_terminal_interface():
     """Ejecuta la interfaz de terminal"""
     try:
-        terminal = TerminalInterface(model)
-        terminal.run()
-    except Exception as e:
-        logger.error(f"❌ Error en la interfaz de terminal: {str(e)}")
-        raise
-    try:
-        terminal = TerminalInterface(model)
+        terminal = TerminalInterface(model_registry.get().model)
         terminal.run()
     except Exception as e:
         logger.error(f"❌ Error en la interfaz de terminal: {str(e)}")
         raise
 
+def run_export_model(argv):
+    """Exporta el modelo pickle al formato compacto (.npz) y comprueba que puntúa igual: python main.py export-model"""
+    import argparse
+    import numpy as np
+    from services.compact_model import export_compact_model, load_compact_model
+    from services.model_registry import ModelRegistry, SMOKE_INPUT, predict_proba
+
+    parser = argparse.ArgumentParser(prog="main.py export-model", description=run_export_model.__doc__)
+    parser.add_argument("--output", default=None,
+                        help=f"fichero .npz de destino (por defecto {settings.get_compact_model_path()})")
+    args = parser.parse_args(argv)
+
+    handle = ModelRegistry(model_format="pickle").get()
+    destino = export_compact_model(
+        handle.model,
+        {"umbral_optimo": handle.umbral_optimo, "variables": list(handle.variables)},
+        args.output or settings.get_compact_model_path()
+    )
+    compacto, _ = load_compact_model(destino)
+    features = handle.encoder.encode(SMOKE_INPUT)
+    if not np.allclose(compacto.predict_proba(features), predict_proba(handle.model, features)):
+        raise ValueError("El modelo compacto no reproduce predict_proba del original")
+    logger.info(f"💾 Modelo compacto exportado en: {destino}")
+
+
+def run_score(argv):
+    """Puntúa un CSV/Parquet completo sin pasar por la API: python main.py score entrada salida"""
+    import argparse
+    from services.bulk_scoring import score_file
+
+    parser = argparse.ArgumentParser(prog="main.py score", description=run_score.__doc__)
+    parser.add_argument("entrada", help="fichero .csv o .parquet con columnas en español o inglés")
+    parser.add_argument("salida", help="fichero .csv o .parquet de resultados")
+    parser.add_argument("--chunk-size", type=int, default=settings.SCORE_CHUNK_SIZE, help="filas por bloque")
+    parser.add_argument("--workers", type=int, default=settings.SCORE_WORKERS, help="procesos (0 = uno por núcleo)")
+    args = parser.parse_args(argv)
+
+    stats = score_file(args.entrada, args.salida, chunk_size=args.chunk_size, workers=args.workers)
+    logger.info(
+        f"✅ {stats.rows} filas en {stats.seconds:.1f}s ({stats.rows / max(stats.seconds, 1e-9):.0f} filas/s): "
+        f"{stats.scored} puntuadas, {stats.positives} con riesgo alto, {stats.rejected} rechazadas"
+    )
+
+
+def run_migrate_compact(argv):
+    """Pasa la tabla predictions al esquema compacto: python main.py migrate-compact"""
+    import argparse
+    from db.database import db_config
+    from db.migrations import migrate_to_compact
+
+    parser = argparse.ArgumentParser(prog="main.py migrate-compact", description=run_migrate_compact.__doc__)
+    parser.add_argument("--chunk-size", type=int, default=50000, help="filas por tramo de copia")
+    parser.add_argument("--copy-only", action="store_true",
+                        help="solo copia (se puede ejecutar con la API en marcha y repetir)")
+    args = parser.parse_args(argv)
+
+    copiadas = migrate_to_compact(db_config, chunk_size=args.chunk_size, swap=not args.copy_only)
+    logger.info(f"✅ Migración terminada: {copiadas} filas copiadas")
+
+
+def run_create_indexes():
+    """Crea los índices que falten en tablas existentes: python main.py create-indexes"""
+    import db.models  # noqa: F401 (registra las tablas en Base.metadata)
+
+    db_config.initialize()
+    db_config.ensure_indexes()
+    logger.info("✅ Índices al día")
+
+
+def run_archive(argv):
+    """Archiva en Parquet y borra las predicciones antiguas: python main.py archive --days N"""
+    import argparse
+    from services.prediction_archive import archive_predictions
+
+    parser = argparse.ArgumentParser(prog="main.py archive", description=run_archive.__doc__)
+    parser.add_argument("--days", type=int, default=settings.ARCHIVE_AFTER_DAYS, help="antigüedad mínima en días")
+    parser.add_argument("--dir", default=None, help=f"directorio de destino (por defecto {settings.ARCHIVE_DIR})")
+    parser.add_argument("--chunk-size", type=int, default=settings.ARCHIVE_CHUNK_SIZE, help="filas por fichero")
+    args = parser.parse_args(argv)
+
+    stats = archive_predictions(older_than_days=args.days, archive_dir=args.dir, chunk_size=args.chunk_size)
+    logger.info(
+        f"✅ {stats.archived} predicciones archivadas en {stats.files} ficheros ({stats.days} días), "
+        f"{stats.deleted} borradas de la tabla"
+    )
+
+
 if __name__ == "__main__":
-    if "--terminal" in sys.argv or "-t" in sys.argv:
+    configure_logging()
+    if len(sys.argv) > 1 and sys.argv[1] == "score":
+        run_score(sys.argv[2:])
+    elif len(sys.argv) > 1 and sys.argv[1] == "migrate-compact":
+        run_migrate_compact(sys.argv[2:])
+    elif len(sys.argv) > 1 and sys.argv[1] == "create-indexes":
+        run_create_indexes()
+    elif len(sys.argv) > 1 and sys.argv[1] == "archive":
+        run_archive(sys.argv[2:])
+    elif len(sys.argv) > 1 and sys.argv[1] == "export-model":
+        run_export_model(sys.argv[2:])
+    elif "--terminal" in sys.argv or "-t" in sys.argv:
         run_terminal_interface()
     else:
         import uvicorn
-        uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
-        uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
\ No newline at end of file
+        # Sin log_config uvicorn no añade handlers propios: sus logs van a la cola del root
+        uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info", log_config=None)
\ No newline at end of file
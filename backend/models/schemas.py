@@ -1,5 +1,8 @@
-from pydantic import BaseModel
-from typing import Literal
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, ValidationInfo, field_validator, model_validator
+from datetime import date, datetime
+from typing import Any, Dict, List, Literal, Optional
+from core.config import settings
+from services.input_validation import SKIP_METADATA_CHECKS, calcular_imc, current_rules, revisar_imc
 from utils.mapping import MAPEO_ES_EN
 
 # Tipos para categorías
@@ -13,7 +16,7 @@ class PredictionInput(BaseModel):
     """Esquema para datos de entrada en español"""
     altura: float
     peso: float
-    imc: float
+    imc: Optional[float] = None  # si se omite se calcula a partir de altura y peso
     salud_general: GeneralHealthOptions
     consumo_alcohol: float
     consumo_fruta: float
@@ -30,6 +33,46 @@ class PredictionInput(BaseModel):
     historial_tabaquismo: int
     edad: AgeCategoryOptions
 
+    _avisos: List[str] = PrivateAttr(default_factory=list)
+
+    @field_validator("*")
+    @classmethod
+    def validar_con_metadatos(cls, value, info: ValidationInfo):
+        """Aplica los rangos y valores válidos definidos en features_description.json"""
+        if info.context and info.context.get(SKIP_METADATA_CHECKS):
+            return value
+        regla = current_rules().get(info.field_name)
+        if regla is not None and value is not None:
+            mensaje = regla.error(value)
+            if mensaje:
+                raise ValueError(mensaje)
+        return value
+
+    @model_validator(mode="after")
+    def derivar_imc(self, info: ValidationInfo):
+        """Calcula el IMC si falta y comprueba que el recibido cuadre con altura y peso"""
+        if info.context and info.context.get(SKIP_METADATA_CHECKS):
+            return self
+        calculado = calcular_imc(self.peso, self.altura)
+        if self.imc is None:
+            regla = current_rules().get("imc")
+            mensaje = regla.error(calculado) if regla is not None else None
+            if mensaje:
+                raise ValueError(f"IMC calculado a partir de altura y peso: {mensaje}")
+            self.imc = float(calculado)
+            return self
+        problema, rechazar = revisar_imc(self.imc, calculado)
+        if problema and rechazar:
+            raise ValueError(problema)
+        if problema:
+            self._avisos.append(problema)
+        return self
+
+    @property
+    def avisos(self) -> List[str]:
+        """Advertencias no bloqueantes detectadas al validar (p. ej. IMC incoherente)"""
+        return self._avisos
+
     def to_english_dict(self):
         """Convierte los nombres a inglés para el modelo"""
         return {
@@ -43,6 +86,7 @@ class PredictionOutput(BaseModel):
     prediction: int  # 0 o 1
     probability: float
     message: str
+    warnings: List[str] = []
 
     class Config:
         schema_extra = {
@@ -53,3 +97,81 @@ class PredictionOutput(BaseModel):
             }
         }
 
+
+class BatchPredictionInput(BaseModel):
+    """Esquema para puntuar varios pacientes en una sola petición.
+
+    Cada registro se valida por separado: uno que no sea un objeto se devuelve
+    como error de su fila, no invalida el lote.
+    """
+    records: List[Any] = Field(..., min_length=1, max_length=settings.BATCH_MAX_SIZE)
+
+
+class BatchPredictionItem(PredictionOutput):
+    """Predicción de un registro del lote (index = posición en la petición)"""
+    index: int
+
+
+class BatchRowError(BaseModel):
+    """Errores de validación de un registro del lote"""
+    index: int
+    errors: List[Dict[str, Any]]
+
+
+class BatchPredictionOutput(BaseModel):
+    """Esquema para la respuesta de predicción por lotes"""
+    total: int
+    scored: int
+    predictions: List[BatchPredictionItem]
+    errors: List[BatchRowError]
+
+
+class PredictionRecordOut(BaseModel):
+    """Predicción guardada en BD (nombres de columna de la tabla predictions)"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    created_at: datetime
+    height: float
+    weight: float
+    bmi: float
+    general_health: int
+    age_category: str
+    alcohol_consumption: float
+    fruit_consumption: float
+    green_vegetables_consumption: float
+    fried_potato_consumption: float
+    checkup: int
+    exercise: int
+    skin_cancer: int
+    other_cancer: int
+    depression: int
+    diabetes: int
+    arthritis: int
+    sex: int
+    smoking_history: int
+    prediction_result: int
+    probability: float
+
+
+class PredictionPage(BaseModel):
+    """Página del historial; next_cursor es None en la última página"""
+    items: List[PredictionRecordOut]
+    next_cursor: Optional[str] = None
+
+
+class PredictionStatsRow(BaseModel):
+    """Totales de un día; age_category y sex solo aparecen si se agrupa por ellos"""
+    day: date
+    age_category: Optional[str] = None
+    sex: Optional[int] = None
+    total: int
+    high_risk: int
+    high_risk_rate: float
+    mean_probability: float
+
+
+class PredictionStats(BaseModel):
+    """Agregados diarios; last_id es la última predicción incluida"""
+    rows: List[PredictionStatsRow]
+    last_id: int
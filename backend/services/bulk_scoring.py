@@ -0,0 +1,225 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from core.config import settings
+from core.logging_config import setup_logger
+from utils.mapping import MAPEO_ES_EN, VALORES_CVD
+from .feature_encoder import MAPEO_EN_ES
+from .input_validation import bmi_column_check, rule_violations
+from .model_registry import ModelHandle, model_registry, predict_proba
+
+logger = setup_logger(__name__)
+
+CAMPOS_ENTRADA = [campo for campo in MAPEO_ES_EN if campo not in ("resultado", "probabilidad")]
+CAMPOS_NUMERICOS = [campo for campo in CAMPOS_ENTRADA if campo != "edad"]
+EXTENSIONES_CSV = (".csv", ".txt")
+EXTENSIONES_PARQUET = (".parquet", ".pq")
+
+
+@dataclass
+class ScoringStats:
+    """Resumen de una puntuación masiva"""
+    rows: int = 0
+    scored: int = 0
+    rejected: int = 0
+    positives: int = 0
+    seconds: float = 0.0
+
+    def add(self, bloque: pd.DataFrame):
+        self.rows += len(bloque)
+        validas = bloque["prediccion"].notna()
+        self.scored += int(validas.sum())
+        self.rejected += int((~validas).sum())
+        self.positives += int((bloque["prediccion"] == 1).sum())
+
+
+def _formato(path: Path) -> str:
+    extension = Path(path).suffix.lower()
+    if extension in EXTENSIONES_CSV:
+        return "csv"
+    if extension in EXTENSIONES_PARQUET:
+        return "parquet"
+    raise ValueError(f"Formato no soportado: {path} (use .csv o .parquet)")
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise RuntimeError("Leer o escribir Parquet requiere pyarrow (pip install pyarrow)") from e
+    return pyarrow
+
+
+def read_chunks(path: Path, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Lee el fichero por bloques de chunk_size filas sin cargarlo entero en memoria"""
+    if _formato(path) == "csv":
+        yield from pd.read_csv(path, chunksize=chunk_size)
+    else:
+        pa = _pyarrow()
+        for lote in pa.parquet.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield lote.to_pandas()
+
+
+def _decode_categories(serie: pd.Series, valores: dict) -> pd.Series:
+    """Traduce las categorías en texto del dataset CVD a su código; lo demás se deja tal cual"""
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie
+    codigos = serie.map(valores)
+    return codigos.where(codigos.notna(), serie)
+
+
+def normalize_columns(bloque: pd.DataFrame) -> pd.DataFrame:
+    """Acepta columnas en español (PredictionInput) o en inglés (dataset CVD).
+
+    Con columnas en inglés también acepta los valores en texto del dataset
+    original ("Yes"/"No", "Female", "Very Good"...), que se pasan a sus códigos.
+    """
+    renombrar = {c: MAPEO_EN_ES[c] for c in bloque.columns if c in MAPEO_EN_ES and MAPEO_EN_ES[c] not in bloque}
+    decodificadas = {c: _decode_categories(bloque[c], VALORES_CVD[c]) for c in renombrar if c in VALORES_CVD}
+    bloque = bloque.assign(**decodificadas).rename(columns=renombrar)
+    faltan = [campo for campo in CAMPOS_ENTRADA if campo != "imc" and campo not in bloque]
+    if faltan:
+        raise ValueError(f"Faltan columnas obligatorias: {', '.join(faltan)}")
+    return bloque
+
+
+def score_frame(bloque: pd.DataFrame, handle: ModelHandle) -> pd.DataFrame:
+    """Valida, codifica y puntúa un bloque entero con operaciones vectorizadas.
+
+    Devuelve el bloque original con las columnas probabilidad, prediccion y
+    error; las filas inválidas quedan sin puntuar y con el motivo en error.
+    """
+    entrada = normalize_columns(bloque)
+    n = len(entrada)
+    columnas = {
+        campo: pd.to_numeric(entrada[campo], errors="coerce").to_numpy(dtype=np.float64)
+        for campo in CAMPOS_NUMERICOS if campo in entrada
+    }
+    columnas["edad"] = entrada["edad"].astype(str).to_numpy()
+
+    problemas = {
+        campo: np.isnan(valores) for campo, valores in columnas.items() if campo not in ("imc", "edad")
+    }
+    imc = columnas.get("imc", np.full(n, np.nan))
+    calculado, fuera_de_rango, incoherentes = bmi_column_check(columnas["altura"], columnas["peso"], imc)
+    columnas["imc"] = np.where(np.isnan(imc), calculado, imc)
+    problemas["imc"] = fuera_de_rango
+    if settings.BMI_MISMATCH_POLICY == "reject":
+        problemas["imc"] = fuera_de_rango | incoherentes
+    for campo, invalidas in rule_violations(columnas).items():
+        problemas[campo] = problemas.get(campo, False) | invalidas
+
+    invalidas = np.zeros(n, dtype=bool)
+    for mascara in problemas.values():
+        invalidas |= mascara
+    validas = ~invalidas
+
+    probabilidad = np.full(n, np.nan)
+    if validas.any():
+        features = handle.encoder.encode_columns({campo: valores[validas] for campo, valores in columnas.items()})
+        probabilidad[validas] = predict_proba(handle.model, features)[:, 1]
+
+    errores = np.full(n, "", dtype=object)
+    for fila in np.flatnonzero(invalidas):
+        errores[fila] = "campos inválidos: " + ", ".join(c for c, m in problemas.items() if m[fila])
+
+    prediccion = pd.array((probabilidad > handle.umbral_optimo).astype(np.int8), dtype="Int8")
+    prediccion[invalidas] = pd.NA
+
+    salida = bloque.copy()
+    salida["probabilidad"] = probabilidad
+    salida["prediccion"] = prediccion
+    salida["error"] = errores
+    return salida
+
+
+class _EscritorSalida:
+    """Escribe los bloques puntuados a medida que llegan (CSV o Parquet)"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.formato = _formato(self.path)
+        self._parquet = None
+        self._schema = None
+        self._primero = True
+
+    def write(self, bloque: pd.DataFrame):
+        if self.formato == "csv":
+            bloque.to_csv(self.path, mode="w" if self._primero else "a", header=self._primero, index=False)
+        else:
+            pa = _pyarrow()
+            tabla = pa.Table.from_pandas(bloque, preserve_index=False)
+            if self._parquet is None:
+                # Enteros como float y columnas vacías como texto: los bloques siguientes
+                # pueden traer NaN o valores donde el primero no tenía
+                self._schema = pa.schema([
+                    pa.field(f.name, pa.float64()) if pa.types.is_integer(f.type) and f.name != "prediccion"
+                    else pa.field(f.name, pa.string()) if pa.types.is_null(f.type)
+                    else f
+                    for f in tabla.schema
+                ])
+                self._parquet = pa.parquet.ParquetWriter(self.path, self._schema)
+            self._parquet.write_table(tabla.select(self._schema.names).cast(self._schema))
+        self._primero = False
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+def _init_worker():
+    """Inicializador de cada proceso: precarga el modelo una sola vez"""
+    model_registry.get()
+
+
+def _score_in_worker(bloque: pd.DataFrame) -> pd.DataFrame:
+    return score_frame(bloque, model_registry.get())
+
+
+def score_file(entrada: Path, salida: Path, chunk_size: Optional[int] = None,
+               workers: Optional[int] = None) -> ScoringStats:
+    """Puntúa un CSV/Parquet por bloques y escribe el resultado de forma incremental.
+
+    Con varios workers cada bloque se puntúa en un proceso distinto; como mucho
+    hay 2 bloques por worker en vuelo, así que la memoria no depende del tamaño
+    del fichero. El orden de las filas se conserva.
+    """
+    chunk_size = chunk_size or settings.SCORE_CHUNK_SIZE
+    workers = workers or settings.SCORE_WORKERS or os.cpu_count() or 1
+    stats = ScoringStats()
+    escritor = _EscritorSalida(salida)
+    _formato(entrada)
+    inicio = time.perf_counter()
+
+    def escribir(bloque: pd.DataFrame):
+        escritor.write(bloque)
+        stats.add(bloque)
+        logger.info(f"💾 {stats.rows} filas puntuadas ({stats.rejected} rechazadas)")
+
+    try:
+        if workers <= 1:
+            handle = model_registry.get()
+            for bloque in read_chunks(entrada, chunk_size):
+                escribir(score_frame(bloque, handle))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+                pendientes = deque()
+                for bloque in read_chunks(entrada, chunk_size):
+                    pendientes.append(pool.submit(_score_in_worker, bloque))
+                    if len(pendientes) >= workers * 2:
+                        escribir(pendientes.popleft().result())
+                while pendientes:
+                    escribir(pendientes.popleft().result())
+    finally:
+        escritor.close()
+    stats.seconds = time.perf_counter() - inicio
+    return stats
@@ -0,0 +1,86 @@
+from pathlib import Path
+from typing import Sequence, Tuple
+
+import numpy as np
+
+# Versión del formato .npz; se incrementa si cambian los arrays guardados
+FORMATO_COMPACTO = 1
+
+
+def _expit(x: np.ndarray) -> np.ndarray:
+    """Sigmoide logística numéricamente estable (equivale a scipy.special.expit)"""
+    out = np.empty_like(x, dtype=np.float64)
+    positivos = x >= 0
+    out[positivos] = 1.0 / (1.0 + np.exp(-x[positivos]))
+    exp_x = np.exp(x[~positivos])
+    out[~positivos] = exp_x / (1.0 + exp_x)
+    return out
+
+
+class CompactLinearModel:
+    """Modelo lineal binario puntuado solo con NumPy.
+
+    Reproduce predict_proba de los clasificadores lineales de sklearn
+    (LinearDiscriminantAnalysis, LogisticRegression) sin importar sklearn
+    ni deserializar un pickle.
+    """
+
+    def __init__(self, coef: np.ndarray, intercept: np.ndarray, classes: np.ndarray,
+                 feature_names: Sequence[str] = ()):
+        self.coef_ = np.asarray(coef, dtype=np.float64).reshape(1, -1)
+        self.intercept_ = np.asarray(intercept, dtype=np.float64).reshape(1)
+        self.classes_ = np.asarray(classes)
+        if feature_names:
+            self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+
+    @property
+    def n_features_in_(self) -> int:
+        return self.coef_.shape[1]
+
+    def decision_function(self, X) -> np.ndarray:
+        return np.asarray(X, dtype=np.float64) @ self.coef_[0] + self.intercept_[0]
+
+    def predict_proba(self, X) -> np.ndarray:
+        positiva = _expit(self.decision_function(X))
+        return np.column_stack((1.0 - positiva, positiva))
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[(self.decision_function(X) > 0).astype(int)]
+
+
+def export_compact_model(model, info_modelo: dict, path: Path) -> Path:
+    """Guarda coeficientes, umbral_optimo y variables del modelo en un .npz"""
+    coef = getattr(model, "coef_", None)
+    intercept = getattr(model, "intercept_", None)
+    classes = getattr(model, "classes_", None)
+    if coef is None or intercept is None or classes is None or not hasattr(model, "predict_proba"):
+        raise ValueError(f"{type(model).__name__} no es un clasificador lineal exportable")
+    if len(classes) != 2 or np.asarray(coef).shape[0] != 1:
+        raise ValueError("Solo se pueden exportar clasificadores binarios")
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as f:
+        np.savez_compressed(
+            f,
+            formato=np.int64(FORMATO_COMPACTO),
+            estimador=np.str_(type(model).__name__),
+            coef=np.asarray(coef, dtype=np.float64),
+            intercept=np.asarray(intercept, dtype=np.float64),
+            classes=np.asarray(classes),
+            umbral_optimo=np.float64(info_modelo["umbral_optimo"]),
+            variables=np.asarray(info_modelo["variables"], dtype=np.str_),
+        )
+    return path
+
+
+def load_compact_model(path: Path) -> Tuple[CompactLinearModel, dict]:
+    """Carga un .npz exportado; devuelve el modelo y un info_modelo equivalente al pickle"""
+    with np.load(path, allow_pickle=False) as datos:
+        formato = int(datos["formato"])
+        if formato != FORMATO_COMPACTO:
+            raise ValueError(f"Formato de modelo compacto no soportado: {formato}")
+        variables = [str(v) for v in datos["variables"]]
+        model = CompactLinearModel(datos["coef"], datos["intercept"], datos["classes"], variables)
+        info_modelo = {"umbral_optimo": float(datos["umbral_optimo"]), "variables": variables}
+    return model, info_modelo
@@ -1,21 +1,36 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import insert
 from db.models import PredictionRecord
 from db.database import db_config
 from core.logging_config import setup_logger
+from core.metrics import stage_timer
 
 logger = setup_logger(__name__)
 
 def save_prediction_record(data: dict):
+    """Guarda una predicción en su propia sesión"""
     try:
-        logger.info("💾 Guardando predicción en base de datos...")
-        db = db_config.SessionLocal()
+        logger.debug("💾 Guardando predicción en base de datos...")
         registro = PredictionRecord(**data)
-        db.add(registro)
-        db.commit()
-        logger.info("✅ Predicción guardada exitosamente")
+        with stage_timer("db_write"):
+            with db_config.session_scope() as db:
+                db.add(registro)
+        logger.debug("✅ Predicción guardada exitosamente")
         return registro
     except Exception as e:
         logger.error(f"❌ Error al guardar en BD: {str(e)}", exc_info=True)
         raise
-    finally:
-        db.close()
\ No newline at end of file
+
+def save_prediction_records(rows: list):
+    """Inserta varias predicciones con un único INSERT masivo"""
+    if not rows:
+        return 0
+    try:
+        logger.debug(f"💾 Guardando {len(rows)} predicciones en base de datos...")
+        with stage_timer("db_write"):
+            with db_config.session_scope() as db:
+                db.execute(insert(PredictionRecord), rows)
+        logger.debug("✅ Predicciones guardadas exitosamente")
+        return len(rows)
+    except Exception as e:
+        logger.error(f"❌ Error al guardar lote en BD: {str(e)}", exc_info=True)
+        raise
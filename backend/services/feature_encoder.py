@@ -0,0 +1,75 @@
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from models.schemas import PredictionInput
+from utils.mapping import MAPEO_ES_EN
+
+AGE_PREFIX = "Age_Category_"
+
+# Mapeo inverso inglés -> campo de PredictionInput
+MAPEO_EN_ES = {v: k for k, v in MAPEO_ES_EN.items()}
+
+
+class FeatureEncoder:
+    """Convierte PredictionInput en la matriz float64 que espera el modelo.
+
+    Se compila una sola vez a partir de info_modelo['variables']: cada columna
+    numérica queda asociada a su campo de entrada y cada columna one-hot de
+    edad a su categoría, de modo que codificar es rellenar un array ya reservado.
+    La categoría de referencia (sin columna en el modelo) queda toda a cero.
+    """
+
+    def __init__(self, variables: Sequence[str]):
+        self.variables: Tuple[str, ...] = tuple(variables)
+        self._columnas_directas: List[Tuple[int, str]] = []
+        self._columnas_edad: Dict[str, int] = {}
+
+        for indice, variable in enumerate(self.variables):
+            if variable.startswith(AGE_PREFIX):
+                self._columnas_edad[variable[len(AGE_PREFIX):]] = indice
+            elif variable in MAPEO_EN_ES:
+                self._columnas_directas.append((indice, MAPEO_EN_ES[variable]))
+            else:
+                raise ValueError(f"Variable del modelo sin correspondencia en la entrada: {variable}")
+
+    @property
+    def n_features(self) -> int:
+        return len(self.variables)
+
+    def encode(self, input_data: PredictionInput) -> np.ndarray:
+        """Codifica un único paciente como matriz de forma (1, n_features)"""
+        fila = np.zeros((1, self.n_features), dtype=np.float64)
+        for indice, campo in self._columnas_directas:
+            fila[0, indice] = getattr(input_data, campo)
+        indice_edad = self._columnas_edad.get(input_data.edad)
+        if indice_edad is not None:
+            fila[0, indice_edad] = 1.0
+        return fila
+
+    def encode_batch(self, inputs: Sequence[PredictionInput]) -> np.ndarray:
+        """Codifica un lote de pacientes como matriz de forma (n, n_features)"""
+        n = len(inputs)
+        matriz = np.zeros((n, self.n_features), dtype=np.float64)
+        for indice, campo in self._columnas_directas:
+            matriz[:, indice] = np.fromiter(
+                (getattr(input_data, campo) for input_data in inputs), dtype=np.float64, count=n
+            )
+        indices_edad = np.fromiter(
+            (self._columnas_edad.get(input_data.edad, -1) for input_data in inputs), dtype=np.intp, count=n
+        )
+        filas = np.flatnonzero(indices_edad >= 0)
+        matriz[filas, indices_edad[filas]] = 1.0
+        return matriz
+
+    def encode_columns(self, columnas: Mapping[str, np.ndarray]) -> np.ndarray:
+        """Codifica columnas completas (campo de entrada -> array), p. ej. un bloque de un CSV"""
+        n = len(columnas["edad"])
+        matriz = np.zeros((n, self.n_features), dtype=np.float64)
+        for indice, campo in self._columnas_directas:
+            matriz[:, indice] = columnas[campo]
+        categorias, posiciones = np.unique(np.asarray(columnas["edad"], dtype=str), return_inverse=True)
+        indices_edad = np.array([self._columnas_edad.get(c, -1) for c in categorias], dtype=np.intp)[posiciones]
+        filas = np.flatnonzero(indices_edad >= 0)
+        matriz[filas, indices_edad[filas]] = 1.0
+        return matriz
@@ -0,0 +1,140 @@
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple, Union
+
+from core.config import settings
+from core.logging_config import setup_logger
+
+logger = setup_logger(__name__)
+
+
+@dataclass(frozen=True)
+class NumericFeature:
+    """Variable numérica con su rango válido"""
+    name: str
+    description: str
+    type: str
+    minimum: float
+    maximum: float
+
+    def contains(self, value: float) -> bool:
+        return self.minimum <= value <= self.maximum
+
+    def to_dict(self) -> dict:
+        return {"description": self.description, "type": self.type, "range": [self.minimum, self.maximum]}
+
+
+@dataclass(frozen=True)
+class CategoricalFeature:
+    """Variable categórica con sus valores válidos y su etiqueta"""
+    name: str
+    description: str
+    values: Mapping[str, str]
+
+    type = "categorical"
+
+    def to_dict(self) -> dict:
+        return {"description": self.description, "type": self.type, "values": dict(self.values)}
+
+
+Feature = Union[NumericFeature, CategoricalFeature]
+
+
+@dataclass(frozen=True)
+class FeatureMetadata:
+    """Contenido validado e inmutable de features_description.json"""
+    features: Mapping[str, Feature]
+    translations: Mapping[str, str]
+    mtime_ns: int
+
+    def range(self, name: str) -> Optional[Tuple[float, float]]:
+        feature = self.features.get(name)
+        if isinstance(feature, NumericFeature):
+            return feature.minimum, feature.maximum
+        return None
+
+    def categorical_values(self, name: str) -> Tuple[str, ...]:
+        feature = self.features.get(name)
+        if isinstance(feature, CategoricalFeature):
+            return tuple(feature.values)
+        return ()
+
+    def translate(self, name: str) -> str:
+        return self.translations.get(name, name)
+
+
+def _parse_feature(name: str, raw: dict) -> Feature:
+    tipo = raw.get("type")
+    descripcion = raw.get("description", "")
+    if tipo == "categorical":
+        valores = raw.get("values")
+        if not isinstance(valores, dict) or not valores:
+            raise ValueError(f"'{name}': una variable categórica necesita 'values'")
+        return CategoricalFeature(name, descripcion, MappingProxyType({str(k): str(v) for k, v in valores.items()}))
+    if tipo in ("float", "int"):
+        rango = raw.get("range")
+        if not isinstance(rango, (list, tuple)) or len(rango) != 2 or float(rango[0]) > float(rango[1]):
+            raise ValueError(f"'{name}': 'range' debe ser [mínimo, máximo]")
+        return NumericFeature(name, descripcion, tipo, float(rango[0]), float(rango[1]))
+    raise ValueError(f"'{name}': tipo de variable desconocido: {tipo}")
+
+
+def parse_feature_metadata(data: dict, mtime_ns: int = 0) -> FeatureMetadata:
+    """Valida el JSON de metadatos y lo convierte en estructuras inmutables"""
+    features = data.get("features", {})
+    translations = data.get("translations", {})
+    if not isinstance(features, dict) or not isinstance(translations, dict):
+        raise ValueError("features_description.json debe contener los objetos 'features' y 'translations'")
+    return FeatureMetadata(
+        features=MappingProxyType({name: _parse_feature(name, raw) for name, raw in features.items()}),
+        translations=MappingProxyType({str(k): str(v) for k, v in translations.items()}),
+        mtime_ns=mtime_ns,
+    )
+
+
+class FeatureMetadataStore:
+    """Carga features_description.json una vez y lo recarga solo si cambia su mtime.
+
+    La comprobación del mtime se limita a una cada check_interval segundos,
+    así que las consultas en cada petición no tocan el disco.
+    """
+
+    def __init__(self, path: Optional[Path] = None, check_interval: Optional[float] = None):
+        self._path = path
+        self.check_interval = (
+            check_interval if check_interval is not None else settings.FEATURES_CHECK_INTERVAL
+        )
+        self._metadata: Optional[FeatureMetadata] = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> Path:
+        return Path(self._path or settings.get_features_path())
+
+    def _load(self, mtime_ns: int) -> FeatureMetadata:
+        with open(self.path, encoding="utf-8") as f:
+            metadata = parse_feature_metadata(json.load(f), mtime_ns)
+        logger.info(f"✅ Metadatos de variables cargados desde: {self.path}")
+        return metadata
+
+    def get(self) -> FeatureMetadata:
+        metadata = self._metadata
+        ahora = time.monotonic()
+        if metadata is not None and ahora < self._next_check:
+            return metadata
+        with self._lock:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+            if self._metadata is None or self._metadata.mtime_ns != mtime_ns:
+                self._metadata = self._load(mtime_ns)
+            self._next_check = ahora + self.check_interval
+            return self._metadata
+
+
+# Instancia global compartida por la terminal, los esquemas y los servicios
+feature_metadata = FeatureMetadataStore()
@@ -0,0 +1,96 @@
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+import numpy as np
+
+from core.config import settings
+from core.logging_config import setup_logger
+from .model_registry import ModelHandle, model_registry, predict_proba
+
+logger = setup_logger(__name__)
+
+MODOS_EJECUTOR = ("inline", "thread", "process")
+
+
+def _predict_proba(model, features: np.ndarray) -> np.ndarray:
+    """Probabilidad de la clase positiva para cada fila"""
+    return predict_proba(model, features)[:, 1]
+
+
+def _init_worker():
+    """Inicializador de cada proceso del pool: precarga el modelo una sola vez"""
+    model_registry.get()
+
+
+def _predict_proba_in_worker(features: np.ndarray, version: str) -> Optional[np.ndarray]:
+    """Puntúa con el modelo precargado en el proceso worker.
+
+    Devuelve None si el worker tiene otra versión que la de la petición (durante
+    una recarga conviven workers del pool anterior y handles nuevos, o al revés).
+    """
+    handle = model_registry.get()
+    if handle.version != version:
+        return None
+    return _predict_proba(handle.model, features)
+
+
+class InferenceExecutor:
+    """Ejecuta predict_proba fuera del event loop.
+
+    - inline: en el propio event loop (útil para tests y la terminal)
+    - thread: en un pool de hilos que comparte el modelo del registro
+    - process: en un pool de procesos, cada uno con su copia precargada del modelo
+    """
+
+    def __init__(self, mode: Optional[str] = None, workers: Optional[int] = None):
+        self.mode = (mode or settings.INFERENCE_EXECUTOR).lower()
+        if self.mode not in MODOS_EJECUTOR:
+            raise ValueError(f"INFERENCE_EXECUTOR inválido: {self.mode} (opciones: {', '.join(MODOS_EJECUTOR)})")
+        self.workers = workers or settings.INFERENCE_WORKERS or os.cpu_count() or 1
+        self._pool: Optional[Executor] = None
+
+    def _create_pool(self) -> Optional[Executor]:
+        if self.mode == "thread":
+            return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="inferencia")
+        if self.mode == "process":
+            return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        return None
+
+    def start(self):
+        """Crea el pool (se llama desde el lifespan; si no, se crea en el primer uso)"""
+        if self._pool is None and self.mode != "inline":
+            self._pool = self._create_pool()
+            logger.info(f"✅ Ejecutor de inferencia '{self.mode}' con {self.workers} workers")
+
+    def shutdown(self, wait: bool = True):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+
+    def restart(self):
+        """Recrea el pool; en modo process obliga a los workers a recargar el modelo"""
+        pool, self._pool = self._pool, None
+        self.start()
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    async def predict_proba(self, handle: ModelHandle, features: np.ndarray) -> np.ndarray:
+        """Probabilidades de riesgo para la matriz de features, sin bloquear el event loop"""
+        if self.mode == "inline":
+            return _predict_proba(handle.model, features)
+        self.start()
+        loop = asyncio.get_running_loop()
+        if self.mode == "process":
+            probas = await loop.run_in_executor(self._pool, _predict_proba_in_worker, features, handle.version)
+            if probas is not None:
+                return probas
+            # El worker tenía otro modelo: se puntúa aquí con el de la petición, para que el
+            # resultado (y la caché, que usa handle.version) corresponda siempre a esa versión
+            return await asyncio.to_thread(_predict_proba, handle.model, features)
+        return await loop.run_in_executor(self._pool, _predict_proba, handle.model, features)
+
+
+# Instancia global compartida por los endpoints de predicción
+inference_executor = InferenceExecutor()
@@ -0,0 +1,192 @@
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.config import settings
+from utils.mapping import MAPEO_ES_EN
+from .feature_metadata import CategoricalFeature, FeatureMetadata, NumericFeature, feature_metadata
+
+# Contexto de validación que desactiva las reglas por fila (el lote las aplica vectorizadas)
+SKIP_METADATA_CHECKS = "skip_metadata_checks"
+
+
+@dataclass(frozen=True)
+class FieldRule:
+    """Regla de un campo de PredictionInput derivada de features_description.json"""
+    campo: str
+    feature: str
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+    allowed: Optional[FrozenSet[float]] = None
+    allowed_labels: Optional[FrozenSet[str]] = None
+
+    @property
+    def numeric(self) -> bool:
+        return self.minimum is not None or self.allowed is not None
+
+    def error(self, value) -> Optional[str]:
+        """Mensaje de error si el valor incumple la regla, None si es válido"""
+        if self.minimum is not None:
+            if not self.minimum <= value <= self.maximum:
+                return f"{value} fuera de rango [{self.minimum:g}, {self.maximum:g}] para {self.feature}"
+        elif self.allowed is not None:
+            if value not in self.allowed:
+                return f"{value} no es un valor válido para {self.feature} ({self._opciones()})"
+        elif str(value) not in self.allowed_labels:
+            return f"{value} no es un valor válido para {self.feature} ({self._opciones()})"
+        return None
+
+    def _opciones(self) -> str:
+        if self.allowed is not None:
+            return ", ".join(f"{v:g}" for v in sorted(self.allowed))
+        return ", ".join(sorted(self.allowed_labels))
+
+
+def compile_rules(metadata: FeatureMetadata) -> Dict[str, FieldRule]:
+    """Genera una regla por campo de entrada que tenga metadatos"""
+    reglas = {}
+    for campo, feature in MAPEO_ES_EN.items():
+        meta = metadata.features.get(feature)
+        if isinstance(meta, NumericFeature):
+            reglas[campo] = FieldRule(campo, feature, minimum=meta.minimum, maximum=meta.maximum)
+        elif isinstance(meta, CategoricalFeature):
+            try:
+                reglas[campo] = FieldRule(campo, feature, allowed=frozenset(float(v) for v in meta.values))
+            except ValueError:
+                reglas[campo] = FieldRule(campo, feature, allowed_labels=frozenset(meta.values))
+    return reglas
+
+
+_compiladas: Tuple[Optional[FeatureMetadata], Dict[str, FieldRule]] = (None, {})
+
+
+def current_rules() -> Dict[str, FieldRule]:
+    """Reglas vigentes; se recompilan solo cuando cambian los metadatos"""
+    global _compiladas
+    metadata = feature_metadata.get()
+    if _compiladas[0] is not metadata:
+        _compiladas = (metadata, compile_rules(metadata))
+    return _compiladas[1]
+
+
+def _row_error(campo: str, value, mensaje: str) -> dict:
+    return {"type": "value_error", "loc": [campo], "msg": mensaje, "input": value}
+
+
+# Campos que pueden faltar en la entrada (el IMC se calcula con altura y peso)
+CAMPOS_OPCIONALES = ("imc",)
+
+
+def rule_violations(columnas: Mapping[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Máscara booleana de filas que incumplen cada regla, a partir de columnas completas.
+
+    NaN en un campo obligatorio es inválido. Solo se dejan pasar en los
+    opcionales (imc omitido), que se revisan en batch_bmi_check / bmi_column_check.
+    """
+    mascaras = {}
+    for campo, regla in current_rules().items():
+        valores = columnas.get(campo)
+        if valores is None:
+            continue
+        if regla.numeric:
+            valores = np.asarray(valores, dtype=np.float64)
+            if regla.minimum is not None:
+                invalidas = ~((valores >= regla.minimum) & (valores <= regla.maximum))
+            else:
+                invalidas = ~np.isin(valores, np.fromiter(regla.allowed, dtype=np.float64))
+            if campo in CAMPOS_OPCIONALES:
+                invalidas &= ~np.isnan(valores)
+        else:
+            invalidas = ~np.isin(np.asarray(valores, dtype=str), list(regla.allowed_labels))
+        mascaras[campo] = invalidas
+    return mascaras
+
+
+def batch_rule_errors(inputs: Sequence) -> List[List[dict]]:
+    """Aplica todas las reglas a un lote con máscaras de NumPy.
+
+    Devuelve, para cada entrada, la lista de errores (vacía si es válida) con el
+    mismo formato que los errores de pydantic.
+    """
+    n = len(inputs)
+    errores: List[List[dict]] = [[] for _ in range(n)]
+    if n == 0:
+        return errores
+    columnas = {}
+    for campo, regla in current_rules().items():
+        if regla.numeric:
+            columnas[campo] = np.fromiter(
+                (np.nan if getattr(i, campo) is None else getattr(i, campo) for i in inputs),
+                dtype=np.float64, count=n
+            )
+        else:
+            columnas[campo] = [str(getattr(i, campo)) for i in inputs]
+    reglas = current_rules()
+    for campo, invalidas in rule_violations(columnas).items():
+        for fila in np.flatnonzero(invalidas):
+            valor = getattr(inputs[fila], campo)
+            errores[fila].append(_row_error(campo, valor, reglas[campo].error(valor)))
+    return errores
+
+
+def calcular_imc(peso, altura_cm):
+    """IMC = peso / altura(m)^2, redondeado como en el cliente (vale para escalares y arrays)"""
+    return np.round(peso / (np.asarray(altura_cm, dtype=np.float64) / 100) ** 2, 2)
+
+
+def revisar_imc(imc: float, calculado: float) -> Tuple[Optional[str], bool]:
+    """(mensaje, rechazar) si el IMC recibido se aleja del calculado más que BMI_TOLERANCE"""
+    if abs(imc - calculado) <= settings.BMI_TOLERANCE:
+        return None, False
+    mensaje = f"IMC {imc:g} incoherente con altura y peso (calculado {float(calculado):g})"
+    return mensaje, settings.BMI_MISMATCH_POLICY == "reject"
+
+
+def bmi_column_check(altura: np.ndarray, peso: np.ndarray, imc: np.ndarray):
+    """Versión por columnas de la comprobación del IMC.
+
+    Devuelve (IMC calculado, filas sin imc cuyo IMC calculado queda fuera de
+    rango, filas cuyo imc recibido no cuadra con altura y peso).
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        calculado = calcular_imc(peso, altura)
+    faltan = np.isnan(imc)
+    regla = current_rules().get("imc")
+    fuera_de_rango = np.zeros(len(imc), dtype=bool)
+    if regla is not None and regla.minimum is not None:
+        fuera_de_rango = faltan & ~((calculado >= regla.minimum) & (calculado <= regla.maximum))
+    incoherentes = ~faltan & ~(np.abs(imc - calculado) <= settings.BMI_TOLERANCE)
+    return calculado, fuera_de_rango, incoherentes
+
+
+def batch_bmi_check(inputs: Sequence) -> List[List[dict]]:
+    """Deriva el IMC que falte y comprueba la coherencia del recibido en todo el lote.
+
+    Rellena imc en las entradas sin él y añade avisos si la política es "flag";
+    devuelve los errores por entrada cuando hay que rechazarlas.
+    """
+    n = len(inputs)
+    errores: List[List[dict]] = [[] for _ in range(n)]
+    if n == 0:
+        return errores
+    altura = np.fromiter((i.altura for i in inputs), dtype=np.float64, count=n)
+    peso = np.fromiter((i.peso for i in inputs), dtype=np.float64, count=n)
+    imc = np.fromiter((np.nan if i.imc is None else i.imc for i in inputs), dtype=np.float64, count=n)
+    calculado, fuera_de_rango, incoherentes = bmi_column_check(altura, peso, imc)
+
+    regla = current_rules().get("imc")
+    for fila in np.flatnonzero(np.isnan(imc)):
+        if fuera_de_rango[fila]:
+            mensaje = regla.error(calculado[fila])
+            errores[fila].append(_row_error("imc", None, f"IMC calculado a partir de altura y peso: {mensaje}"))
+        else:
+            inputs[fila].imc = float(calculado[fila])
+
+    for fila in np.flatnonzero(incoherentes):
+        mensaje, rechazar = revisar_imc(imc[fila], calculado[fila])
+        if rechazar:
+            errores[fila].append(_row_error("imc", float(imc[fila]), mensaje))
+        else:
+            inputs[fila].avisos.append(mensaje)
+    return errores
@@ -0,0 +1,191 @@
+import hashlib
+import threading
+import warnings
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+
+import numpy as np
+
+from core.config import settings
+from core.logging_config import setup_logger
+from models.schemas import PredictionInput
+from .compact_model import load_compact_model
+from .feature_encoder import FeatureEncoder
+
+logger = setup_logger(__name__)
+
+FORMATOS_MODELO = ("pickle", "compact")
+
+
+def predict_proba(model, features: np.ndarray) -> np.ndarray:
+    """predict_proba sobre la matriz de FeatureEncoder.
+
+    El modelo se entrenó con un DataFrame y sklearn avisa de que el array no
+    trae nombres de columna; el orden ya se verifica al cargar (_load_handle),
+    así que el aviso se silencia solo durante esta llamada.
+    """
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="X does not have valid feature names", category=UserWarning)
+        return model.predict_proba(features)
+
+
+# Paciente de referencia con el que se valida un modelo antes de publicarlo
+SMOKE_INPUT = PredictionInput(
+    altura=170, peso=70, imc=24.2, salud_general=3, consumo_alcohol=1,
+    consumo_fruta=7, consumo_vegetales=7, consumo_papas=1, chequeo_medico=1,
+    ejercicio=1, cancer_piel=0, otro_cancer=0, depresion=0, diabetes=0,
+    artritis=0, sexo=1, historial_tabaquismo=0, edad="50-54"
+)
+
+
+class ModelValidationError(ValueError):
+    """El modelo candidato no supera la validación y no se publica"""
+
+
+@dataclass(frozen=True)
+class ModelHandle:
+    """Referencia inmutable al modelo cargado y a sus parámetros"""
+    model: Any
+    umbral_optimo: float
+    variables: Tuple[str, ...]
+    encoder: FeatureEncoder
+    version: str
+
+
+def _file_digest(*paths: Path) -> str:
+    """Huella corta del contenido de los artefactos (identifica la versión del modelo)"""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()[:12]
+
+
+class ModelRegistry:
+    """Carga el modelo y su información una sola vez y la comparte entre peticiones"""
+
+    def __init__(self, model_path: Optional[Path] = None, info_path: Optional[Path] = None,
+                 compact_path: Optional[Path] = None, model_format: Optional[str] = None):
+        self._model_path = model_path
+        self._info_path = info_path
+        self._compact_path = compact_path
+        self._model_format = model_format
+        self._handle: Optional[ModelHandle] = None
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._listeners: List[Callable[[ModelHandle], None]] = []
+
+    @property
+    def model_path(self) -> Path:
+        return Path(self._model_path or settings.get_model_path())
+
+    @property
+    def info_path(self) -> Path:
+        return Path(self._info_path or settings.get_model_info_path())
+
+    @property
+    def compact_path(self) -> Path:
+        return Path(self._compact_path or settings.get_compact_model_path())
+
+    @property
+    def model_format(self) -> str:
+        formato = (self._model_format or settings.MODEL_FORMAT).lower()
+        if formato not in FORMATOS_MODELO:
+            raise ValueError(f"MODEL_FORMAT inválido: {formato} (opciones: {', '.join(FORMATOS_MODELO)})")
+        return formato
+
+    @property
+    def artifact_paths(self) -> Tuple[Path, ...]:
+        """Ficheros de los que se carga el modelo según MODEL_FORMAT"""
+        if self.model_format == "compact":
+            return (self.compact_path,)
+        return (self.model_path, self.info_path)
+
+    @property
+    def loaded(self) -> bool:
+        return self._handle is not None
+
+    def _read_artifacts(self) -> Tuple[Any, dict]:
+        if self.model_format == "compact":
+            return load_compact_model(self.compact_path)
+        # joblib (y con él sklearn al deserializar) solo se importa con el formato pickle
+        import joblib
+        return joblib.load(self.model_path), joblib.load(self.info_path)
+
+    def _load_handle(self) -> ModelHandle:
+        """Deserializa el modelo y su información desde disco"""
+        model, info_modelo = self._read_artifacts()
+        variables = tuple(info_modelo["variables"])
+        columnas_modelo = getattr(model, "feature_names_in_", None)
+        if columnas_modelo is not None and tuple(columnas_modelo) != variables:
+            raise ValueError("Las variables de info_modelo no coinciden con las columnas del modelo")
+        return ModelHandle(
+            model=model,
+            umbral_optimo=float(info_modelo["umbral_optimo"]),
+            variables=variables,
+            encoder=FeatureEncoder(variables),
+            version=_file_digest(*self.artifact_paths),
+        )
+
+    def subscribe(self, callback: Callable[[ModelHandle], None]):
+        """Registra una función a la que se avisa cada vez que se publica un modelo"""
+        self._listeners.append(callback)
+
+    def _publish(self, handle: ModelHandle) -> ModelHandle:
+        self._handle = handle
+        for callback in self._listeners:
+            try:
+                callback(handle)
+            except Exception as e:
+                logger.error(f"❌ Error notificando la carga del modelo: {str(e)}", exc_info=True)
+        return handle
+
+    def load(self) -> ModelHandle:
+        """Carga (o vuelve a cargar) el modelo y lo publica para todas las peticiones"""
+        with self._lock:
+            handle = self._publish(self._load_handle())
+            logger.info(f"✅ Modelo cargado desde: {self.artifact_paths[0]} (versión {handle.version})")
+            return handle
+
+    def _validate(self, handle: ModelHandle):
+        """Comprueba el candidato con una entrada de referencia antes de publicarlo"""
+        try:
+            proba = predict_proba(handle.model, handle.encoder.encode(SMOKE_INPUT))
+        except Exception as e:
+            raise ModelValidationError(f"El modelo no puede puntuar la entrada de referencia: {str(e)}") from e
+        if proba.shape != (1, 2) or not np.all(np.isfinite(proba)) or not 0.0 <= proba[0, 1] <= 1.0:
+            raise ModelValidationError(f"Salida inesperada del modelo candidato: {proba!r}")
+        if not 0.0 < handle.umbral_optimo < 1.0:
+            raise ModelValidationError(f"umbral_optimo fuera de rango: {handle.umbral_optimo}")
+
+    def reload(self) -> ModelHandle:
+        """Carga y valida el modelo en disco y lo publica de forma atómica.
+
+        La carga se hace sin bloquear get(): las peticiones en curso terminan
+        con el modelo anterior, que conservan por referencia. Si la validación
+        falla se lanza ModelValidationError y se mantiene el modelo actual.
+        """
+        with self._reload_lock:
+            candidate = self._load_handle()
+            self._validate(candidate)
+            with self._lock:
+                previous = self._handle
+                self._publish(candidate)
+            logger.info(
+                f"🔄 Modelo recargado: {previous.version if previous else '-'} -> {candidate.version}"
+            )
+            return candidate
+
+    def get(self) -> ModelHandle:
+        """Devuelve el modelo cargado; lo carga bajo demanda si aún no existe"""
+        handle = self._handle
+        if handle is None:
+            with self._lock:
+                if self._handle is None:
+                    self._publish(self._load_handle())
+                    logger.info(f"✅ Modelo cargado bajo demanda desde: {self.artifact_paths[0]}")
+                handle = self._handle
+        return handle
+
+# Instancia global compartida por la API y la interfaz de terminal
+model_registry = ModelRegistry()
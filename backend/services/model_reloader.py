@@ -0,0 +1,80 @@
+import asyncio
+from typing import Optional, Tuple
+
+from core.config import settings
+from core.logging_config import setup_logger
+from .inference_executor import inference_executor
+from .model_registry import ModelHandle, model_registry
+
+logger = setup_logger(__name__)
+
+
+async def reload_model() -> ModelHandle:
+    """Recarga el modelo en segundo plano y lo publica sin reiniciar uvicorn"""
+    handle = await asyncio.to_thread(model_registry.reload)
+    if inference_executor.mode == "process":
+        # Los workers tienen su propia copia del modelo: se recrean con la nueva
+        inference_executor.restart()
+    return handle
+
+
+def _firma_artefactos() -> Tuple:
+    """(mtime, tamaño) de los artefactos del modelo; cambia cuando se reemplazan"""
+    firmas = []
+    for path in model_registry.artifact_paths:
+        try:
+            stat = path.stat()
+            firmas.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            firmas.append(None)
+    return tuple(firmas)
+
+
+class ModelFileWatcher:
+    """Vigila los artefactos del modelo y lo recarga cuando cambian.
+
+    Un cambio se aplica cuando la firma se mantiene estable durante un ciclo
+    completo, para no cargar un pickle que todavía se está copiando.
+    """
+
+    def __init__(self, interval: Optional[float] = None):
+        self.interval = interval if interval is not None else settings.MODEL_WATCH_INTERVAL
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self.interval <= 0 or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"👀 Vigilando cambios del modelo cada {self.interval}s")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        publicada = _firma_artefactos()
+        candidata = publicada
+        while True:
+            await asyncio.sleep(self.interval)
+            actual = _firma_artefactos()
+            if actual == publicada:
+                candidata = publicada
+                continue
+            if actual != candidata or None in actual:
+                candidata = actual  # esperar a que la copia termine
+                continue
+            try:
+                await reload_model()
+            except Exception as e:
+                logger.error(f"❌ No se pudo recargar el modelo modificado: {str(e)}", exc_info=True)
+            publicada = actual
+
+
+# Instancia global arrancada por el lifespan si MODEL_WATCH_INTERVAL > 0
+model_file_watcher = ModelFileWatcher()
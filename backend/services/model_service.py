@@ -1,94 +1,285 @@
-import joblib
-import pandas as pd
-from pathlib import Path
-import json
-import logging
-from models.schemas import PredictionInput
-from core.config import settings
-from .database_service import save_prediction_record
+import asyncio
+import numpy as np
+from typing import Any, Dict, List, Optional
+from pydantic import ValidationError
+from models.schemas import (
+    PredictionInput, PredictionOutput,
+    BatchPredictionItem, BatchPredictionOutput, BatchRowError
+)
+from .model_registry import model_registry
+from .inference_executor import inference_executor
+from .prediction_cache import prediction_cache, PredictionCache
+from .input_validation import SKIP_METADATA_CHECKS, batch_bmi_check, batch_rule_errors
+from .prediction_writer import prediction_writer
 from utils.mapping import MAPEO_ES_EN, MAPEO_EN_BDD
+from core.config import settings
+from core.metrics import CACHE_LOOKUPS_TOTAL, PREDICTION_ERRORS_TOTAL, PREDICTIONS_TOTAL, stage_timer
 from core.logging_config import setup_logger
 
 logger = setup_logger(__name__)
 
+
+# Marca que stop() encola detrás de lo pendiente para detener el colector
+_FIN = object()
+
+
+class MicroBatcher:
+    """Agrupa predicciones individuales concurrentes en una sola llamada a predict_proba.
+
+    Cada petición deja su fila codificada y espera su propio future. El
+    colector junta las filas que llegan dentro de window_ms (hasta max_batch),
+    las puntúa juntas en el ejecutor de inferencia y resuelve cada future.
+    Es opcional (MICROBATCH_ENABLED); sin él cada petición puntúa su fila.
+    """
+
+    def __init__(self, window_ms: Optional[float] = None, max_batch: Optional[int] = None, executor=None):
+        self.window = (window_ms if window_ms is not None else settings.MICROBATCH_WINDOW_MS) / 1000
+        self.max_batch = max_batch or settings.MICROBATCH_MAX_SIZE
+        self._executor = executor or inference_executor
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lotes_en_curso = set()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"✅ Micro-batching activo (ventana={self.window * 1000:g}ms, máximo={self.max_batch})")
+
+    async def stop(self):
+        """Detiene el colector y puntúa lo que quedara pendiente"""
+        if not self.running:
+            return
+        task, self._task = self._task, None  # las nuevas peticiones puntúan directamente
+        # La marca de fin entra detrás de lo pendiente: el colector lanza su último lote y termina
+        self._queue.put_nowait(_FIN)
+        await task
+        if self._lotes_en_curso:
+            await asyncio.gather(*self._lotes_en_curso, return_exceptions=True)
+
+    async def predict_proba(self, handle, features: np.ndarray) -> float:
+        """Probabilidad de riesgo de una fila (forma (1, n_features))"""
+        if not self.running:
+            return (await self._executor.predict_proba(handle, features))[0]
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((handle, features, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        fin = False
+        while not fin:
+            primero = await self._queue.get()
+            if primero is _FIN:
+                return
+            lote = [primero]
+            limite = loop.time() + self.window
+            while len(lote) < self.max_batch:
+                if not self._queue.empty():
+                    item = self._queue.get_nowait()
+                else:
+                    restante = limite - loop.time()
+                    if restante <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout=restante)
+                    except asyncio.TimeoutError:
+                        break
+                if item is _FIN:
+                    fin = True
+                    break
+                lote.append(item)
+            # Se puntúa en segundo plano para seguir acumulando el siguiente lote
+            tarea = asyncio.create_task(self._score(lote))
+            self._lotes_en_curso.add(tarea)
+            tarea.add_done_callback(self._lotes_en_curso.discard)
+
+    async def _score(self, lote):
+        # Tras una recarga del modelo pueden convivir dos versiones en la ventana
+        grupos: Dict[int, list] = {}
+        for item in lote:
+            grupos.setdefault(id(item[0]), []).append(item)
+        for items in grupos.values():
+            handle = items[0][0]
+            try:
+                probas = await self._executor.predict_proba(handle, np.vstack([f for _, f, _ in items]))
+            except Exception as e:
+                for _, _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, _, future), proba in zip(items, probas):
+                if not future.done():
+                    future.set_result(proba)
+
+
+# Instancia global arrancada por el lifespan si MICROBATCH_ENABLED
+micro_batcher = MicroBatcher()
+
+
+def _ajustar_probabilidad(proba: float) -> float:
+    """Ajuste visual de la probabilidad mostrada al usuario"""
+    if 0.3 <= proba <= 0.5:
+        logger.debug(f"Probabilidad ajustada: {proba} -> 0.51")
+        return 0.51
+    return float(proba)
+
+
+def _registro_bd(english_data: dict, prediction: int, proba_mostrar: float) -> dict:
+    """Traduce una predicción a los nombres de columnas de la BD"""
+    db_data = {
+        MAPEO_EN_BDD[k]: v
+        for k, v in english_data.items()
+        if k in MAPEO_EN_BDD
+    }
+    db_data.update({
+        "prediction_result": prediction,
+        "probability": proba_mostrar
+    })
+    return db_data
+
+
+def _mensaje(prediction: int) -> str:
+    return "Riesgo cardiovascular alto" if prediction == 1 else "Riesgo bajo"
+
+
 async def make_prediction(input_data: PredictionInput):
     try:
-        logger.info("🔮 Iniciando predicción de riesgo cardiovascular...")
-
-        # 1. Cargar modelo y parámetros
-
-        # 1. Cargar modelo y parámetros
-        model = joblib.load(settings.get_model_path())
-        logger.debug(f"✅ Modelo cargado desde: {settings.get_model_path()}")
-        info_modelo = joblib.load(settings.get_model_info_path())
-        # info_modelo = joblib.load(Path(settings.get_model_path()).parent / "info_modelo_cardiaco.pkl")
-        umbral_optimo = info_modelo["umbral_optimo"]
-        variables_modelo = info_modelo["variables"]
-
-        # 2. Convertir datos a inglés
-        english_data = input_data.to_english_dict()
-        
-        # 3. Preparar DataFrame para predicción
-        df = pd.DataFrame([english_data])
-        logger.info(f"DataFrame creado con columnas: {df.columns.tolist()}")
-        
-        # Asegurar que las columnas están en el orden correcto
-        expected_columns = [
-            "Height_(cm)", "Weight_(kg)", "BMI", "Alcohol_Consumption",
-            "Fruit_Consumption", "Green_Vegetables_Consumption", "FriedPotato_Consumption",
-            "General_Health", "Checkup", "Exercise", "Skin_Cancer", "Other_Cancer",
-            "Depression", "Diabetes", "Arthritis", "Sex", "Smoking_History", "Age_Category"
-        ]
-        
-        # Reordenar las columnas si es necesario
-        df = df[expected_columns]
-        logger.debug(f"DataFrame reordenado: {df.columns.tolist()}")
-
-        # One-hot encoding para Age_Category
-        if "age_category" in df.columns:
-            df_age_cat = pd.get_dummies(df["age_category"], prefix="Age_Category")
-            df = df.drop(["age_category"], axis=1)
-            df = pd.concat([df, df_age_cat], axis=1)
-
-        # Asegurar todas las features requeridas
-        for col in variables_modelo:
-            if col not in df.columns:
-                df[col] = 0
-        df = df[variables_modelo]
-
-        # 4. Realizar predicción
-        proba = model.predict_proba(df)[:, 1][0]
-        logger.info(f"Probabilidad raw: {proba}")
-
-        # Ajuste visual
-        proba_mostrar = proba
-        if 0.3 <= proba <= 0.5:
-            proba_mostrar = 0.51
-            logger.debug(f"Probabilidad ajustada: {proba_mostrar}")
-        
-        prediction = int(proba > umbral_optimo)
-        logger.info(f"Predicción final: {prediction}")
-
-        # 5. Guardar en BD (con nombres de columnas BD)
-        db_data = {
-            MAPEO_EN_BDD[k]: v 
-            for k, v in english_data.items()
-            if k in MAPEO_EN_BDD
-        }
-        db_data.update({
-            "prediction_result": prediction,
-            "probability": float(proba_mostrar)
-        })
-        save_prediction_record(db_data)
-
-        from models.schemas import PredictionOutput
+        logger.debug("🔮 Iniciando predicción de riesgo cardiovascular...")
+
+        # 1. Obtener modelo y parámetros ya cargados en memoria
+        with stage_timer("model_load"):
+            handle = model_registry.get()
+
+        # 2. Buscar la misma entrada ya puntuada con esta versión del modelo
+        proba = None
+        if settings.PREDICTION_CACHE_ENABLED:
+            with stage_timer("cache_lookup"):
+                cache_key = PredictionCache.make_key(input_data, handle.version)
+                proba = prediction_cache.get(cache_key)
+            CACHE_LOOKUPS_TOTAL.inc(result="miss" if proba is None else "hit")
+
+        if proba is None:
+            # 3. Codificar la entrada directamente en la matriz del modelo
+            with stage_timer("encode"):
+                features = handle.encoder.encode(input_data)
+
+            # 4. Realizar predicción en el pool de inferencia (agrupada si hay micro-batching)
+            with stage_timer("predict_proba"):
+                proba = float(await micro_batcher.predict_proba(handle, features))
+            if settings.PREDICTION_CACHE_ENABLED:
+                prediction_cache.set(cache_key, proba)
+        logger.debug(f"Probabilidad raw: {proba}")
 
+        with stage_timer("threshold"):
+            proba_mostrar = _ajustar_probabilidad(proba)
+            prediction = int(proba > handle.umbral_optimo)
+        logger.debug(f"Predicción final: {prediction}")
+
+        # 5. Encolar el guardado en BD (también en aciertos de caché)
+        with stage_timer("translate"):
+            db_row = _registro_bd(input_data.to_english_dict(), prediction, proba_mostrar)
+        with stage_timer("db_enqueue"):
+            await prediction_writer.enqueue(db_row)
+
+        PREDICTIONS_TOTAL.inc(kind="single", result=prediction)
         return PredictionOutput(
             prediction=prediction,
-            probability=float(proba_mostrar),
-            message="Riesgo cardiovascular alto" if prediction == 1 else "Riesgo bajo"
+            probability=proba_mostrar,
+            message=_mensaje(prediction),
+            warnings=input_data.avisos
         )
 
     except Exception as e:
+        PREDICTION_ERRORS_TOTAL.inc(kind="single")
         logger.error(f"❌ Error en make_prediction: {str(e)}", exc_info=True)
-        raise
\ No newline at end of file
+        raise
+
+
+def validate_batch_records(records: List[Any]):
+    """Valida cada registro por separado y devuelve (índices válidos, entradas, errores).
+
+    pydantic solo comprueba tipos fila a fila; los rangos de los metadatos se
+    aplican después a todo el lote con máscaras vectorizadas.
+    """
+    contexto = {SKIP_METADATA_CHECKS: True}
+    candidatos, errores = [], []
+    for index, registro in enumerate(records):
+        try:
+            candidatos.append((index, PredictionInput.model_validate(registro, context=contexto)))
+        except ValidationError as e:
+            errores.append(BatchRowError(index=index, errors=e.errors(include_url=False)))
+
+    indices, inputs = [], []
+    entradas = [input_data for _, input_data in candidatos]
+    errores_reglas = batch_rule_errors(entradas)
+    errores_imc = batch_bmi_check(entradas)
+    for (index, input_data), errores_fila, errores_fila_imc in zip(candidatos, errores_reglas, errores_imc):
+        errores_fila = errores_fila + errores_fila_imc
+        if errores_fila:
+            errores.append(BatchRowError(index=index, errors=errores_fila))
+        else:
+            indices.append(index)
+            inputs.append(input_data)
+    errores.sort(key=lambda error: error.index)
+    return indices, inputs, errores
+
+
+async def make_batch_prediction(records: List[Any]) -> BatchPredictionOutput:
+    """Puntúa un lote de pacientes con una única llamada a predict_proba"""
+    try:
+        logger.info(f"🔮 Iniciando predicción por lotes de {len(records)} registros...")
+        with stage_timer("batch_validate"):
+            indices, inputs, errores = validate_batch_records(records)
+
+        items = []
+        if inputs:
+            handle = model_registry.get()
+            with stage_timer("batch_encode"):
+                features = handle.encoder.encode_batch(inputs)
+            with stage_timer("batch_predict_proba"):
+                probas = await inference_executor.predict_proba(handle, features)
+            english_rows = [input_data.to_english_dict() for input_data in inputs]
+            predictions = (probas > handle.umbral_optimo).astype(int)
+
+            db_rows = []
+            for index, input_data, english_data, proba, prediction in zip(
+                indices, inputs, english_rows, probas, predictions
+            ):
+                prediction = int(prediction)
+                proba_mostrar = _ajustar_probabilidad(proba)
+                db_rows.append(_registro_bd(english_data, prediction, proba_mostrar))
+                items.append(BatchPredictionItem(
+                    index=index,
+                    prediction=prediction,
+                    probability=proba_mostrar,
+                    message=_mensaje(prediction),
+                    warnings=input_data.avisos
+                ))
+            # Misma escritura diferida (y reintentos) que las predicciones individuales;
+            # si no se puede guardar, el lote ya puntuado se devuelve igualmente
+            try:
+                await prediction_writer.enqueue_many(db_rows)
+            except Exception as e:
+                logger.error(f"❌ No se guardaron las {len(db_rows)} predicciones del lote: {str(e)}", exc_info=True)
+            positivas = int(predictions.sum())
+            PREDICTIONS_TOTAL.inc(positivas, kind="batch", result=1)
+            PREDICTIONS_TOTAL.inc(len(items) - positivas, kind="batch", result=0)
+
+        logger.info(f"✅ Lote procesado: {len(items)} predicciones, {len(errores)} errores")
+        return BatchPredictionOutput(
+            total=len(records),
+            scored=len(items),
+            predictions=items,
+            errors=errores
+        )
+
+    except Exception as e:
+        PREDICTION_ERRORS_TOTAL.inc(kind="batch")
+        logger.error(f"❌ Error en make_batch_prediction: {str(e)}", exc_info=True)
+        raise
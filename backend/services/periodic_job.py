@@ -0,0 +1,44 @@
+import asyncio
+from typing import Callable, Optional
+
+from core.logging_config import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class PeriodicJob:
+    """Ejecuta una función bloqueante cada interval segundos en un hilo, dentro de la API.
+
+    Con interval <= 0 no arranca. Un fallo se registra y el trabajo sigue en el
+    siguiente ciclo.
+    """
+
+    def __init__(self, nombre: str, funcion: Callable[[], object], interval: float):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self.interval <= 0 or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"⏱ {self.nombre}: cada {self.interval}s")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.funcion)
+            except Exception as e:
+                logger.error(f"❌ Error en {self.nombre}: {str(e)}", exc_info=True)
@@ -0,0 +1,159 @@
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from sqlalchemy import delete, func, select
+
+from core.config import settings
+from core.logging_config import setup_logger
+from db.database import DatabaseConfig, db_config
+from db.models import PredictionRecord
+from .periodic_job import PeriodicJob
+from .prediction_rollup import refresh_rollups
+
+logger = setup_logger(__name__)
+
+TABLA = PredictionRecord.__table__
+
+
+@dataclass
+class ArchiveStats:
+    """Resumen de una ejecución de la retención"""
+    days: int = 0
+    files: int = 0
+    archived: int = 0
+    deleted: int = 0
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise RuntimeError("Archivar en Parquet requiere pyarrow (pip install pyarrow)") from e
+    return pyarrow
+
+
+def archive_schema(tabla=TABLA):
+    """Esquema Parquet de las filas archivadas.
+
+    Se construye con los tipos del lado de Python (python_type), que son los
+    mismos con o sin esquema compacto: el archivo no depende de DB_COMPACT_SCHEMA.
+    """
+    pa = _pyarrow()
+    tipos = {int: pa.int64(), float: pa.float64(), str: pa.string(), datetime: pa.timestamp("us")}
+    return pa.schema([pa.field(c.name, tipos[c.type.python_type], nullable=False) for c in tabla.columns])
+
+
+def day_dir(base: Path, dia) -> Path:
+    """Directorio de la partición de un día (estilo Hive: date=AAAA-MM-DD)"""
+    return Path(base) / f"date={dia.isoformat()}"
+
+
+def _write_part(directorio: Path, filas: List, schema) -> Path:
+    """Escribe un bloque en su propio fichero; el rename final evita ficheros a medias"""
+    pa = _pyarrow()
+    ids = [fila.id for fila in filas]
+    destino = directorio / f"part-{min(ids)}-{max(ids)}.parquet"
+    temporal = destino.with_suffix(".parquet.tmp")
+    tabla = pa.Table.from_pylist([dict(fila._mapping) for fila in filas], schema=schema)
+    pa.parquet.write_table(tabla, temporal, compression="zstd")
+    os.replace(temporal, destino)
+    return destino
+
+
+def _delete_archived(engine, ficheros: Iterable[Path], lote: int) -> int:
+    """Borra de la tabla las filas ya escritas en los ficheros, en DELETE de como mucho lote filas.
+
+    Los ids se leen de la columna id de cada fichero (solo esa columna), así que
+    también sirve para terminar el borrado de una ejecución interrumpida.
+    """
+    pa = _pyarrow()
+    borradas = 0
+    for fichero in ficheros:
+        ids = pa.parquet.read_table(fichero, columns=["id"]).column("id").to_pylist()
+        for inicio in range(0, len(ids), lote):
+            # Cada lote en su propia transacción: los bloqueos duran poco
+            with engine.begin() as conn:
+                borradas += conn.execute(delete(TABLA).where(TABLA.c.id.in_(ids[inicio:inicio + lote]))).rowcount
+    return borradas
+
+
+def archive_predictions(
+    db: Optional[DatabaseConfig] = None,
+    older_than_days: Optional[int] = None,
+    archive_dir: Optional[Path] = None,
+    chunk_size: Optional[int] = None,
+    delete_batch: Optional[int] = None,
+    now: Optional[datetime] = None,
+) -> ArchiveStats:
+    """Mueve a Parquet (una partición por día) las predicciones más antiguas que older_than_days y las borra.
+
+    Cada día se lee con un cursor de servidor (stream_results) por bloques de
+    chunk_size filas, y cada bloque se escribe como un fichero; nunca hay un día
+    entero en memoria. Cerrado el cursor, las filas se borran desde otra
+    conexión en lotes de delete_batch. Si algo falla entre escribir y borrar,
+    la siguiente ejecución completa el borrado a partir de los ficheros.
+    """
+    db = db or db_config
+    dias = older_than_days if older_than_days is not None else settings.ARCHIVE_AFTER_DAYS
+    if dias <= 0:
+        raise ValueError("older_than_days debe ser mayor que 0")
+    base = Path(archive_dir) if archive_dir is not None else settings.get_archive_dir()
+    chunk_size = chunk_size or settings.ARCHIVE_CHUNK_SIZE
+    delete_batch = delete_batch or settings.ARCHIVE_DELETE_BATCH
+    # created_at se guarda sin zona (UTC en SQLite, hora del servidor en MySQL)
+    corte = (now or datetime.now(timezone.utc).replace(tzinfo=None)) - timedelta(days=dias)
+
+    db.ensure_ready()
+    if settings.ROLLUP_INTERVAL > 0:
+        # Las filas borradas tienen que estar ya en los agregados diarios
+        refresh_rollups(db)
+    engine = db.engine
+    schema = archive_schema()
+    stats = ArchiveStats()
+    while True:
+        with engine.connect() as conn:
+            primero = conn.execute(select(func.min(TABLA.c.created_at)).where(TABLA.c.created_at < corte)).scalar()
+        if primero is None:
+            break
+        dia = primero.date()
+        desde = datetime.combine(dia, datetime.min.time())
+        hasta = min(desde + timedelta(days=1), corte)
+        directorio = day_dir(base, dia)
+        directorio.mkdir(parents=True, exist_ok=True)
+
+        # Borrado pendiente de una ejecución anterior interrumpida
+        stats.deleted += _delete_archived(engine, sorted(directorio.glob("part-*.parquet")), delete_batch)
+
+        nuevos = []
+        consulta = (
+            select(TABLA)
+            .where(TABLA.c.created_at >= desde, TABLA.c.created_at < hasta)
+            .order_by(TABLA.c.created_at, TABLA.c.id)
+        )
+        with engine.connect() as conn:
+            resultado = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(consulta)
+            for filas in resultado.partitions():
+                nuevos.append(_write_part(directorio, filas, schema))
+                stats.archived += len(filas)
+        stats.files += len(nuevos)
+        stats.deleted += _delete_archived(engine, nuevos, delete_batch)
+        stats.days += 1
+        logger.info(f"💾 Día {dia} archivado en {directorio} ({len(nuevos)} ficheros)")
+    return stats
+
+
+def _archive_job():
+    stats = archive_predictions()
+    if stats.archived:
+        logger.info(f"✅ Retención: {stats.archived} predicciones archivadas, {stats.deleted} borradas")
+
+
+# Instancia global arrancada por el lifespan (ARCHIVE_INTERVAL > 0 y ARCHIVE_AFTER_DAYS > 0)
+archive_scheduler = PeriodicJob(
+    "retención de predicciones", _archive_job,
+    settings.ARCHIVE_INTERVAL if settings.ARCHIVE_AFTER_DAYS > 0 else 0,
+)
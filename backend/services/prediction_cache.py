@@ -0,0 +1,89 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from pydantic import BaseModel
+
+from core.config import settings
+from core.logging_config import setup_logger
+from core.metrics import metrics
+from .model_registry import model_registry
+
+logger = setup_logger(__name__)
+
+
+class PredictionCache:
+    """Caché LRU con caducidad (TTL) de probabilidades de riesgo.
+
+    La clave combina la entrada canonicalizada y la versión del modelo, así que
+    un modelo nuevo nunca sirve resultados del anterior; además la caché se
+    vacía al recargar el modelo para liberar memoria.
+    """
+
+    def __init__(self, max_size: Optional[int] = None, ttl: Optional[float] = None):
+        self.max_size = max_size if max_size is not None else settings.PREDICTION_CACHE_SIZE
+        self.ttl = ttl if ttl is not None else settings.PREDICTION_CACHE_TTL
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(input_data: BaseModel, model_version: str) -> str:
+        """Hash canónico de la entrada (claves ordenadas) y de la versión del modelo"""
+        canonico = json.dumps(input_data.model_dump(), sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(f"{model_version}|{canonico}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[float]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, proba: float):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, proba)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+        logger.info("🧹 Caché de predicciones invalidada")
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "enabled": settings.PREDICTION_CACHE_ENABLED,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+# Instancia global; se vacía cada vez que el registro carga un modelo
+prediction_cache = PredictionCache()
+model_registry.subscribe(lambda handle: prediction_cache.invalidate())
+metrics.gauge("heartwise_prediction_cache_entries", "Entradas en la caché de predicciones", prediction_cache.__len__)
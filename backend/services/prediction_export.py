@@ -0,0 +1,87 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Iterator, List, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.sql import Select
+
+from core.config import settings
+from db.database import DatabaseConfig, db_config
+from db.models import PredictionRecord
+
+TABLA = PredictionRecord.__table__
+EXPORT_COLUMNS = [columna.name for columna in TABLA.columns]
+FORMATOS_EXPORTACION = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def export_query(
+    columns: Optional[Sequence[str]] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    result: Optional[int] = None,
+    age_category: Optional[str] = None,
+) -> Select:
+    """Consulta de exportación; se valida antes de empezar a enviar la respuesta"""
+    columns = list(columns) if columns else EXPORT_COLUMNS
+    desconocidas = [c for c in columns if c not in EXPORT_COLUMNS]
+    if desconocidas:
+        raise ValueError(f"Columnas desconocidas: {', '.join(desconocidas)}")
+    consulta = select(*(TABLA.c[c] for c in columns))
+    if created_from is not None:
+        consulta = consulta.where(TABLA.c.created_at >= created_from)
+    if created_to is not None:
+        consulta = consulta.where(TABLA.c.created_at < created_to)
+    if result is not None:
+        consulta = consulta.where(TABLA.c.prediction_result == result)
+    if age_category is not None:
+        consulta = consulta.where(TABLA.c.age_category == age_category)
+    # Mismo orden que el índice (created_at, id): MySQL lo recorre sin ordenar en memoria
+    return consulta.order_by(TABLA.c.created_at, TABLA.c.id)
+
+
+def _json_default(valor):
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(valor).__name__}")
+
+
+def _ndjson(filas: List, columnas: List[str]) -> bytes:
+    lineas = (json.dumps(dict(zip(columnas, fila)), default=_json_default, separators=(",", ":")) for fila in filas)
+    return ("\n".join(lineas) + "\n").encode()
+
+
+def _csv(filas: List, columnas: List[str]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(filas)
+    return buffer.getvalue().encode()
+
+
+def stream_export(
+    consulta: Select,
+    formato: str = "ndjson",
+    chunk_size: Optional[int] = None,
+    db: Optional[DatabaseConfig] = None,
+) -> Iterator[bytes]:
+    """Genera el fichero de exportación por bloques a medida que llegan de la BD.
+
+    La consulta se ejecuta con un cursor de servidor (stream_results) y se lee
+    de chunk_size en chunk_size filas, así que la memoria no depende del número
+    de filas. Usa su propia conexión: la sesión de la petición ya está cerrada
+    cuando StreamingResponse empieza a consumir el generador.
+    """
+    if formato not in FORMATOS_EXPORTACION:
+        raise ValueError(f"Formato no soportado: {formato} (use {' o '.join(FORMATOS_EXPORTACION)})")
+    serializar = _ndjson if formato == "ndjson" else _csv
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    db = db or db_config
+    db.ensure_ready()
+
+    columnas = [columna.name for columna in consulta.selected_columns]
+    if formato == "csv":
+        yield (",".join(columnas) + "\n").encode()
+    with db.engine.connect() as conn:
+        resultado = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(consulta)
+        for filas in resultado.partitions():
+            yield serializar(filas, columnas)
@@ -0,0 +1,65 @@
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session
+
+from db.models import PredictionRecord
+
+
+def encode_cursor(created_at: datetime, record_id: int) -> str:
+    """Cursor opaco con la posición (created_at, id) del último registro devuelto"""
+    datos = json.dumps({"c": created_at.isoformat(), "i": record_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(datos.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        datos = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        return datetime.fromisoformat(datos["c"]), int(datos["i"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Cursor de paginación inválido") from e
+
+
+def list_predictions(
+    db: Session,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    result: Optional[int] = None,
+    age_category: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> Tuple[List[PredictionRecord], Optional[str]]:
+    """Página de predicciones de la más reciente a la más antigua.
+
+    Paginación por clave (keyset) sobre (created_at, id): cada página continúa
+    justo después del último registro de la anterior con un rango sobre los
+    índices compuestos, sin OFFSET, así que el coste no crece con la página.
+    """
+    consulta = select(PredictionRecord)
+    if result is not None:
+        consulta = consulta.where(PredictionRecord.prediction_result == result)
+    if age_category is not None:
+        consulta = consulta.where(PredictionRecord.age_category == age_category)
+    if created_from is not None:
+        consulta = consulta.where(PredictionRecord.created_at >= created_from)
+    if created_to is not None:
+        consulta = consulta.where(PredictionRecord.created_at < created_to)
+    if cursor:
+        ultimo_created_at, ultimo_id = decode_cursor(cursor)
+        # Equivale a (created_at, id) < (c, i), escrito de forma que MySQL use el rango del índice
+        consulta = consulta.where(or_(
+            PredictionRecord.created_at < ultimo_created_at,
+            and_(PredictionRecord.created_at == ultimo_created_at, PredictionRecord.id < ultimo_id),
+        ))
+    consulta = consulta.order_by(PredictionRecord.created_at.desc(), PredictionRecord.id.desc()).limit(limit + 1)
+
+    registros = list(db.scalars(consulta))
+    siguiente = None
+    if len(registros) > limit:
+        registros = registros[:limit]
+        siguiente = encode_cursor(registros[-1].created_at, registros[-1].id)
+    return registros, siguiente
@@ -0,0 +1,181 @@
+from datetime import date, timedelta
+from typing import List, Optional, Sequence
+
+from sqlalchemy import Date, case, func, select, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.logging_config import setup_logger
+from db.database import DatabaseConfig, db_config
+from db.models import PredictionDailyStat, PredictionRecord, RollupWatermark
+from .periodic_job import PeriodicJob
+
+logger = setup_logger(__name__)
+
+WATERMARK = "prediction_daily_stats"
+DIMENSIONES = ("age_category", "sex")
+_DIALECTOS_UPSERT = {"mysql": mysql, "sqlite": sqlite, "postgresql": postgresql}
+
+
+def _upsert(dialecto: str, filas: List[dict]):
+    """INSERT que suma total y probability_sum si la clave (día, edad, sexo, resultado) ya existe"""
+    try:
+        stmt = _DIALECTOS_UPSERT[dialecto].insert(PredictionDailyStat).values(filas)
+    except KeyError:
+        raise NotImplementedError(f"Agregados no soportados en {dialecto}") from None
+    tabla = PredictionDailyStat.__table__
+    if dialecto == "mysql":
+        return stmt.on_duplicate_key_update(
+            total=tabla.c.total + stmt.inserted.total,
+            probability_sum=tabla.c.probability_sum + stmt.inserted.probability_sum,
+        )
+    return stmt.on_conflict_do_update(
+        index_elements=[c.name for c in tabla.primary_key],
+        set_={
+            "total": tabla.c.total + stmt.excluded.total,
+            "probability_sum": tabla.c.probability_sum + stmt.excluded.probability_sum,
+        },
+    )
+
+
+class _MarcaAvanzada(Exception):
+    """Otro proceso avanzó la marca de agua durante la transacción"""
+
+
+def _ensure_watermark(engine):
+    try:
+        with engine.begin() as conn:
+            existe = conn.execute(select(RollupWatermark.name).where(RollupWatermark.name == WATERMARK)).first()
+            if existe is None:
+                conn.execute(RollupWatermark.__table__.insert().values(name=WATERMARK, last_id=0))
+    except IntegrityError:
+        pass  # otro proceso la creó a la vez
+
+
+def _settled_id(conn, grace: float) -> int:
+    """Último id que ya no puede tener por delante inserciones sin confirmar.
+
+    Los ids se asignan al insertar pero se ven al hacer commit, y hay varios
+    escritores a la vez. created_at se fija al insertar, en el mismo orden que
+    el id, así que una fila con id menor aún sin confirmar tendría un
+    created_at más reciente que el margen: basta con no pasar de la última
+    fila anterior a él (recorriendo el índice (created_at, id) hacia atrás).
+    """
+    tabla = PredictionRecord.__table__
+    limite = conn.execute(select(func.now())).scalar() - timedelta(seconds=grace)
+    return conn.execute(
+        select(tabla.c.id)
+        .where(tabla.c.created_at < limite)
+        .order_by(tabla.c.created_at.desc(), tabla.c.id.desc())
+        .limit(1)
+    ).scalar() or 0
+
+
+def _refresh_batch(engine, batch_size: int, grace: float) -> Optional[int]:
+    """Agrega el siguiente tramo de ids; None si no hay predicciones nuevas"""
+    tabla = PredictionRecord.__table__
+    dia = func.date(tabla.c.created_at, type_=Date).label("day")
+    with engine.begin() as conn:
+        desde = conn.execute(select(RollupWatermark.last_id).where(RollupWatermark.name == WATERMARK)).scalar()
+        ultimo = _settled_id(conn, grace)
+        if desde >= ultimo:
+            return None
+        hasta = min(desde + batch_size, ultimo)
+        grupos = conn.execute(
+            select(
+                dia, tabla.c.age_category, tabla.c.sex, tabla.c.prediction_result,
+                func.count().label("total"), func.sum(tabla.c.probability).label("probability_sum"),
+            )
+            .where(tabla.c.id > desde, tabla.c.id <= hasta)
+            .group_by(dia, tabla.c.age_category, tabla.c.sex, tabla.c.prediction_result)
+        ).all()
+        if grupos:
+            conn.execute(_upsert(engine.dialect.name, [dict(fila._mapping) for fila in grupos]))
+        avance = conn.execute(
+            update(RollupWatermark)
+            .where(RollupWatermark.name == WATERMARK, RollupWatermark.last_id == desde)
+            .values(last_id=hasta)
+        )
+        if avance.rowcount != 1:
+            raise _MarcaAvanzada()  # deshace también la suma de este tramo
+        return sum(fila.total for fila in grupos)
+
+
+def refresh_rollups(
+    db: Optional[DatabaseConfig] = None,
+    batch_size: Optional[int] = None,
+    grace: Optional[float] = None,
+) -> int:
+    """Añade a prediction_daily_stats las predicciones con id posterior a la marca de agua.
+
+    Cada tramo de batch_size ids se agrega en la BD (GROUP BY sobre el rango de
+    la clave primaria) y se suma a los agregados en la misma transacción que
+    avanza la marca, así que cada fila cuenta una sola vez. Si otro proceso
+    avanzó la marca a la vez, la transacción se descarta. La marca no pasa de
+    las filas con más de grace segundos (ROLLUP_GRACE_SECONDS). Devuelve el
+    número de predicciones agregadas.
+    """
+    db = db or db_config
+    batch_size = batch_size or settings.ROLLUP_BATCH_SIZE
+    grace = grace if grace is not None else settings.ROLLUP_GRACE_SECONDS
+    db.ensure_ready()
+    _ensure_watermark(db.engine)
+    agregadas = 0
+    while True:
+        try:
+            tramo = _refresh_batch(db.engine, batch_size, grace)
+        except _MarcaAvanzada:
+            logger.info("⏭ Agregados actualizados por otro proceso")
+            return agregadas
+        if tramo is None:
+            return agregadas
+        agregadas += tramo
+
+
+def daily_stats(
+    db: Session,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    group_by: Sequence[str] = (),
+) -> List[dict]:
+    """Totales por día (y por las dimensiones de group_by) leídos de la tabla de agregados"""
+    desconocidas = set(group_by) - set(DIMENSIONES)
+    if desconocidas:
+        raise ValueError(f"Dimensiones no soportadas: {', '.join(sorted(desconocidas))}")
+    columnas = [PredictionDailyStat.day] + [getattr(PredictionDailyStat, d) for d in DIMENSIONES if d in group_by]
+    consulta = select(
+        *columnas,
+        func.sum(PredictionDailyStat.total).label("total"),
+        func.sum(case((PredictionDailyStat.prediction_result == 1, PredictionDailyStat.total), else_=0)).label("high_risk"),
+        func.sum(PredictionDailyStat.probability_sum).label("probability_sum"),
+    )
+    if date_from is not None:
+        consulta = consulta.where(PredictionDailyStat.day >= date_from)
+    if date_to is not None:
+        consulta = consulta.where(PredictionDailyStat.day < date_to)
+    consulta = consulta.group_by(*columnas).order_by(*columnas)
+
+    filas = []
+    for fila in db.execute(consulta):
+        datos = dict(fila._mapping)
+        suma = datos.pop("probability_sum")
+        datos["high_risk_rate"] = datos["high_risk"] / datos["total"]
+        datos["mean_probability"] = suma / datos["total"]
+        filas.append(datos)
+    return filas
+
+
+def last_rollup_id(db: Session) -> int:
+    return db.scalar(select(RollupWatermark.last_id).where(RollupWatermark.name == WATERMARK)) or 0
+
+
+def _rollup_job():
+    agregadas = refresh_rollups()
+    if agregadas:
+        logger.info(f"📊 {agregadas} predicciones añadidas a los agregados diarios")
+
+
+# Instancia global arrancada por el lifespan
+rollup_scheduler = PeriodicJob("agregados diarios de predicciones", _rollup_job, settings.ROLLUP_INTERVAL)
@@ -0,0 +1,228 @@
+import asyncio
+from typing import Callable, List, Optional
+
+from core.config import settings
+from core.logging_config import setup_logger
+from core.metrics import PERSISTENCE_DROPPED_TOTAL, metrics
+
+logger = setup_logger(__name__)
+
+# Marca que stop() encola detrás de lo pendiente para detener el worker
+_FIN = object()
+
+
+class PersistenceBackpressureError(RuntimeError):
+    """La cola de escritura está llena y no se liberó espacio a tiempo"""
+
+
+class PredictionWriter:
+    """Escritura diferida (write-behind) de predicciones.
+
+    Las peticiones encolan el registro y vuelven sin esperar a MySQL; una
+    tarea en segundo plano agrupa los registros y los inserta en bloque cuando
+    se alcanza batch_size o pasa flush_interval. La cola está acotada: si se
+    llena, enqueue espera hasta enqueue_timeout y después rechaza la petición.
+    Un lote que falla se reintenta con espera exponencial y sigue contando
+    dentro del límite de la cola hasta que se escribe o se descarta. Agotados
+    los reintentos se parte por la mitad hasta aislar las filas que fallan:
+    solo esas se descartan (y se cuentan en PERSISTENCE_DROPPED_TOTAL).
+    """
+
+    def __init__(
+        self,
+        sink: Optional[Callable[[List[dict]], object]] = None,
+        max_queue: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        enqueue_timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        retry_backoff: Optional[float] = None,
+    ):
+        self._sink = sink
+        self.max_queue = max_queue or settings.PERSISTENCE_QUEUE_SIZE
+        self.batch_size = batch_size or settings.PERSISTENCE_BATCH_SIZE
+        self.flush_interval = flush_interval if flush_interval is not None else settings.PERSISTENCE_FLUSH_INTERVAL
+        self.enqueue_timeout = enqueue_timeout if enqueue_timeout is not None else settings.PERSISTENCE_ENQUEUE_TIMEOUT
+        self.max_retries = max_retries if max_retries is not None else settings.PERSISTENCE_MAX_RETRIES
+        self.retry_backoff = retry_backoff if retry_backoff is not None else settings.PERSISTENCE_RETRY_BACKOFF
+        self._queue: Optional[asyncio.Queue] = None
+        self._capacidad: Optional[asyncio.Semaphore] = None
+        self._sin_guardar = 0
+        self._escritura: Optional[asyncio.Future] = None
+        self._en_escritura = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def pending(self) -> int:
+        """Predicciones sin guardar: en cola y en el lote que se está escribiendo"""
+        return self._sin_guardar
+
+    def _write(self, rows: List[dict]):
+        if self._sink is not None:
+            return self._sink(rows)
+        from .database_service import save_prediction_records
+        return save_prediction_records(rows)
+
+    async def start(self):
+        """Arranca la tarea de volcado (se llama desde el lifespan)"""
+        if self.running:
+            return
+        # El límite lo pone el semáforo: una plaza se libera cuando la fila se escribe
+        # (o se descarta), no cuando sale de la cola
+        self._queue = asyncio.Queue()
+        self._capacidad = asyncio.Semaphore(self.max_queue)
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"✅ Escritura diferida activa (lote={self.batch_size}, intervalo={self.flush_interval}s)")
+
+    async def enqueue(self, row: dict):
+        """Encola una predicción; sin tarea activa la guarda directamente fuera del event loop"""
+        if not self.running:
+            await asyncio.to_thread(self._write, [row])
+            return
+        try:
+            await asyncio.wait_for(self._capacidad.acquire(), timeout=self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            raise PersistenceBackpressureError(
+                f"Cola de persistencia llena ({self.max_queue} registros pendientes)"
+            )
+        self._sin_guardar += 1
+        self._queue.put_nowait(row)
+
+    async def enqueue_many(self, rows: List[dict]):
+        """Encola varias predicciones; sin tarea activa las guarda con un único INSERT masivo.
+
+        Las filas que no llegan a encolarse (cola llena o fallo al guardar) se
+        cuentan como descartadas antes de propagar el error.
+        """
+        if not self.running:
+            try:
+                await asyncio.to_thread(self._write, rows)
+            except Exception:
+                PERSISTENCE_DROPPED_TOTAL.inc(len(rows))
+                raise
+            return
+        for encoladas, row in enumerate(rows):
+            try:
+                await self.enqueue(row)
+            except PersistenceBackpressureError:
+                PERSISTENCE_DROPPED_TOTAL.inc(len(rows) - encoladas)
+                raise
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            primero = await self._queue.get()
+            if primero is _FIN:
+                return
+            lote = [primero]
+            limite = loop.time() + self.flush_interval
+            fin = False
+            while len(lote) < self.batch_size:
+                if self._queue.empty():
+                    restante = limite - loop.time()
+                    if restante <= 0:
+                        break
+                    try:
+                        row = await asyncio.wait_for(self._queue.get(), timeout=restante)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    row = self._queue.get_nowait()
+                if row is _FIN:
+                    fin = True
+                    break
+                lote.append(row)
+            await self._flush(lote)
+            if fin:
+                return
+
+    def _resolver(self, n: int):
+        """Libera las plazas de n filas ya escritas o descartadas"""
+        self._sin_guardar -= n
+        for _ in range(n):
+            self._capacidad.release()
+
+    async def _write_async(self, filas: List[dict]):
+        """Escribe fuera del event loop; la escritura en curso queda a la vista de stop()"""
+        self._escritura = asyncio.ensure_future(asyncio.to_thread(self._write, filas))
+        self._en_escritura = len(filas)
+        try:
+            # shield: si stop() cancela el worker, el hilo termina y stop() recoge su resultado
+            await asyncio.shield(self._escritura)
+        finally:
+            self._escritura, self._en_escritura = None, 0
+        self._resolver(len(filas))
+
+    def _descartar(self, error: Exception):
+        PERSISTENCE_DROPPED_TOTAL.inc()
+        self._resolver(1)
+        logger.error(f"❌ Predicción descartada: {str(error)}", exc_info=error)
+
+    async def _write_isolating(self, filas: List[dict]):
+        """Escribe partiendo el lote por la mitad hasta aislar las filas que fallan, que se descartan"""
+        mitad = len(filas) // 2
+        for parte in (filas[:mitad], filas[mitad:]):
+            try:
+                await self._write_async(parte)
+            except Exception as e:
+                if len(parte) == 1:
+                    self._descartar(e)
+                else:
+                    await self._write_isolating(parte)
+
+    async def _flush(self, lote: List[dict]):
+        for intento in range(self.max_retries + 1):
+            try:
+                await self._write_async(lote)
+                return
+            except Exception as e:
+                error = e
+                if intento == self.max_retries:
+                    break
+                espera = self.retry_backoff * 2 ** intento
+                logger.warning(f"⚠ Error al volcar {len(lote)} predicciones; reintento en {espera:g}s: {str(e)}")
+                await asyncio.sleep(espera)
+        logger.error(f"❌ No se pudieron volcar {len(lote)} predicciones tras {self.max_retries + 1} intentos: {str(error)}")
+        if len(lote) == 1:
+            self._descartar(error)
+        else:
+            # Los fallos transitorios ya los cubren los reintentos: se buscan las filas que no entran
+            await self._write_isolating(lote)
+
+    async def stop(self, timeout: Optional[float] = None):
+        """Vacía la cola pendiente y detiene la tarea (se llama al apagar)"""
+        if not self.running:
+            return
+        timeout = timeout if timeout is not None else settings.PERSISTENCE_DRAIN_TIMEOUT
+        task, self._task = self._task, None  # las nuevas predicciones se guardan directamente
+        try:
+            # La marca de fin entra detrás de lo pendiente: el worker vuelca todo y termina
+            self._queue.put_nowait(_FIN)
+            await asyncio.wait_for(asyncio.shield(task), timeout=timeout)
+            logger.info("✅ Cola de persistencia vaciada")
+            return
+        except asyncio.TimeoutError:
+            pass
+        escritura, en_escritura = self._escritura, self._en_escritura
+        task.cancel()
+        # Lo que no ha llegado a la BD se pierde; la escritura en curso puede aún confirmarse
+        perdidas = self.pending - en_escritura
+        if escritura is not None:
+            try:
+                await escritura
+            except Exception:
+                perdidas += en_escritura
+        PERSISTENCE_DROPPED_TOTAL.inc(perdidas)
+        logger.error(f"❌ Apagado con {perdidas} predicciones sin guardar")
+
+
+# Instancia global arrancada y detenida por el lifespan de la API
+prediction_writer = PredictionWriter()
+metrics.gauge(
+    "heartwise_persistence_queue_depth", "Predicciones pendientes de escribir en BD",
+    lambda: prediction_writer.pending
+)
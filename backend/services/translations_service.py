@@ -1,13 +1,9 @@
-import json
-from pathlib import Path
-from core.config import settings
+from .feature_metadata import feature_metadata
 
 def get_feature_translations():
-    """Obtiene traducciones de features desde el JSON"""
-    with open(Path(__file__).parent.parent / settings.FEATURES_PATH) as f:
-        return json.load(f).get('translations', {})
+    """Obtiene traducciones de features desde el JSON (cacheado)"""
+    return dict(feature_metadata.get().translations)
 
 def get_feature_descriptions():
-    """Obtiene descripciones de features desde el JSON"""
-    with open(Path(__file__).parent.parent / settings.FEATURES_PATH) as f:
-        return json.load(f).get('features', {})
\ No newline at end of file
+    """Obtiene descripciones de features desde el JSON (cacheado)"""
+    return {name: feature.to_dict() for name, feature in feature_metadata.get().features.items()}
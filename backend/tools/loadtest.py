@@ -0,0 +1,256 @@
+"""Generador de carga en bucle abierto contra el endpoint de predicción.
+
+Uso (desde backend/):
+
+    python -m tools.loadtest --rate 200 --duration 30 --concurrency 64
+    python -m tools.loadtest --payloads peticiones.jsonl --url http://api:8000
+    python -m tools.loadtest --spawn --rate 500 --output resultado.json
+
+Las peticiones se lanzan a ritmo fijo (o Poisson) sin esperar a las anteriores,
+así que la latencia se mide desde el instante programado y refleja también la
+cola cuando el servidor no da abasto. Sin --payloads se generan entradas
+sintéticas a partir de features_description.json.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from core.config import settings
+from services.feature_metadata import CategoricalFeature, parse_feature_metadata
+from utils.mapping import MAPEO_ES_EN
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+CAMPOS_ENTRADA = [campo for campo in MAPEO_ES_EN if campo not in ("resultado", "probabilidad")]
+CAMPOS_OBLIGATORIOS = frozenset(CAMPOS_ENTRADA) - {"imc"}
+
+
+def cargar_payloads(path: Path) -> List[dict]:
+    """Lee un JSONL de entradas; las líneas que no son una entrada de predicción se ignoran"""
+    payloads, ignoradas = [], 0
+    with open(path, encoding="utf-8") as f:
+        for linea in f:
+            if not linea.strip():
+                continue
+            try:
+                dato = json.loads(linea)
+            except json.JSONDecodeError:
+                ignoradas += 1
+                continue
+            if isinstance(dato, dict) and CAMPOS_OBLIGATORIOS <= dato.keys():
+                payloads.append(dato)
+            else:
+                ignoradas += 1
+    if not payloads:
+        raise ValueError(f"{path} no contiene entradas de predicción ({ignoradas} líneas ignoradas)")
+    if ignoradas:
+        print(f"⚠️  {ignoradas} líneas de {path} no son entradas de predicción y se ignoran")
+    return payloads
+
+
+class GeneradorSintetico:
+    """Entradas aleatorias dentro de los rangos y valores de features_description.json"""
+
+    def __init__(self, seed: int = 0):
+        with open(settings.get_features_path(), encoding="utf-8") as f:
+            self.metadata = parse_feature_metadata(json.load(f))
+        self.rng = random.Random(seed)
+
+    def _valor(self, campo: str):
+        feature = self.metadata.features.get(MAPEO_ES_EN[campo])
+        if isinstance(feature, CategoricalFeature):
+            valor = self.rng.choice(list(feature.values))
+            return int(valor) if valor.lstrip("-").isdigit() else valor
+        if feature is None:
+            raise ValueError(f"features_description.json no describe {MAPEO_ES_EN[campo]}")
+        if feature.type == "int":
+            return self.rng.randint(int(feature.minimum), int(feature.maximum))
+        return round(self.rng.uniform(feature.minimum, feature.maximum), 1)
+
+    def __call__(self) -> dict:
+        payload = {campo: self._valor(campo) for campo in CAMPOS_ENTRADA if campo != "imc"}
+        rango_imc = self.metadata.range("BMI") or (0.0, float("inf"))
+        # El peso se ajusta para que el IMC resultante sea válido (el servidor lo comprueba)
+        altura_m = payload["altura"] / 100
+        payload["peso"] = round(self.rng.uniform(
+            max(self.metadata.range("Weight_(kg)")[0], rango_imc[0] * altura_m ** 2),
+            min(self.metadata.range("Weight_(kg)")[1], rango_imc[1] * altura_m ** 2)
+        ), 1)
+        payload["imc"] = round(payload["peso"] / altura_m ** 2, 2)
+        return payload
+
+
+def percentiles(segundos: List[float]) -> Dict[str, float]:
+    if not segundos:
+        return {}
+    ms = np.asarray(segundos) * 1000
+    return {
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p90_ms": float(np.percentile(ms, 90)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max()),
+    }
+
+
+async def ejecutar_carga(url: str, siguiente_payload, rate: float, duration: float,
+                         concurrency: int, poisson: bool = False, timeout: float = 30.0,
+                         seed: int = 0) -> dict:
+    """Lanza rate peticiones/s durante duration segundos con como máximo concurrency en vuelo"""
+    rng = random.Random(seed)
+    semaforo = asyncio.Semaphore(concurrency)
+    latencias, servicio = [], []
+    estados: Counter = Counter()
+    loop = asyncio.get_running_loop()
+    limites = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(timeout=timeout, limits=limites) as client:
+        async def una(payload: dict, programado: float):
+            async with semaforo:
+                enviado = loop.time()
+                try:
+                    respuesta = await client.post(url, json=payload)
+                    estados[str(respuesta.status_code)] += 1
+                    correcta = respuesta.status_code < 400
+                except httpx.HTTPError as e:
+                    estados[type(e).__name__] += 1
+                    correcta = False
+                fin = loop.time()
+            if correcta:
+                latencias.append(fin - programado)
+                servicio.append(fin - enviado)
+
+        tareas = []
+        inicio = loop.time()
+        programado = inicio
+        while programado < inicio + duration:
+            await asyncio.sleep(max(0.0, programado - loop.time()))
+            tareas.append(asyncio.create_task(una(siguiente_payload(), programado)))
+            programado += rng.expovariate(rate) if poisson else 1.0 / rate
+        fin_envio = loop.time()
+        await asyncio.gather(*tareas)
+        total = loop.time() - inicio
+
+    enviadas = len(tareas)
+    errores = enviadas - len(latencias)
+    return {
+        "url": url,
+        "target_rps": rate,
+        "offered_rps": enviadas / (fin_envio - inicio) if fin_envio > inicio else 0.0,
+        "throughput_rps": len(latencias) / total if total else 0.0,
+        "concurrency": concurrency,
+        "duration_s": total,
+        "sent": enviadas,
+        "ok": len(latencias),
+        "errors": errores,
+        "error_rate": errores / enviadas if enviadas else 0.0,
+        "status": dict(estados),
+        "latency": percentiles(latencias),
+        "service_time": percentiles(servicio),
+    }
+
+
+def _esperar_servidor(url_base: str, proceso: subprocess.Popen, timeout: float = 60.0):
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        if proceso.poll() is not None:
+            raise RuntimeError(f"uvicorn terminó al arrancar (código {proceso.returncode})")
+        try:
+            if httpx.get(f"{url_base}/openapi.json", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"uvicorn no respondió en {timeout:g}s")
+
+
+def lanzar_uvicorn(port: int, workers: int, tmp_dir: Path) -> subprocess.Popen:
+    """Arranca la API local con una BD SQLite temporal"""
+    entorno = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{tmp_dir / 'loadtest.db'}",
+        LOG_LEVEL=os.environ.get("LOG_LEVEL", "WARNING"),
+        LOG_DIR=str(tmp_dir / "logs"),
+    )
+    comando = [
+        sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(workers), "--log-level", "warning", "--no-access-log",
+    ]
+    proceso = subprocess.Popen(comando, cwd=BACKEND_DIR, env=entorno)
+    try:
+        _esperar_servidor(f"http://127.0.0.1:{port}", proceso)
+    except Exception:
+        proceso.terminate()
+        raise
+    return proceso
+
+
+def imprimir_resumen(resultado: dict):
+    print(f"\n📊 {resultado['url']}")
+    print(f"   Enviadas: {resultado['sent']}  OK: {resultado['ok']}  "
+          f"Errores: {resultado['errors']} ({resultado['error_rate']:.2%})  Estados: {resultado['status']}")
+    print(f"   Ritmo ofrecido: {resultado['offered_rps']:.1f}/s  Rendimiento: {resultado['throughput_rps']:.1f}/s")
+    for nombre, clave in (("Latencia", "latency"), ("Servicio", "service_time")):
+        datos = resultado[clave]
+        if datos:
+            print(f"   {nombre}: p50 {datos['p50_ms']:.1f} ms  p90 {datos['p90_ms']:.1f} ms  "
+                  f"p99 {datos['p99_ms']:.1f} ms  máx {datos['max_ms']:.1f} ms")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="URL base de la API")
+    parser.add_argument("--payloads", type=Path, help="JSONL con una entrada de predicción por línea")
+    parser.add_argument("--rate", type=float, default=50.0, help="peticiones por segundo")
+    parser.add_argument("--duration", type=float, default=10.0, help="segundos de carga")
+    parser.add_argument("--concurrency", type=int, default=32, help="máximo de peticiones en vuelo")
+    parser.add_argument("--poisson", action="store_true", help="llegadas de Poisson en lugar de ritmo fijo")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--spawn", action="store_true", help="arranca uvicorn local con SQLite")
+    parser.add_argument("--port", type=int, default=8765, help="puerto de uvicorn con --spawn")
+    parser.add_argument("--workers", type=int, default=1, help="workers de uvicorn con --spawn")
+    parser.add_argument("--output", type=Path, help="guarda el resultado en JSON")
+    args = parser.parse_args(argv)
+
+    if args.payloads:
+        payloads = cargar_payloads(args.payloads)
+        contador = iter(range(sys.maxsize))
+        siguiente = lambda: payloads[next(contador) % len(payloads)]
+    else:
+        siguiente = GeneradorSintetico(args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        proceso = lanzar_uvicorn(args.port, args.workers, Path(tmp)) if args.spawn else None
+        url_base = f"http://127.0.0.1:{args.port}" if args.spawn else args.url.rstrip("/")
+        try:
+            resultado = asyncio.run(ejecutar_carga(
+                f"{url_base}{settings.API_V1_STR}/predict/", siguiente, args.rate, args.duration,
+                args.concurrency, poisson=args.poisson, timeout=args.timeout, seed=args.seed
+            ))
+        finally:
+            if proceso is not None:
+                proceso.terminate()
+                proceso.wait(timeout=30)
+
+    imprimir_resumen(resultado)
+    if args.output:
+        args.output.write_text(json.dumps(resultado, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"💾 Resultado guardado en: {args.output}")
+    return 0 if resultado["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -46,4 +46,32 @@ MAPEO_EN_BDD = {
     # Mantener al final estos dos campos
     "prediction_result": "prediction_result",
     "probability": "probability"
-}
\ No newline at end of file
+}
+# Grupos de edad en orden; la posición es el código que guarda el esquema compacto
+# de la BD (db/types.py), así que solo se pueden añadir al final
+CATEGORIAS_EDAD = (
+    "18-24", "25-29", "30-34", "35-39", "40-44", "45-49",
+    "50-54", "55-59", "60-64", "65-69", "70-74", "75-79", "80+"
+)
+
+# Valores en texto del dataset CVD original -> códigos que usa la API
+# (los de features_description.json)
+_SI_NO = {"No": 0, "Yes": 1}
+VALORES_CVD = {
+    "General_Health": {"Excellent": 1, "Very Good": 2, "Good": 3, "Fair": 4, "Poor": 5},
+    "Checkup": {
+        "Never": 0, "5 or more years ago": 1, "Within the past 5 years": 2,
+        "Within the past 2 years": 3, "Within the past year": 4,
+    },
+    "Exercise": _SI_NO,
+    "Skin_Cancer": _SI_NO,
+    "Other_Cancer": _SI_NO,
+    "Depression": _SI_NO,
+    "Diabetes": {
+        "No": 0, "No, pre-diabetes or borderline diabetes": 1, "Yes": 2,
+        "Yes, but female told only during pregnancy": 3,
+    },
+    "Arthritis": _SI_NO,
+    "Sex": {"Male": 0, "Female": 1},
+    "Smoking_History": _SI_NO,
+}
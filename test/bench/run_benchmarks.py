@@ -0,0 +1,341 @@
+# run_benchmarks.py
+"""Benchmarks de inferencia: predicción individual, lotes, concurrencia, caché y API.
+
+Uso (desde la raíz del proyecto):
+
+    python test/bench/run_benchmarks.py                      # ejecución completa
+    python test/bench/run_benchmarks.py --quick              # tamaños reducidos
+    python test/bench/run_benchmarks.py --compare anterior.json --max-regression 20
+
+Los resultados se guardan en JSON (test/bench/results/ por defecto) para
+compararlos entre versiones. La base de datos se sustituye por un SQLite
+temporal, así que no hace falta MySQL.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = PROJECT_ROOT / "backend"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+EDADES = [
+    "18-24", "25-29", "30-34", "35-39", "40-44", "45-49", "50-54",
+    "55-59", "60-64", "65-69", "70-74", "75-79", "80+"
+]
+TAMANOS_LOTE = [1, 10, 100, 1000, 10000, 100000]
+CONCURRENCIAS = [1, 8, 64]
+
+
+def _configurar_entorno(tmp_dir: Path):
+    """Sustituye la BD por SQLite y silencia los logs antes de importar el backend"""
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmp_dir / 'bench.db'}"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("LOG_DIR", str(tmp_dir / "logs"))
+    sys.path.insert(0, str(BACKEND_DIR))
+
+
+def paciente_aleatorio(rng: random.Random) -> dict:
+    """Entrada válida y variada (evita que la caché oculte el coste de inferencia)"""
+    altura = rng.randint(150, 200)
+    peso = round(rng.uniform(18, 40) * (altura / 100) ** 2)
+    return dict(
+        altura=altura, peso=peso, imc=round(peso / (altura / 100) ** 2, 2),
+        salud_general=rng.randint(1, 5), consumo_alcohol=rng.randint(0, 30),
+        consumo_fruta=rng.randint(0, 120), consumo_vegetales=rng.randint(0, 120),
+        consumo_papas=rng.randint(0, 60), chequeo_medico=rng.randint(0, 4),
+        ejercicio=rng.randint(0, 1), cancer_piel=rng.randint(0, 1), otro_cancer=rng.randint(0, 1),
+        depresion=rng.randint(0, 1), diabetes=rng.randint(0, 3), artritis=rng.randint(0, 1),
+        sexo=rng.randint(0, 1), historial_tabaquismo=rng.randint(0, 1), edad=rng.choice(EDADES)
+    )
+
+
+def resumen_latencias(segundos) -> dict:
+    """Percentiles en milisegundos de una lista de duraciones"""
+    ms = np.asarray(segundos, dtype=np.float64) * 1000
+    return {
+        "n": int(ms.size),
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p90_ms": float(np.percentile(ms, 90)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max()),
+    }
+
+
+def _sin_cache():
+    from core.config import settings
+    settings.PREDICTION_CACHE_ENABLED = False
+
+
+def _con_cache():
+    from core.config import settings
+    from services.prediction_cache import prediction_cache
+    settings.PREDICTION_CACHE_ENABLED = True
+    prediction_cache.invalidate()
+    prediction_cache.hits = prediction_cache.misses = prediction_cache.evictions = 0
+
+
+async def _con_servicios(corrutina):
+    """Arranca la escritura diferida como en el lifespan de la API"""
+    from services.prediction_writer import prediction_writer
+    await prediction_writer.start()
+    try:
+        return await corrutina
+    finally:
+        await prediction_writer.stop()
+
+
+def bench_make_prediction(n: int, rng: random.Random) -> dict:
+    """Distribución de latencia de make_prediction, una petición detrás de otra"""
+    from models.schemas import PredictionInput
+    from services.model_service import make_prediction
+
+    entradas = [PredictionInput(**paciente_aleatorio(rng)) for _ in range(n)]
+
+    async def ejecutar():
+        await make_prediction(entradas[0])  # calentamiento
+        duraciones = []
+        for entrada in entradas:
+            inicio = time.perf_counter()
+            await make_prediction(entrada)
+            duraciones.append(time.perf_counter() - inicio)
+        return duraciones
+
+    _sin_cache()
+    return resumen_latencias(asyncio.run(_con_servicios(ejecutar())))
+
+
+def bench_concurrente(n: int, rng: random.Random) -> dict:
+    """Rendimiento de make_prediction con varias peticiones simultáneas en el event loop"""
+    from models.schemas import PredictionInput
+    from services.model_service import make_prediction
+
+    entradas = [PredictionInput(**paciente_aleatorio(rng)) for _ in range(n)]
+    resultados = {}
+    _sin_cache()
+    for concurrencia in CONCURRENCIAS:
+        async def ejecutar():
+            semaforo = asyncio.Semaphore(concurrencia)
+            duraciones = []
+
+            async def una(entrada):
+                async with semaforo:
+                    inicio = time.perf_counter()
+                    await make_prediction(entrada)
+                    duraciones.append(time.perf_counter() - inicio)
+
+            inicio = time.perf_counter()
+            await asyncio.gather(*(una(e) for e in entradas))
+            return duraciones, time.perf_counter() - inicio
+
+        duraciones, total = asyncio.run(_con_servicios(ejecutar()))
+        resultados[str(concurrencia)] = dict(resumen_latencias(duraciones), rps=n / total)
+    return resultados
+
+
+def bench_lotes(tamanos, rng: random.Random) -> dict:
+    """Rendimiento del codificador por lotes y de predict_proba según el tamaño del lote"""
+    from models.schemas import PredictionInput
+    from services.model_registry import model_registry
+
+    handle = model_registry.get()
+    base = [PredictionInput(**paciente_aleatorio(rng)) for _ in range(1000)]
+    resultados = {}
+    for tamano in tamanos:
+        entradas = (base * (tamano // len(base) + 1))[:tamano]
+        repeticiones = max(1, min(200, 20000 // tamano))
+
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            features = handle.encoder.encode_batch(entradas)
+        encode_s = (time.perf_counter() - inicio) / repeticiones
+
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            handle.model.predict_proba(features)
+        proba_s = (time.perf_counter() - inicio) / repeticiones
+
+        resultados[str(tamano)] = {
+            "encode_ms": encode_s * 1000,
+            "predict_proba_ms": proba_s * 1000,
+            "encode_rows_per_s": tamano / encode_s,
+            "predict_proba_rows_per_s": tamano / proba_s,
+        }
+    return resultados
+
+
+def bench_cache(n: int, distintos: int, rng: random.Random) -> dict:
+    """Tasa de aciertos y latencia con una carga que repite entradas (distribución Zipf)"""
+    from models.schemas import PredictionInput
+    from services.model_service import make_prediction
+    from services.prediction_cache import prediction_cache
+
+    catalogo = [PredictionInput(**paciente_aleatorio(rng)) for _ in range(distintos)]
+    pesos = 1.0 / np.arange(1, distintos + 1)
+    elegidos = np.random.default_rng(rng.randint(0, 2**31)).choice(
+        distintos, size=n, p=pesos / pesos.sum()
+    )
+
+    async def ejecutar():
+        duraciones = []
+        for i in elegidos:
+            inicio = time.perf_counter()
+            await make_prediction(catalogo[i])
+            duraciones.append(time.perf_counter() - inicio)
+        return duraciones
+
+    _con_cache()
+    duraciones = asyncio.run(_con_servicios(ejecutar()))
+    estadisticas = prediction_cache.stats()
+    return dict(
+        resumen_latencias(duraciones),
+        distinct_inputs=distintos,
+        hits=estadisticas["hits"],
+        misses=estadisticas["misses"],
+        hit_rate=estadisticas["hit_rate"],
+    )
+
+
+def bench_api(n: int, tamano_lote: int, rng: random.Random) -> dict:
+    """Peticiones HTTP de extremo a extremo con TestClient (lifespan completo, BD SQLite)"""
+    from fastapi.testclient import TestClient
+    from core.config import settings
+    from main import app
+
+    _sin_cache()
+    cuerpos = [paciente_aleatorio(rng) for _ in range(n)]
+    lote = {"records": [paciente_aleatorio(rng) for _ in range(tamano_lote)]}
+    url = f"{settings.API_V1_STR}/predict/"
+    with TestClient(app) as client:
+        client.post(url, json=cuerpos[0]).raise_for_status()  # calentamiento
+        duraciones = []
+        for cuerpo in cuerpos:
+            inicio = time.perf_counter()
+            client.post(url, json=cuerpo).raise_for_status()
+            duraciones.append(time.perf_counter() - inicio)
+
+        inicio = time.perf_counter()
+        client.post(f"{url}batch", json=lote).raise_for_status()
+        lote_s = time.perf_counter() - inicio
+
+    return {
+        "predict": resumen_latencias(duraciones),
+        "batch": {"size": tamano_lote, "ms": lote_s * 1000, "rows_per_s": tamano_lote / lote_s},
+    }
+
+
+def metadatos() -> dict:
+    import sklearn
+    from core.config import settings
+    from services.model_registry import model_registry
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "sklearn": sklearn.__version__,
+        "model_version": model_registry.get().version,
+        "model_format": settings.MODEL_FORMAT,
+        "inference_executor": settings.INFERENCE_EXECUTOR,
+        "microbatch_enabled": settings.MICROBATCH_ENABLED,
+    }
+
+
+def _aplanar(datos: dict, prefijo: str = "") -> dict:
+    plano = {}
+    for clave, valor in datos.items():
+        ruta = f"{prefijo}{clave}"
+        if isinstance(valor, dict):
+            plano.update(_aplanar(valor, ruta + "."))
+        elif isinstance(valor, (int, float)) and not isinstance(valor, bool):
+            plano[ruta] = float(valor)
+    return plano
+
+
+def comparar(actual: dict, anterior: dict, max_regresion: float) -> int:
+    """Imprime la variación de cada métrica; devuelve cuántas empeoran más de max_regresion %"""
+    ahora, antes = _aplanar(actual["results"]), _aplanar(anterior["results"])
+    regresiones = 0
+    for metrica in sorted(ahora.keys() & antes.keys()):
+        if not antes[metrica]:
+            continue
+        cambio = (ahora[metrica] - antes[metrica]) / antes[metrica] * 100
+        # En latencias (_ms) subir es peor; en rendimiento (per_s, rps, hit_rate) bajar es peor
+        peor = cambio if metrica.endswith("_ms") else -cambio
+        marca = ""
+        if metrica.endswith(("_ms", "per_s", "rps", "hit_rate")) and peor > max_regresion:
+            regresiones += 1
+            marca = "  ⚠️ regresión"
+        print(f"{metrica:55s} {antes[metrica]:14.3f} -> {ahora[metrica]:14.3f} ({cambio:+7.1f}%){marca}")
+    return regresiones
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="menos iteraciones y lotes hasta 10k")
+    parser.add_argument("--output", type=Path, help="fichero JSON de resultados")
+    parser.add_argument("--compare", type=Path, help="JSON de una ejecución anterior")
+    parser.add_argument("--max-regression", type=float, default=20.0,
+                        help="porcentaje de empeoramiento tolerado con --compare (por defecto 20)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    n = 200 if args.quick else 2000
+    tamanos = [t for t in TAMANOS_LOTE if not args.quick or t <= 10000]
+    with tempfile.TemporaryDirectory() as tmp:
+        _configurar_entorno(Path(tmp))
+        rng = random.Random(args.seed)
+        resultados = {"meta": metadatos(), "results": {}}
+        pasos = [
+            ("make_prediction", lambda: bench_make_prediction(n, rng)),
+            ("concurrent", lambda: bench_concurrente(n, rng)),
+            ("batch", lambda: bench_lotes(tamanos, rng)),
+            ("cache", lambda: bench_cache(n * 2, max(10, n // 10), rng)),
+            ("api", lambda: bench_api(max(50, n // 4), 1000, rng)),
+        ]
+        for nombre, paso in pasos:
+            print(f"⏱️  {nombre}...", flush=True)
+            resultados["results"][nombre] = paso()
+
+        from db.database import db_config
+        if db_config.engine is not None:
+            db_config.engine.dispose()
+
+    destino = args.output or RESULTS_DIR / f"bench-{datetime.now():%Y%m%d-%H%M%S}.json"
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    destino.write_text(json.dumps(resultados, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"💾 Resultados guardados en: {destino}")
+
+    if args.compare:
+        anterior = json.loads(args.compare.read_text(encoding="utf-8"))
+        regresiones = comparar(resultados, anterior, args.max_regression)
+        if regresiones:
+            print(f"❌ {regresiones} métricas empeoran más de un {args.max_regression:g}%")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
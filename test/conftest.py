@@ -1,5 +1,33 @@
+from typing import Iterable
+
 import pytest
 
+from db.database import db_config
+from db.models import PredictionRecord
+
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    """Redirige la BD global a un SQLite temporal que se inicializa en el primer uso"""
+    anterior = (db_config.DATABASE_URL, db_config.engine, db_config._session_factory, db_config._schema_ready)
+    db_config.DATABASE_URL = f"sqlite:///{tmp_path / 'test.db'}"
+    db_config.engine, db_config._session_factory, db_config._schema_ready = None, None, False
+    yield db_config
+    if db_config.engine is not None:
+        db_config.engine.dispose()
+    db_config.DATABASE_URL, db_config.engine, db_config._session_factory, db_config._schema_ready = anterior
+
+
+
+@pytest.fixture
+def seed_predictions(sqlite_db):
+    """Inserta filas (dicts de helpers.prediction_row) en la BD temporal y la devuelve"""
+    def sembrar(filas: Iterable[dict]):
+        with sqlite_db.session_scope() as db:
+            db.add_all(PredictionRecord(**fila) for fila in filas)
+        return sqlite_db
+    return sembrar
+
 def pytest_terminal_summary(terminalreporter, exitstatus, config):
     unit_count = 0
     integration_count = 0
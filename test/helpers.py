@@ -0,0 +1,19 @@
+# helpers.py
+"""Datos de prueba compartidos por los tests"""
+from services.model_registry import SMOKE_INPUT
+
+# Paciente de referencia (el mismo con el que se valida el modelo al cargarlo)
+PACIENTE = SMOKE_INPUT.model_dump()
+
+
+def prediction_row(**cambios) -> dict:
+    """Fila de la tabla predictions para el paciente de referencia; cambios sustituye columnas"""
+    fila = dict(
+        height=170, weight=70, bmi=24.2, general_health=3, age_category="50-54",
+        alcohol_consumption=1, fruit_consumption=7, green_vegetables_consumption=7,
+        fried_potato_consumption=1, checkup=1, exercise=1, skin_cancer=0, other_cancer=0,
+        depression=0, diabetes=0, arthritis=0, sex=1, smoking_history=0,
+        prediction_result=0, probability=0.1,
+    )
+    fila.update(cambios)
+    return fila
@@ -0,0 +1,52 @@
+# test_batch_prediction.py
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.v1.routes.predict import router
+from services.prediction_writer import prediction_writer
+from .helpers import PACIENTE
+
+
+@pytest.fixture
+def cliente(monkeypatch):
+    """Cliente del router de predicción con la escritura en BD sustituida por una lista"""
+    guardadas = []
+    monkeypatch.setattr(prediction_writer, "_sink", guardadas.extend)
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app), guardadas
+
+
+@pytest.mark.integration
+def test_batch_endpoint_scores_valid_rows_and_reports_errors(cliente):
+    client, guardadas = cliente
+    registros = [PACIENTE, dict(PACIENTE, altura="alta"), dict(PACIENTE, edad="80+"), "no es un objeto", None]
+    respuesta = client.post("/predict/batch", json={"records": registros})
+    assert respuesta.status_code == 200
+    datos = respuesta.json()
+    assert (datos["total"], datos["scored"]) == (5, 2)
+    assert [item["index"] for item in datos["predictions"]] == [0, 2]
+    assert all(item["prediction"] in (0, 1) for item in datos["predictions"])
+    assert [error["index"] for error in datos["errors"]] == [1, 3, 4]
+    assert len(guardadas) == 2
+
+
+@pytest.mark.integration
+def test_batch_endpoint_rejects_empty_batch(cliente):
+    client, guardadas = cliente
+    assert client.post("/predict/batch", json={"records": []}).status_code == 422
+    assert guardadas == []
+
+
+@pytest.mark.integration
+def test_batch_endpoint_returns_scores_when_saving_fails(cliente, monkeypatch):
+    client, _ = cliente
+
+    def sin_bd(rows):
+        raise ConnectionError("MySQL no disponible")
+
+    monkeypatch.setattr(prediction_writer, "_sink", sin_bd)
+    respuesta = client.post("/predict/batch", json={"records": [PACIENTE, PACIENTE]})
+    assert respuesta.status_code == 200
+    assert respuesta.json()["scored"] == 2
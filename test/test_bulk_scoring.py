@@ -0,0 +1,105 @@
+# test_bulk_scoring.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from models.schemas import PredictionInput
+from services.bulk_scoring import score_file, score_frame
+from services.model_registry import model_registry
+from utils.mapping import MAPEO_ES_EN
+from .helpers import PACIENTE
+
+EDADES = ["18-24", "40-44", "60-64", "80+"]
+
+
+def _pacientes(n: int) -> pd.DataFrame:
+    filas = []
+    for i in range(n):
+        altura = 150 + i % 50
+        peso = 60 + i % 40
+        filas.append(dict(
+            PACIENTE, altura=altura, peso=peso, imc=round(peso / (altura / 100) ** 2, 2),
+            salud_general=1 + i % 5, diabetes=i % 4, edad=EDADES[i % len(EDADES)]
+        ))
+    return pd.DataFrame(filas)
+
+
+@pytest.mark.unit
+def test_score_frame_matches_single_prediction_encoding():
+    handle = model_registry.get()
+    pacientes = _pacientes(40)
+    resultado = score_frame(pacientes, handle)
+    esperado = handle.model.predict_proba(
+        handle.encoder.encode_batch([PredictionInput(**fila) for fila in pacientes.to_dict("records")])
+    )[:, 1]
+    np.testing.assert_allclose(resultado["probabilidad"].to_numpy(), esperado)
+    assert (resultado["error"] == "").all()
+
+
+@pytest.mark.unit
+def test_score_frame_accepts_english_columns_and_rejects_invalid_rows():
+    handle = model_registry.get()
+    pacientes = _pacientes(3).drop(columns=["imc"])
+    pacientes.loc[1, "edad"] = "17"
+    pacientes["peso"] = pacientes["peso"].astype(object)
+    pacientes.loc[2, "peso"] = "no numérico"
+    ingles = pacientes.rename(columns=MAPEO_ES_EN)
+    resultado = score_frame(ingles, handle)
+    assert list(resultado.columns[:3]) == list(ingles.columns[:3])
+    assert resultado["prediccion"].isna().tolist() == [False, True, True]
+    assert "edad" in resultado.loc[1, "error"]
+    assert "peso" in resultado.loc[2, "error"]
+
+
+@pytest.mark.unit
+def test_score_frame_decodes_raw_cvd_categories():
+    handle = model_registry.get()
+    # Filas tal como vienen en el CSV del dataset CVD
+    crudo = pd.DataFrame([
+        {"General_Health": "Very Good", "Checkup": "Within the past year", "Exercise": "Yes",
+         "Heart_Disease": "No", "Skin_Cancer": "No", "Other_Cancer": "No", "Depression": "No",
+         "Diabetes": "No, pre-diabetes or borderline diabetes", "Arthritis": "Yes", "Sex": "Female",
+         "Age_Category": "70-74", "Height_(cm)": 165.0, "Weight_(kg)": 77.11, "BMI": 28.29,
+         "Smoking_History": "No", "Alcohol_Consumption": 0.0, "Fruit_Consumption": 30.0,
+         "Green_Vegetables_Consumption": 16.0, "FriedPotato_Consumption": 12.0},
+        {"General_Health": "Poor", "Checkup": "Never", "Exercise": "No", "Heart_Disease": "Yes",
+         "Skin_Cancer": "Yes", "Other_Cancer": "No", "Depression": "Yes",
+         "Diabetes": "Yes, but female told only during pregnancy", "Arthritis": "No", "Sex": "Male",
+         "Age_Category": "80+", "Height_(cm)": 180.0, "Weight_(kg)": 90.0, "BMI": 27.78,
+         "Smoking_History": "Yes", "Alcohol_Consumption": 4.0, "Fruit_Consumption": 12.0,
+         "Green_Vegetables_Consumption": 3.0, "FriedPotato_Consumption": 8.0},
+    ])
+    resultado = score_frame(crudo, handle)
+    assert (resultado["error"] == "").all()
+
+    codificado = crudo.drop(columns=["Heart_Disease"]).rename(columns={v: k for k, v in MAPEO_ES_EN.items()})
+    codificado = codificado.assign(
+        salud_general=[2, 5], chequeo_medico=[4, 0], ejercicio=[1, 0], cancer_piel=[0, 1], otro_cancer=[0, 0],
+        depresion=[0, 1], diabetes=[1, 3], artritis=[1, 0], sexo=[1, 0], historial_tabaquismo=[0, 1],
+    )
+    esperado = score_frame(codificado, handle)
+    np.testing.assert_allclose(resultado["probabilidad"].to_numpy(), esperado["probabilidad"].to_numpy())
+
+
+@pytest.mark.unit
+def test_score_frame_requires_input_columns():
+    with pytest.raises(ValueError):
+        score_frame(_pacientes(2).drop(columns=["edad"]), model_registry.get())
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("salida,workers", [("resultado.csv", 1), ("resultado.parquet", 2)])
+def test_score_file_streams_chunks_in_order(tmp_path, salida, workers):
+    pytest.importorskip("pyarrow")
+    pacientes = _pacientes(250)
+    entrada = tmp_path / "entrada.csv"
+    pacientes.to_csv(entrada, index=False)
+
+    stats = score_file(entrada, tmp_path / salida, chunk_size=60, workers=workers)
+    assert (stats.rows, stats.scored, stats.rejected) == (250, 250, 0)
+
+    leido = pd.read_csv(tmp_path / salida) if salida.endswith(".csv") else pd.read_parquet(tmp_path / salida)
+    esperado = score_frame(pacientes, model_registry.get())
+    assert len(leido) == 250
+    np.testing.assert_allclose(leido["probabilidad"].to_numpy(), esperado["probabilidad"].to_numpy())
+    assert leido["altura"].tolist() == pacientes["altura"].tolist()
@@ -0,0 +1,55 @@
+# test_compact_model.py
+import pathlib
+
+import numpy as np
+import pytest
+
+from services.compact_model import export_compact_model, load_compact_model
+from services.model_registry import ModelRegistry, SMOKE_INPUT
+
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parents[1]
+MODELS_PATH = PROJECT_ROOT / 'backend' / 'data'
+COMPACT_FILE = MODELS_PATH / "modelo_compacto.npz"
+
+
+@pytest.fixture(scope="module")
+def handle():
+    return ModelRegistry(model_format="pickle").get()
+
+
+def _filas_aleatorias(handle, n=500):
+    rng = np.random.default_rng(0)
+    X = rng.integers(0, 5, size=(n, len(handle.variables))).astype(np.float64)
+    X[:, :3] = rng.uniform(10, 200, size=(n, 3))
+    return X
+
+
+@pytest.mark.unit
+def test_export_roundtrip_matches_sklearn(handle, tmp_path):
+    destino = export_compact_model(
+        handle.model, {"umbral_optimo": handle.umbral_optimo, "variables": list(handle.variables)},
+        tmp_path / "modelo.npz"
+    )
+    compacto, info = load_compact_model(destino)
+    assert info["umbral_optimo"] == handle.umbral_optimo
+    assert tuple(info["variables"]) == handle.variables
+    X = _filas_aleatorias(handle)
+    np.testing.assert_allclose(compacto.predict_proba(X), handle.model.predict_proba(X), atol=1e-9)
+    np.testing.assert_array_equal(compacto.predict(X), handle.model.predict(X))
+
+
+@pytest.mark.unit
+def test_export_rejects_non_linear_model(tmp_path):
+    with pytest.raises(ValueError):
+        export_compact_model(object(), {"umbral_optimo": 0.3, "variables": []}, tmp_path / "x.npz")
+
+
+@pytest.mark.unit
+def test_registry_serves_committed_compact_artifact(handle):
+    compacto = ModelRegistry(model_format="compact", compact_path=COMPACT_FILE).get()
+    assert compacto.variables == handle.variables
+    assert compacto.umbral_optimo == handle.umbral_optimo
+    features = compacto.encoder.encode(SMOKE_INPUT)
+    np.testing.assert_allclose(
+        compacto.model.predict_proba(features), handle.model.predict_proba(features), atol=1e-9
+    )
@@ -0,0 +1,102 @@
+# test_compact_schema.py
+from datetime import datetime
+
+import pytest
+from sqlalchemy import Index, MetaData, create_engine, func, inspect, insert, select
+from sqlalchemy.exc import StatementError
+
+from core.config import settings
+from db.migrations import TABLA_ANTERIOR, copy_to_compact, is_compact, migrate_to_compact
+from db.models import predictions_table
+from utils.mapping import CATEGORIAS_EDAD
+from .helpers import prediction_row
+
+
+def _registro(i: int) -> dict:
+    # Decimales que el esquema compacto tiene que redondear
+    return prediction_row(
+        height=170.46, weight=70.25 + i, bmi=24.177, general_health=i % 5, age_category=CATEGORIAS_EDAD[i % 13],
+        alcohol_consumption=1.5, fruit_consumption=30, green_vegetables_consumption=7.04,
+        fried_potato_consumption=0, checkup=4, diabetes=3, smoking_history=1,
+        prediction_result=i % 2, probability=0.123456, created_at=datetime(2025, 1, 1, 12, 0, i % 60),
+    )
+
+
+def _leer_compacta(engine, nombre="predictions"):
+    tabla = predictions_table(MetaData(), nombre, compact=True, indexes=False)
+    with engine.connect() as conn:
+        return {fila.id: fila for fila in conn.execute(select(tabla))}
+
+
+@pytest.fixture
+def legacy_db(seed_predictions):
+    """BD con la tabla predictions en el esquema original y algunas filas"""
+    return seed_predictions(_registro(i) for i in range(23))
+
+
+@pytest.mark.unit
+def test_compact_types_round_trip():
+    engine = create_engine("sqlite://")
+    tabla = predictions_table(MetaData(), "predictions", compact=True)
+    tabla.create(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(tabla), [_registro(0)])
+        fila = conn.execute(select(tabla)).one()
+        with pytest.raises(StatementError, match="Grupo de edad desconocido"):
+            conn.execute(insert(tabla), [{**_registro(1), "age_category": "90+"}])
+    assert fila.age_category == "18-24"
+    assert fila.height == 170.5 and fila.weight == 70.3 and fila.bmi == 24.18
+    assert fila.green_vegetables_consumption == 7.0 and fila.fruit_consumption == 30.0
+    assert fila.diabetes == 3 and fila.probability == 0.123456
+
+
+@pytest.mark.integration
+def test_migration_copies_in_chunks_and_swaps(legacy_db, monkeypatch):
+    monkeypatch.setattr(settings, "DB_COMPACT_SCHEMA", True)
+    assert not is_compact(legacy_db.engine)
+    # Copia empezada con una versión que indexaba id aparte de la clave primaria
+    compacta = predictions_table(MetaData(), "predictions_compact", compact=True, indexes=False)
+    Index("ix_predictions_compact_id", compacta.c.id)
+    compacta.create(legacy_db.engine)
+
+    assert migrate_to_compact(legacy_db, chunk_size=4) == 23
+    assert is_compact(legacy_db.engine)
+
+    filas = _leer_compacta(legacy_db.engine)
+    assert sorted(filas) == list(range(1, 24))
+    for id_, fila in filas.items():
+        original = _registro(id_ - 1)
+        assert fila.age_category == original["age_category"]
+        assert fila.weight == pytest.approx(70.3 + id_ - 1)  # x.25 redondea hacia arriba, como ROUND()
+        assert fila.bmi == 24.18
+        assert fila.prediction_result == original["prediction_result"]
+        assert fila.created_at.replace(tzinfo=None) == original["created_at"]
+
+    inspector = inspect(legacy_db.engine)
+    assert inspector.has_table(TABLA_ANTERIOR)
+    assert {"ix_predictions_created_at_id", "ix_predictions_age_created_at_id"} <= {
+        indice["name"] for indice in inspector.get_indexes("predictions")
+    }
+    assert inspector.get_indexes(TABLA_ANTERIOR) == []
+    assert all(indice["column_names"] != ["id"] for indice in inspector.get_indexes("predictions"))
+    # Repetir la migración no hace nada
+    assert migrate_to_compact(legacy_db) == 0
+
+
+@pytest.mark.integration
+def test_copy_resumes_and_catches_up(legacy_db, seed_predictions):
+    engine = legacy_db.engine
+    assert copy_to_compact(engine, chunk_size=10) == 23
+    seed_predictions(map(_registro, range(23, 30)))
+    assert copy_to_compact(engine, chunk_size=10) == 7
+    assert sorted(_leer_compacta(engine, "predictions_compact")) == list(range(1, 31))
+    with engine.connect() as conn:
+        tabla = predictions_table(MetaData(), "predictions", compact=False, indexes=False)
+        assert conn.execute(select(func.count()).select_from(tabla)).scalar() == 30
+
+
+@pytest.mark.unit
+def test_swap_requires_compact_setting(monkeypatch):
+    monkeypatch.setattr(settings, "DB_COMPACT_SCHEMA", False)
+    with pytest.raises(ValueError, match="DB_COMPACT_SCHEMA"):
+        migrate_to_compact(None)
@@ -0,0 +1,54 @@
+# test_feature_encoder.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from models.schemas import PredictionInput
+from services.feature_encoder import FeatureEncoder
+from services.model_registry import model_registry
+from .helpers import PACIENTE as PACIENTE_REFERENCIA
+
+PACIENTE = dict(PACIENTE_REFERENCIA, depresion=1, artritis=1, edad="70-74")
+
+
+@pytest.fixture(scope="module")
+def handle():
+    return model_registry.get()
+
+
+def _referencia_pandas(inputs, variables):
+    """Codificación de referencia con pandas (one-hot de edad explícito)"""
+    df = pd.DataFrame([i.to_english_dict() for i in inputs])
+    dummies = pd.get_dummies(df.pop("Age_Category"), prefix="Age_Category")
+    df = pd.concat([df, dummies], axis=1)
+    return df.reindex(columns=list(variables), fill_value=0).to_numpy(dtype=np.float64)
+
+
+@pytest.mark.unit
+def test_encode_matches_pandas(handle):
+    inputs = [PredictionInput(**dict(PACIENTE, edad=edad)) for edad in ["18-24", "60-64", "80+"]]
+    esperado = _referencia_pandas(inputs, handle.variables)
+    np.testing.assert_array_equal(handle.encoder.encode_batch(inputs), esperado)
+    np.testing.assert_array_equal(handle.encoder.encode(inputs[0]), esperado[:1])
+
+
+@pytest.mark.unit
+def test_age_one_hot_fires(handle):
+    fila = handle.encoder.encode(PredictionInput(**PACIENTE))[0]
+    columna = handle.variables.index("Age_Category_70-74")
+    assert fila[columna] == 1.0
+    edades = [i for i, v in enumerate(handle.variables) if v.startswith("Age_Category_")]
+    assert fila[edades].sum() == 1.0
+
+
+@pytest.mark.unit
+def test_reference_age_has_no_column(handle):
+    fila = handle.encoder.encode(PredictionInput(**dict(PACIENTE, edad="60-64")))[0]
+    edades = [i for i, v in enumerate(handle.variables) if v.startswith("Age_Category_")]
+    assert fila[edades].sum() == 0.0
+
+
+@pytest.mark.unit
+def test_unknown_variable_rejected():
+    with pytest.raises(ValueError):
+        FeatureEncoder(["General_Health", "Variable_Inexistente"])
@@ -0,0 +1,59 @@
+# test_feature_metadata.py
+import json
+import os
+
+import pytest
+
+from services.feature_metadata import FeatureMetadataStore, parse_feature_metadata
+from services.translations_service import get_feature_descriptions, get_feature_translations
+
+
+def _escribir(path, altura_max, mtime_ns):
+    path.write_text(json.dumps({
+        "features": {
+            "Height_(cm)": {"description": "Altura", "type": "float", "range": [100, altura_max]},
+            "Sex": {"description": "Sexo", "type": "categorical", "values": {"0": "Mujer", "1": "Hombre"}},
+        },
+        "translations": {"Height_(cm)": "Altura (cm)"},
+    }))
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.mark.unit
+def test_repo_metadata_is_valid():
+    assert get_feature_translations()["BMI"] == "IMC"
+    assert get_feature_descriptions()["BMI"]["range"] == [15.0, 50.0]
+
+
+@pytest.mark.unit
+def test_lookups_and_immutability(tmp_path):
+    path = tmp_path / "features.json"
+    _escribir(path, 250, 1_000_000_000)
+    metadata = FeatureMetadataStore(path, check_interval=0).get()
+    assert metadata.range("Height_(cm)") == (100.0, 250.0)
+    assert metadata.categorical_values("Sex") == ("0", "1")
+    assert metadata.translate("Sex") == "Sex"
+    with pytest.raises(TypeError):
+        metadata.features["Sex"] = None
+
+
+@pytest.mark.unit
+def test_reloads_only_when_mtime_changes(tmp_path):
+    path = tmp_path / "features.json"
+    _escribir(path, 250, 1_000_000_000)
+    store = FeatureMetadataStore(path, check_interval=0)
+    primero = store.get()
+    assert store.get() is primero
+    _escribir(path, 220, 2_000_000_000)
+    assert store.get().range("Height_(cm)") == (100.0, 220.0)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("feature", [
+    {"type": "float", "range": [250, 100]},
+    {"type": "categorical", "values": {}},
+    {"type": "texto"},
+])
+def test_invalid_metadata_rejected(feature):
+    with pytest.raises(ValueError):
+        parse_feature_metadata({"features": {"X": feature}, "translations": {}})
@@ -0,0 +1,50 @@
+# test_inference_executor.py
+import asyncio
+import dataclasses
+
+import numpy as np
+import pytest
+
+from services.inference_executor import InferenceExecutor
+from services.model_registry import model_registry
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("mode", ["inline", "thread", "process"])
+def test_executor_matches_direct_predict(mode):
+    handle = model_registry.get()
+    features = np.zeros((4, len(handle.variables)))
+    features[:, handle.variables.index("Age_Category_80+")] = 1.0
+    esperado = handle.model.predict_proba(features)[:, 1]
+
+    executor = InferenceExecutor(mode=mode, workers=2)
+    try:
+        obtenido = asyncio.run(executor.predict_proba(handle, features))
+    finally:
+        executor.shutdown()
+    np.testing.assert_allclose(obtenido, esperado)
+
+
+@pytest.mark.unit
+def test_invalid_mode_rejected():
+    with pytest.raises(ValueError):
+        InferenceExecutor(mode="gpu")
+
+
+@pytest.mark.unit
+def test_process_mode_never_scores_with_another_model_version():
+    handle = model_registry.get()
+    features = np.zeros((2, len(handle.variables)))
+
+    class ModeloFijo:
+        def predict_proba(self, features):
+            return np.tile([0.1, 0.9], (len(features), 1))
+
+    # Handle de una versión que los workers no tienen (recarga en curso)
+    nuevo = dataclasses.replace(handle, model=ModeloFijo(), version="otra-version")
+    executor = InferenceExecutor(mode="process", workers=1)
+    try:
+        obtenido = asyncio.run(executor.predict_proba(nuevo, features))
+    finally:
+        executor.shutdown()
+    np.testing.assert_allclose(obtenido, [0.9, 0.9])
@@ -0,0 +1,92 @@
+# test_input_validation.py
+import pytest
+from pydantic import ValidationError
+
+from models.schemas import PredictionInput
+from services.input_validation import SKIP_METADATA_CHECKS, batch_rule_errors, current_rules
+from services.model_service import validate_batch_records
+from .helpers import PACIENTE
+
+
+@pytest.mark.unit
+def test_rules_generated_from_metadata():
+    reglas = current_rules()
+    assert (reglas["altura"].minimum, reglas["altura"].maximum) == (100.0, 250.0)
+    assert (reglas["imc"].minimum, reglas["imc"].maximum) == (15.0, 50.0)
+    assert reglas["diabetes"].allowed == {0.0, 1.0, 2.0, 3.0}
+    assert "80+" in reglas["edad"].allowed_labels
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("campo, valor", [
+    ("altura", 90), ("imc", 80.0), ("ejercicio", 2), ("diabetes", 7), ("consumo_alcohol", -1),
+])
+def test_out_of_range_rejected(campo, valor):
+    with pytest.raises(ValidationError) as exc:
+        PredictionInput(**dict(PACIENTE, **{campo: valor}))
+    assert exc.value.errors()[0]["loc"] == (campo,)
+
+
+@pytest.mark.unit
+def test_batch_mask_matches_row_validation():
+    registros = [
+        PACIENTE,
+        dict(PACIENTE, altura=300),
+        dict(PACIENTE, imc=10, sexo=3),
+        dict(PACIENTE, edad="80+"),
+    ]
+    inputs = [PredictionInput.model_validate(r, context={SKIP_METADATA_CHECKS: True}) for r in registros]
+    errores = batch_rule_errors(inputs)
+    assert [len(e) for e in errores] == [0, 1, 2, 0]
+    assert {e["loc"][0] for e in errores[2]} == {"imc", "sexo"}
+
+
+@pytest.mark.unit
+def test_batch_rejects_nan_in_required_fields():
+    sin_imc = {k: v for k, v in PACIENTE.items() if k != "imc"}
+    registros = [dict(PACIENTE, consumo_alcohol=float("nan")), sin_imc]
+    indices, _, errores = validate_batch_records(registros)
+    assert indices == [1]
+    assert [e["loc"][0] for e in errores[0].errors] == ["consumo_alcohol"]
+
+
+@pytest.mark.unit
+def test_validate_batch_records_orders_errors():
+    registros = [dict(PACIENTE, imc=99), PACIENTE, dict(PACIENTE, edad="x"), dict(PACIENTE, peso=20)]
+    indices, inputs, errores = validate_batch_records(registros)
+    assert indices == [1]
+    assert [error.index for error in errores] == [0, 2, 3]
+
+
+@pytest.mark.unit
+def test_bmi_derived_when_omitted():
+    datos = {k: v for k, v in PACIENTE.items() if k != "imc"}
+    entrada = PredictionInput(**datos)
+    assert entrada.imc == pytest.approx(24.22)
+    assert entrada.to_english_dict()["BMI"] == entrada.imc
+
+
+@pytest.mark.unit
+def test_inconsistent_bmi_rejected_by_default():
+    with pytest.raises(ValidationError):
+        PredictionInput(**dict(PACIENTE, imc=35.0))
+
+
+@pytest.mark.unit
+def test_inconsistent_bmi_flagged(monkeypatch):
+    from core.config import settings
+    monkeypatch.setattr(settings, "BMI_MISMATCH_POLICY", "flag")
+    entrada = PredictionInput(**dict(PACIENTE, imc=35.0))
+    assert entrada.imc == 35.0
+    assert len(entrada.avisos) == 1
+
+
+@pytest.mark.unit
+def test_batch_bmi_vectorized():
+    sin_imc = {k: v for k, v in PACIENTE.items() if k != "imc"}
+    registros = [sin_imc, PACIENTE, dict(PACIENTE, imc=40.0), dict(sin_imc, altura=100, peso=190)]
+    indices, inputs, errores = validate_batch_records(registros)
+    assert indices == [0, 1]
+    assert inputs[0].imc == pytest.approx(24.22)
+    assert [error.index for error in errores] == [2, 3]
+    assert all(e.errors[0]["loc"] == ["imc"] for e in errores)
@@ -0,0 +1,32 @@
+# test_loadtest.py
+import json
+
+import pytest
+
+from models.schemas import PredictionInput
+from tools.loadtest import GeneradorSintetico, cargar_payloads
+
+
+@pytest.mark.unit
+def test_synthetic_payloads_are_valid():
+    generador = GeneradorSintetico(seed=1)
+    for _ in range(200):
+        PredictionInput(**generador())
+
+
+@pytest.mark.unit
+def test_load_payloads_skips_non_prediction_lines(tmp_path):
+    valido = GeneradorSintetico(seed=2)()
+    fichero = tmp_path / "payloads.jsonl"
+    fichero.write_text("\n".join([
+        json.dumps(valido), json.dumps({"request_id": "x", "body": "texto"}), "no es json", ""
+    ]), encoding="utf-8")
+    assert cargar_payloads(fichero) == [valido]
+
+
+@pytest.mark.unit
+def test_load_payloads_without_entries_fails(tmp_path):
+    fichero = tmp_path / "vacio.jsonl"
+    fichero.write_text(json.dumps({"request_id": "x"}) + "\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        cargar_payloads(fichero)
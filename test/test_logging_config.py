@@ -0,0 +1,84 @@
+# test_logging_config.py
+import json
+import logging
+import pathlib
+import queue
+import subprocess
+import sys
+from logging.handlers import QueueHandler
+
+import pytest
+
+from core.logging_config import DeferredQueueHandler, JsonFormatter, _parse_levels, configure_logging, setup_logger
+
+BACKEND_DIR = pathlib.Path(__file__).resolve().parents[1] / 'backend'
+
+
+@pytest.mark.unit
+def test_import_does_not_start_listener():
+    codigo = (
+        "import main\n"
+        "from core import logging_config\n"
+        "assert logging_config._listener is None, 'el listener arrancó al importar'\n"
+    )
+    subprocess.run([sys.executable, "-c", codigo], cwd=BACKEND_DIR, check=True, capture_output=True)
+
+
+@pytest.mark.unit
+def test_setup_logger_does_not_accumulate_handlers():
+    for _ in range(5):
+        logger = setup_logger("services.model_service")
+    configure_logging()
+    assert logger.handlers == []
+    colas = [h for h in logging.getLogger().handlers if isinstance(h, QueueHandler)]
+    assert len(colas) == 1
+
+
+@pytest.mark.unit
+def test_uvicorn_loggers_go_through_the_queue():
+    # Como deja los loggers la configuración por defecto de uvicorn
+    access = logging.getLogger("uvicorn.access")
+    access.addHandler(logging.StreamHandler(sys.stdout))
+    access.propagate = False
+    configure_logging()
+    assert access.handlers == [] and access.propagate
+    assert logging.getLogger("uvicorn").handlers == []
+
+
+@pytest.mark.unit
+def test_json_formatter():
+    record = logging.LogRecord("services.x", logging.WARNING, __file__, 1, "hola %s", ("mundo",), None)
+    data = json.loads(JsonFormatter().format(record))
+    assert data["level"] == "WARNING"
+    assert data["logger"] == "services.x"
+    assert data["message"] == "hola mundo"
+
+
+@pytest.mark.unit
+def test_queue_handler_defers_traceback_formatting():
+    cola = queue.SimpleQueue()
+    logger = logging.getLogger("test.deferred")
+    logger.propagate = False
+    logger.addHandler(DeferredQueueHandler(cola))
+    try:
+        try:
+            raise ValueError("fallo")
+        except ValueError:
+            logger.error("error %d", 42, exc_info=True)
+    finally:
+        logger.handlers.clear()
+        logger.propagate = True
+
+    record = cola.get_nowait()
+    assert record.exc_info is not None and record.exc_text is None  # sin formatear en el hilo que llama
+    data = json.loads(JsonFormatter().format(record))
+    assert data["message"] == "error 42"
+    assert "ValueError: fallo" in data["exception"]
+
+
+@pytest.mark.unit
+def test_parse_levels():
+    assert _parse_levels("services.model_service=warning, sqlalchemy.engine=INFO,,basura") == {
+        "services.model_service": "WARNING",
+        "sqlalchemy.engine": "INFO",
+    }
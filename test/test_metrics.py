@@ -0,0 +1,57 @@
+# test_metrics.py
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core.metrics import MetricsMiddleware, MetricsRegistry, metrics, stage_timer
+
+
+@pytest.mark.unit
+def test_histogram_renders_cumulative_buckets():
+    registro = MetricsRegistry()
+    histograma = registro.histogram("latencia_seconds", "Latencia", ["stage"], buckets=(0.1, 1.0))
+    for valor in (0.05, 0.1, 0.5, 3.0):
+        histograma.observe(valor, stage="encode")
+    texto = registro.render()
+    assert '# TYPE latencia_seconds histogram' in texto
+    assert 'latencia_seconds_bucket{stage="encode",le="0.1"} 2' in texto
+    assert 'latencia_seconds_bucket{stage="encode",le="1"} 3' in texto
+    assert 'latencia_seconds_bucket{stage="encode",le="+Inf"} 4' in texto
+    assert 'latencia_seconds_count{stage="encode"} 4' in texto
+    assert 'latencia_seconds_sum{stage="encode"} 3.65' in texto
+
+
+@pytest.mark.unit
+def test_counter_requires_declared_labels():
+    contador = MetricsRegistry().counter("peticiones_total", "Peticiones", ["result"])
+    contador.inc(result="hit")
+    contador.inc(2, result="hit")
+    assert contador.value(result="hit") == 3
+    with pytest.raises(ValueError):
+        contador.inc(estado="x")
+
+
+@pytest.mark.unit
+def test_stage_timer_records_on_error():
+    histograma = metrics.get("heartwise_stage_duration_seconds")
+    antes = histograma.count(stage="prueba")
+    with pytest.raises(RuntimeError):
+        with stage_timer("prueba"):
+            raise RuntimeError("fallo")
+    assert histograma.count(stage="prueba") == antes + 1
+
+
+@pytest.mark.unit
+def test_middleware_uses_route_template():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    def item(item_id: int):
+        return {"id": item_id}
+
+    with TestClient(app) as client:
+        client.get("/items/1")
+        client.get("/items/2")
+    total = metrics.get("heartwise_http_requests_total")
+    assert total.value(method="GET", path="/items/{item_id}", status="200") == 2
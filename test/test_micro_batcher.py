@@ -0,0 +1,92 @@
+# test_micro_batcher.py
+import asyncio
+import dataclasses
+
+import numpy as np
+import pytest
+
+from services.model_registry import model_registry
+from services.model_service import MicroBatcher
+
+
+class EjecutorContador:
+    """Puntúa directamente y registra el tamaño de cada lote recibido"""
+    def __init__(self):
+        self.lotes = []
+
+    async def predict_proba(self, handle, features):
+        self.lotes.append((handle.version, len(features)))
+        return handle.model.predict_proba(features)[:, 1]
+
+
+def _filas(handle, n):
+    """n filas de una columna cada una, con el grupo de edad variando"""
+    edades = [i for i, nombre in enumerate(handle.variables) if nombre.startswith("Age_Category_")]
+    filas = []
+    for i in range(n):
+        fila = np.zeros((1, len(handle.variables)))
+        fila[0, edades[i % len(edades)]] = 1.0
+        filas.append(fila)
+    return filas
+
+
+@pytest.mark.unit
+def test_micro_batcher_coalesces_concurrent_requests():
+    handle = model_registry.get()
+    filas = _filas(handle, 16)
+    ejecutor = EjecutorContador()
+
+    async def escenario():
+        batcher = MicroBatcher(window_ms=50, max_batch=64, executor=ejecutor)
+        await batcher.start()
+        resultados = await asyncio.gather(*[batcher.predict_proba(handle, fila) for fila in filas])
+        await batcher.stop()
+        return resultados
+
+    resultados = asyncio.run(escenario())
+    np.testing.assert_allclose(resultados, handle.model.predict_proba(np.vstack(filas))[:, 1])
+    assert ejecutor.lotes == [(handle.version, 16)]
+
+
+@pytest.mark.unit
+def test_micro_batcher_scores_each_model_handle_separately():
+    handle = model_registry.get()
+
+    class ModeloFijo:
+        def predict_proba(self, features):
+            return np.tile([0.1, 0.9], (len(features), 1))
+
+    # Recarga a mitad de ventana: filas de dos versiones en el mismo lote
+    nuevo = dataclasses.replace(handle, model=ModeloFijo(), version="otra-version")
+    filas = _filas(handle, 4)
+    handles = [handle, nuevo, handle, nuevo]
+    ejecutor = EjecutorContador()
+
+    async def escenario():
+        batcher = MicroBatcher(window_ms=50, max_batch=64, executor=ejecutor)
+        await batcher.start()
+        resultados = await asyncio.gather(*[batcher.predict_proba(h, f) for h, f in zip(handles, filas)])
+        await batcher.stop()
+        return resultados
+
+    resultados = asyncio.run(escenario())
+    assert sorted(ejecutor.lotes) == sorted([(handle.version, 2), ("otra-version", 2)])
+    assert resultados[1] == resultados[3] == pytest.approx(0.9)
+    np.testing.assert_allclose([resultados[0], resultados[2]], handle.model.predict_proba(np.vstack(filas[::2]))[:, 1])
+
+
+@pytest.mark.unit
+def test_micro_batcher_stop_scores_collecting_batch():
+    handle = model_registry.get()
+    fila = _filas(handle, 1)[0]
+
+    async def escenario():
+        # Ventana larga: el colector aún está juntando el lote cuando llega stop()
+        batcher = MicroBatcher(window_ms=10000, max_batch=64, executor=EjecutorContador())
+        await batcher.start()
+        pendiente = asyncio.create_task(batcher.predict_proba(handle, fila))
+        await asyncio.sleep(0.01)
+        await asyncio.wait_for(batcher.stop(), timeout=2)
+        return await asyncio.wait_for(pendiente, timeout=2)
+
+    assert asyncio.run(escenario()) == pytest.approx(handle.model.predict_proba(fila)[0, 1])
@@ -0,0 +1,83 @@
+# test_model_registry.py
+import dataclasses
+import pathlib
+import warnings
+
+import pytest
+
+from services.model_registry import SMOKE_INPUT, ModelRegistry, ModelValidationError, predict_proba
+
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parents[1]
+MODELS_PATH = PROJECT_ROOT / 'backend' / 'data'
+MODEL_FILE = MODELS_PATH / "modelo_predictor_enfermedad_cardiaca.pkl"
+INFO_FILE = MODELS_PATH / "info_modelo_cardiaco.pkl"
+
+
+@pytest.fixture
+def registry():
+    return ModelRegistry(model_path=MODEL_FILE, info_path=INFO_FILE)
+
+
+@pytest.mark.unit
+def test_registry_loads_once(registry):
+    assert not registry.loaded
+    handle = registry.get()
+    assert registry.loaded
+    assert registry.get() is handle
+    assert 0.0 < handle.umbral_optimo < 1.0
+    assert list(handle.model.feature_names_in_) == list(handle.variables)
+
+
+@pytest.mark.unit
+def test_handle_is_immutable(registry):
+    handle = registry.get()
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        handle.umbral_optimo = 0.9
+
+
+@pytest.mark.unit
+def test_reload_publishes_new_handle(registry):
+    first = registry.get()
+    second = registry.load()
+    assert second is not first
+    assert second.version == first.version
+
+
+@pytest.mark.unit
+def test_reload_rejects_invalid_candidate(tmp_path):
+    import joblib
+    import shutil
+
+    model_file = tmp_path / MODEL_FILE.name
+    info_file = tmp_path / INFO_FILE.name
+    shutil.copy(MODEL_FILE, model_file)
+    shutil.copy(INFO_FILE, info_file)
+    registry = ModelRegistry(model_path=model_file, info_path=info_file)
+    actual = registry.get()
+
+    info = joblib.load(info_file)
+    info["umbral_optimo"] = 1.5
+    joblib.dump(info, info_file)
+    with pytest.raises(ModelValidationError):
+        registry.reload()
+    assert registry.get() is actual
+
+    info["umbral_optimo"] = 0.4
+    joblib.dump(info, info_file)
+    nuevo = registry.reload()
+    assert registry.get() is nuevo
+    assert nuevo.umbral_optimo == 0.4
+    assert nuevo.version != actual.version
+
+
+@pytest.mark.unit
+def test_feature_name_warning_silenced_only_inside_predict():
+    handle = ModelRegistry(model_format="pickle").get()
+    features = handle.encoder.encode(SMOKE_INPUT)
+    with warnings.catch_warnings(record=True) as avisos:
+        warnings.simplefilter("always")
+        predict_proba(handle.model, features)
+        assert avisos == []
+        # Fuera del helper el filtro global no cambia
+        handle.model.predict_proba(features)
+    assert any("valid feature names" in str(aviso.message) for aviso in avisos)
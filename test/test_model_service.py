@@ -0,0 +1,50 @@
+# test_model_service.py
+import asyncio
+import pathlib
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import func, select
+
+from db.database import db_config
+from db.models import PredictionRecord
+from models.schemas import PredictionInput
+from services.model_service import make_batch_prediction, make_prediction
+from .helpers import PACIENTE
+
+BACKEND_DIR = pathlib.Path(__file__).resolve().parents[1] / 'backend'
+
+
+def _contar_predicciones():
+    with db_config.session_scope() as db:
+        return db.execute(select(func.count()).select_from(PredictionRecord)).scalar()
+
+
+@pytest.mark.unit
+def test_import_does_not_connect():
+    codigo = (
+        "import main\n"
+        "from db.database import db_config\n"
+        "assert db_config.engine is None, 'la BD se conectó al importar'\n"
+    )
+    subprocess.run([sys.executable, "-c", codigo], cwd=BACKEND_DIR, check=True, capture_output=True)
+
+
+@pytest.mark.integration
+def test_make_prediction_persists_lazily(sqlite_db):
+    resultado = asyncio.run(make_prediction(PredictionInput(**PACIENTE)))
+    assert resultado.prediction in (0, 1)
+    assert 0.0 <= resultado.probability <= 1.0
+    assert sqlite_db.engine is not None
+    assert _contar_predicciones() == 1
+
+
+@pytest.mark.integration
+def test_batch_prediction_reports_row_errors(sqlite_db):
+    registros = [PACIENTE, dict(PACIENTE, edad="17"), dict(PACIENTE, edad="80+")]
+    resultado = asyncio.run(make_batch_prediction(registros))
+    assert (resultado.total, resultado.scored) == (3, 2)
+    assert [item.index for item in resultado.predictions] == [0, 2]
+    assert [error.index for error in resultado.errors] == [1]
+    assert _contar_predicciones() == 2
@@ -0,0 +1,94 @@
+# test_prediction_archive.py
+from datetime import datetime, timedelta
+
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import pytest
+from sqlalchemy import MetaData, create_engine, func, insert, select
+
+from db.models import PredictionRecord, predictions_table
+from services.prediction_archive import _write_part, archive_predictions, archive_schema, day_dir
+from .helpers import prediction_row
+
+AHORA = datetime(2025, 3, 10, 12, 0, 0)
+
+
+def _registro(created_at: datetime, i: int) -> dict:
+    return prediction_row(prediction_result=i % 2, probability=i / 100, created_at=created_at)
+
+
+@pytest.fixture
+def historial(seed_predictions):
+    """12 predicciones por día durante 5 días (del 4 al 8 de marzo) y 6 recientes"""
+    antiguas = [_registro(datetime(2025, 3, 4 + dia) + timedelta(hours=2 * i), i) for dia in range(5) for i in range(12)]
+    return seed_predictions(antiguas + [_registro(AHORA - timedelta(hours=i), i) for i in range(6)])
+
+
+def _contar(db_config) -> int:
+    with db_config.session_scope() as db:
+        return db.scalar(select(func.count()).select_from(PredictionRecord))
+
+
+@pytest.mark.integration
+def test_archives_old_rows_by_day_and_deletes_them(historial, tmp_path):
+    archivo = tmp_path / "archivo"
+    stats = archive_predictions(historial, older_than_days=3, archive_dir=archivo, chunk_size=5,
+                                delete_batch=4, now=AHORA)
+
+    # Corte en el 7 de marzo a las 12:00: días 4, 5 y 6 completos y la mañana del 7
+    assert (stats.days, stats.archived, stats.deleted) == (4, 42, 42)
+    assert stats.files == 3 * 3 + 2
+    assert _contar(historial) == 60 + 6 - 42
+
+    dataset = ds.dataset(archivo, format="parquet", partitioning="hive")
+    tabla = dataset.to_table()
+    assert tabla.num_rows == 42
+    assert sorted(set(tabla.column("date").to_pylist())) == ["2025-03-04", "2025-03-05", "2025-03-06", "2025-03-07"]
+    assert tabla.schema.field("age_category").type == archive_schema().field("age_category").type
+    assert max(tabla.column("created_at").to_pylist()) < AHORA - timedelta(days=3)
+
+    # Sin nada más que archivar, una segunda ejecución no hace nada
+    assert archive_predictions(historial, older_than_days=3, archive_dir=archivo, now=AHORA).archived == 0
+
+
+@pytest.mark.integration
+def test_interrupted_run_finishes_deletes_from_files(historial, tmp_path):
+    archivo = tmp_path / "archivo"
+    # Simula una ejecución que escribió el fichero del día 4 pero no llegó a borrar
+    tabla = PredictionRecord.__table__
+    consulta = select(tabla).where(tabla.c.created_at < datetime(2025, 3, 5))
+    with historial.engine.connect() as conn:
+        filas = conn.execute(consulta).all()
+    directorio = day_dir(archivo, datetime(2025, 3, 4).date())
+    directorio.mkdir(parents=True)
+    _write_part(directorio, filas, archive_schema())
+
+    stats = archive_predictions(historial, older_than_days=5, archive_dir=archivo, now=AHORA)
+
+    assert stats.archived == 6  # solo el día 5 hasta las 12:00; el 4 ya estaba en Parquet
+    assert stats.deleted == 12 + 6
+    assert ds.dataset(archivo, format="parquet", partitioning="hive").count_rows() == 18
+
+
+@pytest.mark.unit
+def test_requires_positive_age():
+    with pytest.raises(ValueError):
+        archive_predictions(older_than_days=0)
+
+
+@pytest.mark.unit
+def test_compact_schema_archives_same_values(tmp_path):
+    compacta = predictions_table(MetaData(), "predictions", compact=True)
+    assert archive_schema(compacta) == archive_schema()
+
+    engine = create_engine("sqlite://")
+    compacta.create(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(compacta), [_registro(AHORA - timedelta(days=i), i) for i in range(3)])
+        filas = conn.execute(select(compacta).order_by(compacta.c.id)).all()
+    fichero = _write_part(tmp_path, filas, archive_schema(compacta))
+
+    tabla = pq.read_table(fichero)
+    assert tabla.schema == archive_schema()
+    assert tabla.column("age_category").to_pylist() == ["50-54"] * 3
+    assert tabla.column("bmi").to_pylist() == [24.2] * 3
@@ -0,0 +1,63 @@
+# test_prediction_cache.py
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.v1.routes.admin import router as admin_router
+from models.schemas import PredictionInput
+from services.model_registry import ModelRegistry
+from services.prediction_cache import PredictionCache
+from .helpers import PACIENTE
+
+
+@pytest.mark.unit
+def test_key_is_canonical_and_versioned():
+    a = PredictionInput(**PACIENTE)
+    b = PredictionInput(**dict(reversed(list(PACIENTE.items())), altura=170.0))
+    assert PredictionCache.make_key(a, "v1") == PredictionCache.make_key(b, "v1")
+    assert PredictionCache.make_key(a, "v1") != PredictionCache.make_key(a, "v2")
+    c = PredictionInput(**dict(PACIENTE, edad="80+"))
+    assert PredictionCache.make_key(a, "v1") != PredictionCache.make_key(c, "v1")
+
+
+@pytest.mark.unit
+def test_lru_eviction_and_stats():
+    cache = PredictionCache(max_size=2, ttl=60)
+    cache.set("a", 0.1)
+    cache.set("b", 0.2)
+    assert cache.get("a") == 0.1  # "b" pasa a ser el menos usado
+    cache.set("c", 0.3)
+    assert cache.get("b") is None
+    assert cache.get("c") == 0.3
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["size"]) == (2, 1, 1, 2)
+
+
+@pytest.mark.unit
+def test_ttl_expiry():
+    cache = PredictionCache(max_size=10, ttl=0.01)
+    cache.set("a", 0.5)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+
+@pytest.mark.unit
+def test_invalidated_on_model_reload():
+    registry = ModelRegistry()
+    cache = PredictionCache(max_size=10, ttl=60)
+    registry.subscribe(lambda handle: cache.invalidate())
+    cache.set("a", 0.5)
+    registry.load()
+    assert cache.get("a") is None
+
+
+@pytest.mark.unit
+def test_stats_endpoint_is_admin_only():
+    app = FastAPI()
+    app.include_router(admin_router)
+    admin = TestClient(app, client=("127.0.0.1", 5000))
+    externo = TestClient(app, client=("203.0.113.7", 5000))
+    assert set(admin.get("/admin/cache/stats").json()) >= {"hits", "misses"}
+    assert externo.get("/admin/cache/stats").status_code == 403
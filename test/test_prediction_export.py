@@ -0,0 +1,74 @@
+# test_prediction_export.py
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.v1.routes.predictions import router
+from services.prediction_export import export_query, stream_export
+from .helpers import prediction_row
+
+INICIO = datetime(2025, 6, 1, 0, 0, 0)
+
+
+def _registro(i: int) -> dict:
+    return prediction_row(
+        age_category="50-54" if i % 2 else "80+", prediction_result=i % 2,
+        probability=i / 100, created_at=INICIO + timedelta(minutes=i),
+    )
+
+
+@pytest.fixture
+def historial(seed_predictions):
+    return seed_predictions(_registro(i) for i in range(23))
+
+
+@pytest.fixture
+def client(historial):
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app, client=("127.0.0.1", 5000))
+
+
+@pytest.mark.integration
+def test_stream_yields_one_block_per_cursor_chunk(historial):
+    bloques = list(stream_export(export_query(columns=["id"]), "ndjson", chunk_size=5))
+    assert len(bloques) == 5
+    ids = [json.loads(linea)["id"] for bloque in bloques for linea in bloque.decode().splitlines()]
+    assert ids == list(range(1, 24))
+
+
+@pytest.mark.integration
+def test_ndjson_export_with_columns_and_filters(client):
+    respuesta = client.get("/predictions/export", params={
+        "columns": "id, created_at,probability", "result": 1,
+        "created_from": (INICIO + timedelta(minutes=5)).isoformat(),
+        "created_to": (INICIO + timedelta(minutes=15)).isoformat(),
+    })
+    assert respuesta.status_code == 200
+    assert respuesta.headers["content-type"].startswith("application/x-ndjson")
+    filas = [json.loads(linea) for linea in respuesta.text.splitlines()]
+    assert [f["id"] for f in filas] == [6, 8, 10, 12, 14]
+    assert set(filas[0]) == {"id", "created_at", "probability"}
+    assert datetime.fromisoformat(filas[0]["created_at"]) == INICIO + timedelta(minutes=5)
+
+
+@pytest.mark.integration
+def test_csv_export_has_header_and_all_rows(client):
+    respuesta = client.get("/predictions/export", params={"format": "csv", "age_category": "80+"})
+    assert respuesta.headers["content-disposition"] == 'attachment; filename="predictions.csv"'
+    filas = list(csv.DictReader(io.StringIO(respuesta.text)))
+    assert len(filas) == 12
+    assert list(filas[0])[:3] == ["id", "height", "weight"]
+    assert {f["age_category"] for f in filas} == {"80+"}
+
+
+@pytest.mark.integration
+def test_export_rejects_unknown_columns(client):
+    respuesta = client.get("/predictions/export", params={"columns": "id,password"})
+    assert respuesta.status_code == 400
+    assert "password" in respuesta.json()["detail"]
@@ -0,0 +1,104 @@
+# test_prediction_history.py
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, create_engine, inspect
+
+from api.v1.routes.predictions import router
+from db.models import PredictionRecord
+from services.prediction_history import decode_cursor, encode_cursor, list_predictions
+from .helpers import prediction_row
+
+INICIO = datetime(2025, 1, 1, 12, 0, 0)
+EDADES = ["18-24", "50-54", "80+"]
+
+
+def _registro(i: int) -> dict:
+    return prediction_row(
+        age_category=EDADES[i % 3], prediction_result=i % 2,
+        # Varios registros comparten segundo: el id desempata
+        created_at=INICIO + timedelta(seconds=i // 4),
+    )
+
+
+@pytest.fixture
+def historial(seed_predictions):
+    return seed_predictions(_registro(i) for i in range(45))
+
+
+def _todas_las_paginas(db, **filtros):
+    ids, cursor = [], None
+    while True:
+        registros, cursor = list_predictions(db, limit=7, cursor=cursor, **filtros)
+        ids.extend(r.id for r in registros)
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.integration
+def test_keyset_pages_cover_all_rows_in_order(historial):
+    with historial.session_scope() as db:
+        ids = _todas_las_paginas(db)
+        esperado = [r.id for r in sorted(
+            db.query(PredictionRecord).all(), key=lambda r: (r.created_at, r.id), reverse=True
+        )]
+    assert ids == esperado
+    assert len(set(ids)) == 45
+
+
+@pytest.mark.integration
+def test_filters_combine_with_pagination(historial):
+    desde, hasta = INICIO + timedelta(seconds=2), INICIO + timedelta(seconds=8)
+    with historial.session_scope() as db:
+        ids = _todas_las_paginas(db, result=1, age_category="50-54", created_from=desde, created_to=hasta)
+        registros = db.query(PredictionRecord).filter(PredictionRecord.id.in_(ids)).all()
+        assert ids
+        assert all(r.prediction_result == 1 and r.age_category == "50-54" for r in registros)
+        assert all(desde <= r.created_at < hasta for r in registros)
+
+
+@pytest.mark.unit
+def test_cursor_roundtrip_and_invalid_cursor():
+    assert decode_cursor(encode_cursor(INICIO, 42)) == (INICIO, 42)
+    with pytest.raises(ValueError):
+        decode_cursor("no-es-un-cursor")
+
+
+@pytest.mark.integration
+def test_endpoint_pages_and_rejects_bad_cursor(historial):
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app, client=("127.0.0.1", 5000))
+    primera = client.get("/predictions", params={"limit": 20}).json()
+    assert len(primera["items"]) == 20
+    segunda = client.get("/predictions", params={"limit": 20, "cursor": primera["next_cursor"]}).json()
+    assert primera["items"][-1]["id"] != segunda["items"][0]["id"]
+    assert client.get("/predictions", params={"cursor": "x"}).status_code == 400
+    assert TestClient(app, client=("203.0.113.9", 5000)).get("/predictions").status_code == 403
+
+
+@pytest.mark.integration
+def test_ensure_indexes_upgrades_existing_table(sqlite_db, tmp_path):
+    # Tabla creada por la versión anterior: sin índices compuestos
+    sqlite_db.DATABASE_URL = f"sqlite:///{tmp_path / 'antigua.db'}"
+    antigua = MetaData()
+    Table(
+        "predictions", antigua, Column("id", Integer, primary_key=True), Column("age_category", String(10)),
+        Column("prediction_result", Integer), Column("created_at", DateTime)
+    )
+    engine = create_engine(sqlite_db.DATABASE_URL)
+    antigua.create_all(engine)
+    engine.dispose()
+
+    sqlite_db.initialize()
+    sqlite_db.create_schema()
+    # El arranque solo avisa: en una tabla grande crear índices lo bloquearía
+    faltan = {indice.name for indice in sqlite_db.missing_indexes()}
+    assert {"ix_predictions_created_at_id", "ix_predictions_age_created_at_id"} <= faltan
+
+    sqlite_db.ensure_indexes()
+    indices = {indice["name"] for indice in inspect(sqlite_db.engine).get_indexes("predictions")}
+    assert faltan <= indices
+    assert sqlite_db.missing_indexes() == []
@@ -0,0 +1,109 @@
+# test_prediction_rollup.py
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.v1.routes.predictions import router
+from core.config import settings
+from db.models import PredictionDailyStat
+from services.prediction_rollup import daily_stats, last_rollup_id, refresh_rollups
+from .helpers import prediction_row
+
+INICIO = datetime(2025, 5, 1, 8, 0, 0)
+EDADES = ["18-24", "50-54", "80+"]
+
+
+def _registro(i: int) -> dict:
+    return prediction_row(
+        age_category=EDADES[i % 3], sex=i % 2, prediction_result=int(i % 5 == 0),
+        probability=0.25 if i % 5 else 0.75, created_at=INICIO + timedelta(hours=i),
+    )
+
+
+def _esperado(indices):
+    """Agregado calculado en Python a partir de los registros originales"""
+    totales, altos = Counter(), Counter()
+    for i in indices:
+        r = _registro(i)
+        clave = (r["created_at"].date(), r["age_category"])
+        totales[clave] += 1
+        altos[clave] += r["prediction_result"]
+    return {clave: (totales[clave], altos[clave]) for clave in totales}
+
+
+@pytest.mark.integration
+def test_incremental_refresh_matches_raw_aggregation(sqlite_db, seed_predictions):
+    seed_predictions(map(_registro, range(40)))
+    assert refresh_rollups(sqlite_db, batch_size=7) == 40
+    assert refresh_rollups(sqlite_db, batch_size=7) == 0
+
+    # Solo se procesan las filas nuevas y se suman a los grupos existentes
+    seed_predictions(map(_registro, range(40, 60)))
+    assert refresh_rollups(sqlite_db) == 20
+
+    with sqlite_db.session_scope() as db:
+        filas = daily_stats(db, group_by=["age_category"])
+        grupos = db.query(PredictionDailyStat).count()
+    assert {(f["day"], f["age_category"]): (f["total"], f["high_risk"]) for f in filas} == _esperado(range(60))
+    claves = {
+        (r["created_at"].date(), r["age_category"], r["sex"], r["prediction_result"])
+        for r in map(_registro, range(60))
+    }
+    assert grupos == len(claves)
+
+
+@pytest.mark.integration
+def test_watermark_waits_for_grace_period(sqlite_db, seed_predictions):
+    seed_predictions(map(_registro, range(10)))
+    # Filas recientes (CURRENT_TIMESTAMP de SQLite es UTC): podría haber ids menores sin confirmar
+    ahora = datetime.now(timezone.utc).replace(tzinfo=None)
+    seed_predictions({**_registro(i), "created_at": ahora} for i in range(10, 13))
+    assert refresh_rollups(sqlite_db, grace=3600) == 10
+    with sqlite_db.session_scope() as db:
+        assert last_rollup_id(db) == 10
+    # Pasado el margen (aquí, uno negativo) se agregan
+    assert refresh_rollups(sqlite_db, grace=-60) == 3
+
+
+@pytest.mark.integration
+def test_refresh_on_lazy_database_creates_schema(sqlite_db, seed_predictions, monkeypatch):
+    # Con DB_INIT_MODE=lazy el trabajo periódico puede ser el primero en usar la BD
+    monkeypatch.setattr(settings, "DB_INIT_MODE", "lazy")
+    assert refresh_rollups(sqlite_db) == 0
+    seed_predictions(map(_registro, range(3)))
+    assert refresh_rollups(sqlite_db) == 3
+
+
+@pytest.mark.integration
+def test_daily_totals_and_rates(sqlite_db, seed_predictions):
+    seed_predictions(map(_registro, range(48)))
+    refresh_rollups(sqlite_db)
+    with sqlite_db.session_scope() as db:
+        filas = daily_stats(db, date_from=INICIO.date() + timedelta(days=1))
+        with pytest.raises(ValueError):
+            daily_stats(db, group_by=["weight"])
+    # Del 2 de mayo (i = 16..39) y el 3 de mayo (i = 40..47)
+    assert [(f["day"].day, f["total"]) for f in filas] == [(2, 24), (3, 8)]
+    dos = filas[0]
+    assert dos["high_risk"] == sum(1 for i in range(16, 40) if i % 5 == 0)
+    assert dos["high_risk_rate"] == pytest.approx(dos["high_risk"] / 24)
+    assert dos["mean_probability"] == pytest.approx((0.75 * dos["high_risk"] + 0.25 * (24 - dos["high_risk"])) / 24)
+
+
+@pytest.mark.integration
+def test_stats_endpoint(sqlite_db, seed_predictions):
+    seed_predictions(map(_registro, range(30)))
+    refresh_rollups(sqlite_db)
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app, client=("127.0.0.1", 5000))
+
+    respuesta = client.get("/predictions/stats", params={"group_by": ["sex"]}).json()
+    assert respuesta["last_id"] == 30
+    assert sum(f["total"] for f in respuesta["rows"]) == 30
+    assert {f["sex"] for f in respuesta["rows"]} == {0, 1}
+    assert all(f["age_category"] is None for f in respuesta["rows"])
+    assert client.get("/predictions/stats", params={"group_by": ["weight"]}).status_code == 422
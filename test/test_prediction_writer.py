@@ -0,0 +1,204 @@
+# test_prediction_writer.py
+import asyncio
+import threading
+
+import pytest
+
+from core.metrics import PERSISTENCE_DROPPED_TOTAL
+from services.prediction_writer import PredictionWriter, PersistenceBackpressureError
+
+
+class SinkFalso:
+    """Sustituye al INSERT masivo y registra los lotes recibidos"""
+    def __init__(self, bloqueo=None):
+        self.lotes = []
+        self.bloqueo = bloqueo
+
+    def __call__(self, rows):
+        if self.bloqueo is not None:
+            self.bloqueo.wait()
+        self.lotes.append(list(rows))
+
+
+@pytest.mark.unit
+def test_flush_by_size_and_drain():
+    sink = SinkFalso()
+
+    async def escenario():
+        writer = PredictionWriter(sink=sink, max_queue=100, batch_size=10, flush_interval=5)
+        await writer.start()
+        for i in range(25):
+            await writer.enqueue({"id": i})
+        await writer.stop()
+
+    asyncio.run(escenario())
+    assert [len(lote) for lote in sink.lotes] == [10, 10, 5]
+    assert [row["id"] for lote in sink.lotes for row in lote] == list(range(25))
+
+
+@pytest.mark.unit
+def test_flush_by_interval():
+    sink = SinkFalso()
+
+    async def escenario():
+        writer = PredictionWriter(sink=sink, max_queue=100, batch_size=1000, flush_interval=0.05)
+        await writer.start()
+        await writer.enqueue({"id": 1})
+        await asyncio.sleep(0.3)
+        volcados = len(sink.lotes)
+        await writer.stop()
+        return volcados
+
+    assert asyncio.run(escenario()) == 1
+
+
+@pytest.mark.unit
+def test_backpressure_when_queue_full():
+    bloqueo = threading.Event()
+    sink = SinkFalso(bloqueo)
+
+    async def escenario():
+        writer = PredictionWriter(sink=sink, max_queue=2, batch_size=1, flush_interval=0, enqueue_timeout=0.05)
+        await writer.start()
+        await writer.enqueue({"id": 0})
+        await asyncio.sleep(0.05)  # el worker queda bloqueado volcando el primero
+        await writer.enqueue({"id": 1})
+        # El lote en escritura sigue ocupando su plaza hasta guardarse
+        with pytest.raises(PersistenceBackpressureError):
+            await writer.enqueue({"id": 2})
+        bloqueo.set()
+        await writer.stop()
+
+    asyncio.run(escenario())
+    assert [row["id"] for lote in sink.lotes for row in lote] == [0, 1]
+
+
+@pytest.mark.unit
+def test_enqueue_without_worker_writes_directly():
+    sink = SinkFalso()
+    asyncio.run(PredictionWriter(sink=sink).enqueue({"id": 7}))
+    assert sink.lotes == [[{"id": 7}]]
+
+
+class SinkInestable(SinkFalso):
+    """Falla las primeras `fallos` escrituras (p. ej. la BD reiniciándose)"""
+    def __init__(self, fallos):
+        super().__init__()
+        self.fallos = fallos
+        self.intentos = 0
+
+    def __call__(self, rows):
+        self.intentos += 1
+        if self.intentos <= self.fallos:
+            raise ConnectionError("MySQL no disponible")
+        super().__call__(rows)
+
+
+def _descartadas() -> float:
+    return sum(PERSISTENCE_DROPPED_TOTAL._valores.values())
+
+
+@pytest.mark.unit
+def test_failed_batch_retried_with_backoff():
+    sink = SinkInestable(fallos=2)
+
+    async def escenario():
+        writer = PredictionWriter(sink=sink, batch_size=5, flush_interval=5, max_retries=3, retry_backoff=0.01)
+        await writer.start()
+        for i in range(5):
+            await writer.enqueue({"id": i})
+        await writer.stop()
+        return writer.pending
+
+    antes = _descartadas()
+    assert asyncio.run(escenario()) == 0
+    assert sink.intentos == 3
+    assert [row["id"] for lote in sink.lotes for row in lote] == list(range(5))
+    assert _descartadas() == antes
+
+
+@pytest.mark.unit
+def test_batch_dropped_and_counted_after_retries():
+    sink = SinkInestable(fallos=100)
+
+    async def escenario():
+        writer = PredictionWriter(sink=sink, max_queue=5, batch_size=5, flush_interval=0,
+                                  max_retries=2, retry_backoff=0.01, enqueue_timeout=0.5)
+        await writer.start()
+        for i in range(5):
+            await writer.enqueue({"id": i})
+        await asyncio.sleep(0.2)
+        # Descartado el lote, sus plazas vuelven a estar libres
+        await writer.enqueue({"id": 5})
+        await writer.stop()
+
+    antes = _descartadas()
+    asyncio.run(escenario())
+    assert sink.lotes == []
+    assert _descartadas() - antes == 6
+
+
+class SinkConFilaMala(SinkFalso):
+    """Rechaza cualquier lote que contenga la fila con id == mala (p. ej. un valor fuera de rango)"""
+    def __init__(self, mala):
+        super().__init__()
+        self.mala = mala
+
+    def __call__(self, rows):
+        if any(row["id"] == self.mala for row in rows):
+            raise ValueError("Out of range value for column 'bmi'")
+        super().__call__(rows)
+
+
+@pytest.mark.unit
+def test_bad_row_isolated_and_only_it_dropped():
+    sink = SinkConFilaMala(mala=5)
+
+    async def escenario():
+        writer = PredictionWriter(sink=sink, batch_size=8, flush_interval=5, max_retries=1, retry_backoff=0.01)
+        await writer.start()
+        for i in range(8):
+            await writer.enqueue({"id": i})
+        await writer.stop()
+        return writer.pending
+
+    antes = _descartadas()
+    assert asyncio.run(escenario()) == 0
+    assert sorted(row["id"] for lote in sink.lotes for row in lote) == [0, 1, 2, 3, 4, 6, 7]
+    assert _descartadas() - antes == 1
+
+
+@pytest.mark.unit
+def test_stop_timeout_counts_only_rows_not_written():
+    bloqueo = threading.Event()
+    sink = SinkFalso(bloqueo)
+
+    async def escenario():
+        writer = PredictionWriter(sink=sink, batch_size=1, flush_interval=0)
+        await writer.start()
+        for i in range(4):
+            await writer.enqueue({"id": i})
+        await asyncio.sleep(0.05)  # el worker queda bloqueado escribiendo la primera
+        # La escritura en curso termina después del timeout del apagado
+        threading.Timer(0.2, bloqueo.set).start()
+        await writer.stop(timeout=0.05)
+
+    antes = _descartadas()
+    asyncio.run(escenario())
+    assert sink.lotes == [[{"id": 0}]]
+    assert _descartadas() - antes == 3
+
+
+@pytest.mark.unit
+def test_enqueue_many_goes_through_the_queue():
+    sink = SinkFalso()
+
+    async def escenario():
+        writer = PredictionWriter(sink=sink, max_queue=4, batch_size=3, flush_interval=5)
+        await writer.start()
+        # Más filas que plazas: se encolan según el worker las va escribiendo
+        await writer.enqueue_many([{"id": i} for i in range(7)])
+        await writer.stop()
+
+    asyncio.run(escenario())
+    assert [row["id"] for lote in sink.lotes for row in lote] == list(range(7))
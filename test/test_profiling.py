@@ -0,0 +1,104 @@
+# test_profiling.py
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from api.v1.routes.predict import router
+from core.profiling import RequestProfiler, profile_requested, request_profiler
+from services.prediction_writer import prediction_writer
+from .helpers import PACIENTE
+
+
+def _peticion(host: str, cabeceras: dict) -> Request:
+    return Request({
+        "type": "http", "method": "POST", "path": "/", "client": (host, 5000),
+        "headers": [(k.lower().encode(), v.encode()) for k, v in cabeceras.items()],
+    })
+
+
+def _trabajo():
+    return sum(i * i for i in range(200000))
+
+
+def _durante(segundos: float):
+    fin = time.monotonic() + segundos
+    while time.monotonic() < fin:
+        _trabajo()
+
+
+@pytest.mark.unit
+def test_sampling_writes_collapsed_stacks(tmp_path):
+    perfilador = RequestProfiler(directory=tmp_path, interval=0.001)
+
+    async def escenario():
+        async with perfilador.capture() as perfil:
+            # El trabajo de la petición suele ir a un hilo del pool: también se muestrea
+            await asyncio.to_thread(_durante, 0.05)
+        return perfil
+
+    perfil = asyncio.run(escenario())
+    contenido = perfil.path.read_text(encoding="utf-8")
+    assert perfil.path.suffix == ".collapsed"
+    assert "test_profiling.py:_trabajo" in contenido
+
+
+@pytest.mark.unit
+def test_profile_written_off_the_event_loop(tmp_path, monkeypatch):
+    perfilador = RequestProfiler(directory=tmp_path)
+    guardar = perfilador._guardar
+    hilos = []
+
+    def guardar_registrando(*args):
+        hilos.append(threading.current_thread())
+        return guardar(*args)
+
+    monkeypatch.setattr(perfilador, "_guardar", guardar_registrando)
+
+    async def escenario():
+        async with perfilador.capture():
+            pass
+
+    asyncio.run(escenario())
+    assert hilos and hilos[0] is not threading.main_thread()
+
+
+@pytest.mark.unit
+def test_directory_rotates_and_concurrent_capture_is_skipped(tmp_path):
+    perfilador = RequestProfiler(directory=tmp_path, max_files=2)
+
+    async def escenario():
+        for _ in range(3):
+            async with perfilador.capture() as perfil:
+                async with perfilador.capture() as anidado:
+                    assert anidado is None
+        return perfil
+
+    assert asyncio.run(escenario()).path.exists()
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+@pytest.mark.unit
+def test_profile_header_only_honoured_for_admin_networks():
+    assert profile_requested(_peticion("127.0.0.1", {"X-Profile": "1"}))
+    assert not profile_requested(_peticion("127.0.0.1", {"X-Profile": "0"}))
+    assert not profile_requested(_peticion("127.0.0.1", {}))
+    assert not profile_requested(_peticion("203.0.113.9", {"X-Profile": "1"}))
+
+
+@pytest.mark.integration
+def test_predict_endpoint_returns_profile_file(tmp_path, monkeypatch):
+    guardadas = []
+    monkeypatch.setattr(prediction_writer, "_sink", guardadas.extend)
+    monkeypatch.setattr(request_profiler, "_directory", tmp_path)
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app, client=("127.0.0.1", 5000))
+    respuesta = client.post("/predict/", json=PACIENTE, headers={"X-Profile": "1"})
+    assert respuesta.status_code == 200
+    assert (tmp_path / respuesta.headers["X-Profile-File"]).exists()
+    assert "X-Profile-File" not in client.post("/predict/", json=PACIENTE).headers